@@ -0,0 +1,97 @@
+"""
+Benchmark of encoding and decoding carts with CartSerializer.
+
+Run from the root of the repository with:
+    python -m benchmarks.cart_serializer_benchmark
+
+For carts of increasing size, prints the size of the encoded cart and the
+time taken to encode and decode it, next to the same measures for JSON and
+pickle as a reference.
+"""
+import json
+import pickle
+import timeit
+
+from entities.cafeteria_item import CafeteriaItem
+from entities.cart import Cart
+from infrastructure.helpers.cart_serializer import CartSerializer
+
+CART_SIZES = (1, 10, 100, 1000)
+
+
+def create_cart(line_count: int):
+    """
+    Create a cart with the given number of lines.
+    Args:
+        line_count (int): The number of lines of the cart.
+    Returns:
+        Cart: The cart.
+    """
+    lines = {x: CafeteriaItem(x, f"Storm's Special Treat {x}", 100 + x,
+                              1 + x % 5) for x in range(1, line_count + 1)}
+    return Cart(lines, sum(x.Stock for x in lines.values()),
+                sum(x.Price * x.Stock for x in lines.values()), {1: 50})
+
+
+def encode_json(cart: Cart):
+    """
+    Convert a cart to JSON, as a reference.
+    Args:
+        cart (Cart): The cart to convert.
+    Returns:
+        bytes: The cart as UTF-8 encoded JSON.
+    """
+    return json.dumps([cart.TotalQuantity, cart.TotalPrice,
+                       [[x.Id, x.Name, x.Price, x.Stock]
+                        for x in cart.Lines.values()],
+                       list(cart.Discounts.items())]).encode()
+
+
+def decode_json(data: bytes):
+    """
+    Convert JSON created by encode_json back to a cart.
+    Args:
+        data (bytes): The cart as UTF-8 encoded JSON.
+    Returns:
+        Cart: The decoded cart.
+    """
+    total_quantity, total_price, lines, discounts = json.loads(data)
+    return Cart({x[0]: CafeteriaItem(*x) for x in lines}, total_quantity,
+                total_price, dict(discounts))
+
+
+def measure(function, argument):
+    """
+    Measure the time a function takes.
+    Args:
+        function (Callable): The function to measure.
+        argument: The argument of the function.
+    Returns:
+        float: The best time of a call in microseconds.
+    """
+    timer = timeit.Timer(lambda: function(argument))
+    number, _ = timer.autorange()
+    return min(timer.repeat(5, number)) / number * 1e6
+
+
+def run():
+    """
+    Run the benchmark and print its results.
+    """
+    formats = [("binary", CartSerializer.encode, CartSerializer.decode),
+               ("json", encode_json, decode_json),
+               ("pickle", pickle.dumps, pickle.loads)]
+    print(f"{'lines':>6} {'format':>7} {'bytes':>9} {'encode us':>11} "
+          f"{'decode us':>11}")
+    for line_count in CART_SIZES:
+        cart = create_cart(line_count)
+        for name, encode, decode in formats:
+            data = encode(cart)
+            assert decode(data) == cart
+            print(f"{line_count:>6} {name:>7} {len(data):>9} "
+                  f"{measure(encode, cart):>11.1f} "
+                  f"{measure(decode, data):>11.1f}")
+
+
+if __name__ == "__main__":
+    run()
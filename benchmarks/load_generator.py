@@ -0,0 +1,419 @@
+"""
+Load test of the customer and admin flows.
+
+Run from the root of the repository with:
+    python -m benchmarks.load_generator --sessions 500 --concurrency 32 \
+        --mix single=60,multi=25,change=10,admin=5
+
+Runs many scripted sessions of start_cafeteria_flow at once, in threads
+sharing one Inventory, as the sessions of a SessionHost do. Each session
+follows a scenario picked at random from the order mix:
+    single: orders one item and pays.
+    multi: orders several items and pays.
+    change: orders two items, removes one of them and pays.
+    admin: logs in to the secret woof mode, restocks an item through
+     validate_if_admin_name_provided, then orders one item and pays.
+The sessions run against a menu database seeded with plenty of stock, in a
+temporary directory, so the load test never touches the real menu.
+
+Prints the throughput of the sessions and the 50th, 95th and 99th
+percentiles of the latency of every step of the flows. The latency of a
+step is the time the flow takes to respond to an answer: from the answer to
+a prompt until the next prompt, or the end of the session. The "start" step
+is the time from the start of a session until the first prompt.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from entities.cafeteria_item import CafeteriaItem
+from infrastructure.helpers.inventory import Inventory
+from infrastructure.helpers.scripted_io import ScriptedIO
+from infrastructure.repositories.menu_repository import MenuRepository
+from services.user_flow_service import UserflowService
+
+ADMIN_USER = "Storm"
+ADMIN_PASSWORD = "load-test"
+CUSTOMER_NAMES = ("Alfie", "Bella", "Charlie", "Daisy", "Sonny", "Luna")
+CART_TOTAL = object()
+CART_TOTAL_PATTERN = re.compile(r"Your cart total is: \D*([\d,]+\.\d\d)")
+PERCENTILES = (50, 95, 99)
+RESTOCK_RANGE = (100000, 999999)
+STEP_LABELS = [
+    (re.compile(r"What is your name"), "name"),
+    (re.compile(r"secret password"), "admin password"),
+    (re.compile(r"How would you like to edit the menu"), "admin action"),
+    (re.compile(r"wish to update"), "admin select"),
+    (re.compile(r"new name for"), "admin name"),
+    (re.compile(r"add to the menu"), "admin stock"),
+    (re.compile(r"price for one"), "admin price"),
+    (re.compile(r"continue editing the menu"), "admin continue"),
+    (re.compile(r"to browse the menu"), "browse menu"),
+    (re.compile(r"wish to order"), "select items"),
+    (re.compile(r"would you like to order"), "quantity"),
+    (re.compile(r"Which item\(s\) would you like to remove"),
+     "select removal"),
+    (re.compile(r"would you like to remove"), "removal quantity"),
+    (re.compile(r"Are you finished"), "finished?"),
+    (re.compile(r"add or remove"), "add or remove"),
+    (re.compile(r"cart total on screen"), "pay")]
+
+
+class TimedScriptedIO(ScriptedIO):
+    """
+    Scripted input and output timing every step of a flow.
+
+    The script may hold CART_TOTAL, which is answered with the last cart
+    total the flow wrote, as a customer reads it from the screen. Prompts
+    to browse a menu longer than a page are answered with an empty line
+    without using the script.
+
+    Attributes:
+        latencies (dict[str, list[float]]): The latencies of the steps of
+         the flow in seconds, keyed by the label of the step.
+    """
+    def __init__(self, lines):
+        super().__init__(lines, keep_output=False)
+        self.latencies = defaultdict(list)
+        self.__step = "start"
+        self.__step_started = time.perf_counter()
+        self.__cart_total = None
+
+    def input(self, prompt: str = ""):
+        """
+        Time the step ending with a prompt and answer the prompt.
+        Args:
+            prompt (str): The text written before reading.
+        Returns:
+            str: The answer.
+        Raises:
+            EOFError: If every line of the script has been read.
+        """
+        self.finish_step()
+        step = get_step_label(prompt)
+        if step == "browse menu":
+            answer = ""
+        else:
+            answer = super().input(prompt)
+        if answer is CART_TOTAL:
+            answer = self.__cart_total or ""
+        self.__step = step
+        self.__step_started = time.perf_counter()
+        return answer
+
+    def write(self, text: str):
+        """
+        Remember the cart total written by the flow.
+        Args:
+            text (str): The text to write.
+        """
+        match = CART_TOTAL_PATTERN.search(text)
+        if match is not None:
+            self.__cart_total = match.group(1)
+
+    def finish_step(self):
+        """
+        Record the latency of the current step.
+        """
+        self.latencies[self.__step].append(
+            time.perf_counter() - self.__step_started)
+
+
+def get_step_label(prompt: str):
+    """
+    Get the label of the step a prompt ends.
+    Args:
+        prompt (str): The prompt.
+    Returns:
+        str: The label of the first matching pattern of STEP_LABELS, or
+        "other".
+    """
+    for pattern, label in STEP_LABELS:
+        if pattern.search(prompt):
+            return label
+    return "other"
+
+
+def create_single_order(generator: random.Random, item_ids: list[int]):
+    """
+    Create the script of a customer ordering one item.
+    Args:
+        generator (random.Random): The source of random choices.
+        item_ids (list[int]): The Ids of the items of the menu.
+    Returns:
+        list: The answers of the customer.
+    """
+    return [generator.choice(CUSTOMER_NAMES),
+            str(generator.choice(item_ids)), str(generator.randint(1, 3)),
+            "Y", CART_TOTAL]
+
+
+def create_multi_order(generator: random.Random, item_ids: list[int]):
+    """
+    Create the script of a customer ordering several items.
+    Args:
+        generator (random.Random): The source of random choices.
+        item_ids (list[int]): The Ids of the items of the menu.
+    Returns:
+        list: The answers of the customer.
+    """
+    ordered_ids = generator.sample(item_ids,
+                                   min(generator.randint(2, 5),
+                                       len(item_ids)))
+    return ([generator.choice(CUSTOMER_NAMES),
+             ",".join(str(x) for x in ordered_ids)]
+            + [str(generator.randint(1, 3)) for _ in ordered_ids]
+            + ["Y", CART_TOTAL])
+
+
+def create_changed_order(generator: random.Random, item_ids: list[int]):
+    """
+    Create the script of a customer ordering two items and removing one of
+    them before paying.
+    Args:
+        generator (random.Random): The source of random choices.
+        item_ids (list[int]): The Ids of the items of the menu.
+    Returns:
+        list: The answers of the customer.
+    """
+    first_id, second_id = generator.sample(item_ids, 2)
+    return [generator.choice(CUSTOMER_NAMES), f"{first_id},{second_id}",
+            str(generator.randint(1, 3)), str(generator.randint(1, 3)), "N",
+            "Remove", str(first_id), "1", "Y", CART_TOTAL]
+
+
+def create_admin_session(generator: random.Random, item_ids: list[int]):
+    """
+    Create the script of an admin restocking an item and then ordering one
+    item. The new stock is random, as the flow asks again for a stock equal
+    to the current one.
+    Args:
+        generator (random.Random): The source of random choices.
+        item_ids (list[int]): The Ids of the items of the menu.
+    Returns:
+        list: The answers of the admin.
+    """
+    return ([ADMIN_USER, ADMIN_PASSWORD, "Update",
+             str(generator.choice(item_ids)), "Skip",
+             str(generator.randint(*RESTOCK_RANGE)), "Skip", "N"]
+            + create_single_order(generator, item_ids)[1:])
+
+
+SCENARIOS = {
+    "single": create_single_order,
+    "multi": create_multi_order,
+    "change": create_changed_order,
+    "admin": create_admin_session}
+
+
+def parse_mix(text: str):
+    """
+    Parse an order mix such as "single=60,multi=25,change=10,admin=5".
+    Args:
+        text (str): The weight of every scenario, separated by commas.
+    Returns:
+        dict[str, int]: The weights, keyed by scenario.
+    Raises:
+        argparse.ArgumentTypeError: If a scenario is unknown or a weight is
+         not a positive whole number.
+    """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown scenario {name!r}, expected one of "
+                f"{', '.join(SCENARIOS)}")
+        if not weight.strip().isdigit() or int(weight) == 0:
+            raise argparse.ArgumentTypeError(
+                f"The weight of {name} must be a positive whole number")
+        mix[name] = int(weight)
+    return mix
+
+
+def create_menu(item_count: int, stock: int):
+    """
+    Create the menu the sessions order from.
+    Args:
+        item_count (int): The number of items of the menu.
+        stock (int): The initial stock of every item.
+    Returns:
+        list[CafeteriaItem]: The items of the menu.
+    """
+    return [CafeteriaItem(x, f"Storm's Special Treat {x}", 100 + x, stock)
+            for x in range(1, item_count + 1)]
+
+
+def run_session(scenario: str, script: list, inventory: Inventory):
+    """
+    Run a scripted session of the cafeteria flow.
+    Args:
+        scenario (str): The scenario of the session.
+        script (list): The answers of the session.
+        inventory (Inventory): The inventory shared by every session.
+    Returns:
+        tuple[str, bool, float, dict[str, list[float]]]: The scenario,
+        whether the flow ended before the script did, the duration of the
+        session in seconds and the latencies of its steps.
+    """
+    started = time.perf_counter()
+    io = TimedScriptedIO(script)
+    try:
+        UserflowService(io, inventory).start_cafeteria_flow()
+        is_completed = True
+    except EOFError:
+        is_completed = False
+    io.finish_step()
+    return (scenario, is_completed, time.perf_counter() - started,
+            io.latencies)
+
+
+def percentile(values: list[float], percent: int):
+    """
+    Get a percentile of sorted values, by the nearest-rank method.
+    Args:
+        values (list[float]): The values, sorted.
+        percent (int): The percentile, from 1 to 100.
+    Returns:
+        float: The smallest value greater than or equal to the given
+        percentage of the values.
+    """
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+def summarize(latencies: list[float]):
+    """
+    Summarize latencies.
+    Args:
+        latencies (list[float]): The latencies in seconds.
+    Returns:
+        dict[str, float]: The count and the percentiles of PERCENTILES, in
+        milliseconds.
+    """
+    values = sorted(latencies)
+    summary = {"count": len(values)}
+    for percent in PERCENTILES:
+        summary[f"p{percent}"] = percentile(values, percent) * 1000
+    return summary
+
+
+def run(session_count: int, concurrency: int, mix: dict[str, int],
+        item_count: int, stock: int, seed: int):
+    """
+    Run the load test in the current directory.
+    Args:
+        session_count (int): The number of sessions to run.
+        concurrency (int): The number of sessions run at once.
+        mix (dict[str, int]): The weight of every scenario.
+        item_count (int): The number of items of the menu.
+        stock (int): The initial stock of every item.
+        seed (int): The seed of the random choices of the sessions.
+    Returns:
+        dict: The results, with the number of sessions, the number
+        completed, the duration in seconds, the sessions and steps per
+        second, and a summary of the latencies of every scenario and step.
+    """
+    with open("creds.json", "w") as file:
+        json.dump({"admin_user": ADMIN_USER,
+                   "admin_password": ADMIN_PASSWORD}, file)
+    MenuRepository().seed_items(create_menu(item_count, stock))
+    generator = random.Random(seed)
+    item_ids = list(range(1, item_count + 1))
+    scenarios = generator.choices(list(mix), list(mix.values()),
+                                  k=session_count)
+    scripts = [SCENARIOS[x](generator, item_ids) for x in scenarios]
+    inventory = Inventory()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        sessions = list(executor.map(run_session, scenarios, scripts,
+                                     [inventory] * session_count))
+    duration = time.perf_counter() - started
+    session_latencies = defaultdict(list)
+    step_latencies = defaultdict(list)
+    for scenario, _, session_duration, latencies in sessions:
+        session_latencies[scenario].append(session_duration)
+        for step, values in latencies.items():
+            step_latencies[step].extend(values)
+    step_count = sum(len(x) for x in step_latencies.values())
+    return {
+        "sessions": session_count,
+        "completed": sum(1 for x in sessions if x[1]),
+        "seconds": duration,
+        "sessions_per_second": session_count / duration,
+        "steps_per_second": step_count / duration,
+        "scenarios": {x: summarize(y) for x, y in
+                      sorted(session_latencies.items())},
+        "steps": {x: summarize(y) for x, y in
+                  sorted(step_latencies.items())}}
+
+
+def print_results(results: dict):
+    """
+    Print the results of a load test.
+    Args:
+        results (dict): The results returned by run.
+    """
+    print(f"{results['sessions']} sessions, {results['completed']} "
+          f"completed, in {results['seconds']:.2f} s: "
+          f"{results['sessions_per_second']:.1f} sessions/s, "
+          f"{results['steps_per_second']:.1f} steps/s")
+    header = "".join(f"{f'p{x} ms':>10}" for x in PERCENTILES)
+    for title, summaries in (("scenario", results["scenarios"]),
+                             ("step", results["steps"])):
+        print()
+        print(f"{title:<18} {'count':>7}{header}")
+        for name, summary in summaries.items():
+            values = "".join(f"{summary[f'p{x}']:>10.2f}"
+                             for x in PERCENTILES)
+            print(f"{name:<18} {summary['count']:>7}{values}")
+
+
+def main():
+    """
+    Parse the command line, run the load test in a temporary directory and
+    print the results.
+    """
+    parser = argparse.ArgumentParser(
+        description="Load test the customer and admin flows.")
+    parser.add_argument("--sessions", type=int, default=200,
+                        help="the number of sessions to run")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="the number of sessions run at once")
+    parser.add_argument("--mix", type=parse_mix,
+                        default="single=60,multi=25,change=10,admin=5",
+                        help="the weight of every scenario")
+    parser.add_argument("--items", type=int, default=50,
+                        help="the number of items of the menu")
+    parser.add_argument("--stock", type=int, default=1000000,
+                        help="the initial stock of every item")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="the seed of the random choices")
+    parser.add_argument("--output",
+                        help="a file to save the results to as JSON")
+    arguments = parser.parse_args()
+    output = arguments.output and os.path.abspath(arguments.output)
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            results = run(arguments.sessions, arguments.concurrency,
+                          arguments.mix, arguments.items, arguments.stock,
+                          arguments.seed)
+        finally:
+            os.chdir(working_directory)
+    print_results(results)
+    if output:
+        with open(output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
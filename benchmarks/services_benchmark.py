@@ -0,0 +1,205 @@
+"""
+Micro-benchmarks of the services at increasing menu sizes.
+
+Run from the root of the repository with:
+    python -m benchmarks.services_benchmark --output results.json
+
+For every menu size, seeds a menu database of that size in a temporary
+directory and prints the best time of a call, in microseconds, of:
+    CartService.add_to_cart, update_cart and remove_from_cart, with a cart
+     of CART_SIZE items spread over the menu.
+    CafeteriaItemService.subtract_from_stock, print_cafeteria_menu and
+     remove_items_from_menu, the last of which replaced renumbering the
+     whole menu with recalculate_ids when Ids became stable.
+    UserInputValidator.validate_item_ids, selecting the items of the cart.
+The results are saved as JSON, and a file saved by an earlier version can be
+passed with --compare to print the change of every time against it.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import tempfile
+import time
+import timeit
+
+from entities.cafeteria_item import CafeteriaItem
+from infrastructure.helpers.scripted_io import ScriptedIO
+from infrastructure.repositories.menu_repository import MenuRepository
+from infrastructure.validators.user_input_validator import UserInputValidator
+from services.cafeteria_item_service import CafeteriaItemService
+from services.cart_service import CartService
+
+MENU_SIZES = (10, 100, 1000, 10000, 100000, 1000000)
+CART_SIZE = 10
+INITIAL_STOCK = 1000000000
+REPEAT = 5
+MAX_REMOVED_ITEMS = 100
+
+
+def create_menu_repository(directory: str, menu_size: int):
+    """
+    Create a menu database with the given number of items.
+    Args:
+        directory (str): The directory of the database.
+        menu_size (int): The number of items of the menu.
+    Returns:
+        MenuRepository: The repository of the menu.
+    """
+    menu_repository = MenuRepository(
+        os.path.join(directory, f"menu_{menu_size}.db"))
+    menu_repository.seed_items([
+        CafeteriaItem(x, f"Storm's Special Treat {x}", 100 + x,
+                      INITIAL_STOCK) for x in range(1, menu_size + 1)])
+    return menu_repository
+
+
+def measure(function, *arguments):
+    """
+    Measure the time a function takes.
+    Args:
+        function (Callable): The function to measure.
+        *arguments: The arguments of the function.
+    Returns:
+        float: The best time of a call in microseconds.
+    """
+    timer = timeit.Timer(lambda: function(*arguments))
+    number, _ = timer.autorange()
+    return min(timer.repeat(REPEAT, number)) / number * 1e6
+
+
+def measure_each(function, create_arguments, number: int):
+    """
+    Measure the time a function changing its arguments takes, calling it
+    with fresh arguments every time.
+    Args:
+        function (Callable): The function to measure.
+        create_arguments (Callable): A function returning a tuple of
+         arguments, called before the calls are timed.
+        number (int): The number of calls timed at once.
+    Returns:
+        float: The best time of a call in microseconds.
+    """
+    best = float("inf")
+    for _ in range(REPEAT):
+        calls = [create_arguments() for _ in range(number)]
+        started = time.perf_counter()
+        for arguments in calls:
+            function(*arguments)
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e6
+
+
+def benchmark_menu_size(directory: str, menu_size: int):
+    """
+    Run the benchmarks with a menu of the given size.
+    Args:
+        directory (str): The directory of the menu database.
+        menu_size (int): The number of items of the menu.
+    Returns:
+        dict[str, float]: The best time of a call of every benchmark in
+        microseconds, keyed by the name of the benchmarked method.
+    """
+    io = ScriptedIO(itertools.repeat(""), keep_output=False)
+    cafeteria_item_service = CafeteriaItemService(
+        create_menu_repository(directory, menu_size), io=io)
+    cart_service = CartService(promotions=[], io=io)
+    menu = cafeteria_item_service.get_cafeteria_menu()
+    cart_size = min(CART_SIZE, menu_size)
+    selected_items = [menu.get_by_id(1 + x * menu_size // cart_size)
+                      for x in range(cart_size)]
+    selection_io = ScriptedIO(
+        itertools.repeat(",".join(str(x.Id) for x in selected_items)),
+        keep_output=False)
+    item = selected_items[0]
+    cart = cart_service.add_to_cart(selected_items)
+    removed_ids = itertools.count(menu_size, -1)
+    removed_item_count = max(1, min(MAX_REMOVED_ITEMS,
+                                    menu_size // REPEAT))
+    return {
+        "CartService.add_to_cart": measure(
+            cart_service.add_to_cart, selected_items),
+        "CartService.update_cart": measure(
+            cart_service.update_cart, cart, selected_items),
+        "CartService.remove_from_cart": measure_each(
+            cart_service.remove_from_cart,
+            lambda: (cart_service.add_to_cart(selected_items), item.Id),
+            MAX_REMOVED_ITEMS),
+        "UserInputValidator.validate_item_ids": measure(
+            UserInputValidator.validate_item_ids, menu, False,
+            selection_io),
+        "CafeteriaItemService.subtract_from_stock": measure(
+            cafeteria_item_service.subtract_from_stock, item, menu, 1),
+        "CafeteriaItemService.print_cafeteria_menu": measure(
+            cafeteria_item_service.print_cafeteria_menu, menu),
+        "CafeteriaItemService.remove_items_from_menu": measure_each(
+            cafeteria_item_service.remove_items_from_menu,
+            lambda: ([next(removed_ids)], menu), removed_item_count)}
+
+
+def run(menu_sizes: tuple[int, ...]):
+    """
+    Run the benchmarks with menus of the given sizes.
+    Args:
+        menu_sizes (tuple[int, ...]): The numbers of items of the menus.
+    Returns:
+        dict: The results, with the version of Python and the platform they
+        were measured with, and the best time of a call of every benchmark
+        in microseconds, keyed by menu size and then by benchmark.
+    """
+    results = {"python": platform.python_version(),
+               "platform": platform.platform(),
+               "results": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        for menu_size in menu_sizes:
+            results["results"][str(menu_size)] = benchmark_menu_size(
+                directory, menu_size)
+    return results
+
+
+def print_results(results: dict, baseline: dict = None):
+    """
+    Print the results of the benchmarks.
+    Args:
+        results (dict): The results returned by run.
+        baseline (dict): Earlier results to compare the results with.
+    """
+    baseline_results = (baseline or {}).get("results", {})
+    print(f"{'menu size':>9} {'benchmark':<44} {'us':>12} {'change':>8}")
+    for menu_size, timings in results["results"].items():
+        for name, microseconds in timings.items():
+            change = ""
+            before = baseline_results.get(menu_size, {}).get(name)
+            if before:
+                change = f"{(microseconds / before - 1) * 100:+.1f}%"
+            print(f"{menu_size:>9} {name:<44} {microseconds:>12.2f} "
+                  f"{change:>8}")
+
+
+def main():
+    """
+    Parse the command line, run the benchmarks, print the results and save
+    them as JSON.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the services at increasing menu sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=MENU_SIZES,
+                        help="the numbers of items of the menus")
+    parser.add_argument("--output", default="services_benchmark.json",
+                        help="the file to save the results to as JSON")
+    parser.add_argument("--compare",
+                        help="a file of earlier results to compare with")
+    arguments = parser.parse_args()
+    baseline = None
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            baseline = json.load(file)
+    results = run(tuple(arguments.sizes))
+    print_results(results, baseline)
+    with open(arguments.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,10 @@ class CafeteriaItem:
     Attributes:
         Id (int): A unique identifier for the cafeteria item.
         Name (str): The name of the cafeteria item.
-        Price (float): The price of the cafeteria item.
+        Price (int): The price of the cafeteria item, in pence.
         Stock (int): The available stock or quantity of the cafeteria item.
     """
     Id: int
     Name: str
-    Price: float
+    Price: int
     Stock: int
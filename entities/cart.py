@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from entities.cafeteria_item import CafeteriaItem
 
@@ -9,11 +9,39 @@ class Cart:
     Represents a shopping cart in a cafeteria application.
 
     Attributes:
-        Items (List[CafeteriaItem]): A list of CafeteriaItem objects
-         representing items in the cart.
+        Lines (dict[int, CafeteriaItem]): The lines of the cart keyed by item
+         ID, each a copy of a CafeteriaItem whose Stock holds the quantity in
+         the cart. This is the only place the contents of the cart are kept.
         TotalQuantity (int): The total quantity of items in the cart.
-        TotalPrice (float): The total price of all items in the cart.
+        TotalPrice (int): The total price of all items in the cart, in
+         pence, after discounts.
+        Discounts (dict[int, int]): The discount in pence given by each
+         promotion that applies to the cart, keyed by promotion ID.
+        LineIds (list[int]): The item IDs of the lines in ascending order,
+         sorted once when the cart is created and then kept in order as
+         lines are added and removed, so the lines are listed by item ID
+         without sorting them every time.
     """
-    Items: list[CafeteriaItem]
+    Lines: dict[int, CafeteriaItem]
     TotalQuantity: int
-    TotalPrice: float
+    TotalPrice: int
+    Discounts: dict[int, int] = field(default_factory=dict)
+    LineIds: list[int] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.LineIds is None:
+            self.LineIds = sorted(self.Lines)
+
+    @property
+    def Items(self):
+        """
+        list[CafeteriaItem]: The lines of the cart, sorted by item ID.
+        """
+        return [self.Lines[x] for x in self.LineIds]
+
+    @property
+    def TotalDiscount(self):
+        """
+        int: The total discount given by promotions, in pence.
+        """
+        return sum(self.Discounts.values())
@@ -0,0 +1,624 @@
+import operator
+import sys
+from array import array
+from bisect import bisect_left
+
+from entities.cafeteria_item import CafeteriaItem
+from infrastructure.helpers.change_journal import ChangeJournal
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EMPTY_SLOT = -1
+DELETED_SLOT = -2
+COLUMNS = ("Id", "Name", "Price", "Stock", "Removed", "NameSlots",
+           "RemovedItems")
+
+
+class CafeteriaItemView(CafeteriaItem):
+    """
+    Represents a lightweight view of a cafeteria item stored in a CompactMenu.
+
+    The view only holds a reference to the menu and the Id of the item, and
+    reads and writes the Name, Price and Stock attributes straight from the
+    menu's columns, so it can be used anywhere a CafeteriaItem is expected
+    without copying the item.
+    """
+    __slots__ = ("_menu", "_item_id")
+
+    def __init__(self, menu: "CompactMenu", item_id: int):
+        self._menu = menu
+        self._item_id = item_id
+
+    @property
+    def Id(self):
+        return self._item_id
+
+    @property
+    def Name(self):
+        return self._menu.get_column_value(self._item_id, "Name")
+
+    @Name.setter
+    def Name(self, value: str):
+        self._menu.rename(self, value)
+
+    @property
+    def Price(self):
+        return self._menu.get_column_value(self._item_id, "Price")
+
+    @Price.setter
+    def Price(self, value: int):
+        self._menu.set_column_value(self._item_id, "Price", value)
+
+    @property
+    def Stock(self):
+        return self._menu.get_column_value(self._item_id, "Stock")
+
+    @Stock.setter
+    def Stock(self, value: int):
+        self._menu.set_column_value(self._item_id, "Stock", value)
+
+
+class CompactMenu:
+    """
+    Represents the cafeteria menu as a struct of arrays, for very large
+    catalogs.
+
+    The Ids, prices and stock of the items are kept in typed arrays, and the
+    names in a table of interned strings, instead of one CafeteriaItem
+    object per item. Items are exposed as CafeteriaItemView objects created
+    on demand, and every change increases the version counter of the
+    menu and is recorded in its ChangeJournal. Ids are stable and must be
+    added in ascending order, so items are found by a binary search over the
+    Id column, and names are found through an open-addressing hash table of
+    row numbers stored in an array. Removing
+    an item only flags its row as removed and keeps a copy of the item as a
+    tombstone, which views of the removed item read from; the flagged rows
+    are dropped from the columns the next time the menu is accessed by
+    position or summed. The class offers the same interface as Menu, plus
+    operations over whole columns, such as the total stock of the menu,
+    which are vectorised with NumPy when it is installed, and otherwise run
+    over the typed arrays with the standard library.
+
+    A menu can be copied cheaply with snapshot(): both menus share their
+    columns, and a column is only copied by the first menu that changes it,
+    so an order that changes stock copies the Stock column alone.
+    """
+    def __init__(self, items: list[CafeteriaItem] = None,
+                 removed_items: list[CafeteriaItem] = None):
+        self.__ids = array("q")
+        self.__prices = array("q")
+        self.__stock = array("q")
+        self.__names = []
+        self.__removed_rows = bytearray()
+        self.__removed_row_count = 0
+        self.__removed_items_by_id = {}
+        self.__name_slots = array("q", [EMPTY_SLOT]) * 8
+        self.__used_name_slot_count = 0
+        self.__shared_columns = set()
+        self.__version = 0
+        self.__changes = ChangeJournal()
+        for item in items or []:
+            self.append(item)
+        for item in removed_items or []:
+            self.__removed_items_by_id[item.Id] = item
+
+    def __iter__(self):
+        removed_rows = self.__removed_rows
+        for row, item_id in enumerate(self.__ids):
+            if not removed_rows[row]:
+                yield CafeteriaItemView(self, item_id)
+
+    def __len__(self):
+        return len(self.__ids) - self.__removed_row_count
+
+    def __getitem__(self, index: int):
+        self.__compact()
+        return CafeteriaItemView(self, self.__ids[index])
+
+    @property
+    def version(self):
+        """
+        int: A counter increased every time the menu or one of its items
+        changes.
+        """
+        return self.__version
+
+    @property
+    def last_change(self):
+        """
+        Union[tuple, object]: The last change of the menu, which cached views
+        keep to find the items changed since with get_changed_ids.
+        """
+        return self.__changes.last_change
+
+    def get_changed_ids(self, since):
+        """
+        Get the Ids of the items added, changed or removed after a change.
+        Args:
+            since (Union[tuple, object]): A change previously read from
+             last_change, of this menu or of the menu it was copied from.
+        Returns:
+            Union[list[int], None]: The Ids of the changed items, in the order
+            they were first changed, or None if the changes since are not
+            known, in which case the whole menu has to be read again.
+        """
+        return self.__changes.get_changed_ids(since)
+
+    def snapshot(self):
+        """
+        Create a copy of the menu that can be changed independently.
+        Returns:
+            CompactMenu: The copy of the menu. It shares the columns of this
+            menu until either menu changes them.
+        """
+        menu = CompactMenu.__new__(CompactMenu)
+        menu.__ids = self.__ids
+        menu.__prices = self.__prices
+        menu.__stock = self.__stock
+        menu.__names = self.__names
+        menu.__removed_rows = self.__removed_rows
+        menu.__removed_row_count = self.__removed_row_count
+        menu.__removed_items_by_id = self.__removed_items_by_id
+        menu.__name_slots = self.__name_slots
+        menu.__used_name_slot_count = self.__used_name_slot_count
+        menu.__shared_columns = set(COLUMNS)
+        menu.__version = self.__version
+        menu.__changes = self.__changes.copy()
+        self.__shared_columns = set(COLUMNS)
+        return menu
+
+    def get_by_id(self, item_id: int, include_removed: bool = False):
+        """
+        Retrieve a view of a cafeteria item by its Id.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+            include_removed (bool): A flag indicating whether items removed
+             from the menu can be returned as well.
+        Returns:
+            Union[CafeteriaItem, None]: A view of the cafeteria item with the
+            given Id, a copy of it if it was removed, or None if the menu
+            does not contain it.
+        """
+        if self.__find_row(item_id) is None:
+            if include_removed:
+                return self.__removed_items_by_id.get(item_id)
+            return None
+        return CafeteriaItemView(self, item_id)
+
+    def get_position(self, item_id: int):
+        """
+        Retrieve the position of a cafeteria item in display order.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+        Returns:
+            Union[int, None]: The zero-based position of the item, or None if
+            the menu does not contain it.
+        """
+        self.__compact()
+        return self.__find_row(item_id)
+
+    def iterate_range(self, start: int, stop: int):
+        """
+        Lazily iterate over the items between two positions in display order.
+        Args:
+            start (int): The zero-based position of the first item.
+            stop (int): The position after the last item.
+        Yields:
+            CafeteriaItemView: Views of the cafeteria items in the range.
+        """
+        self.__compact()
+        for row in range(max(start, 0), min(stop, len(self.__ids))):
+            yield CafeteriaItemView(self, self.__ids[row])
+
+    def get_by_name(self, item_name: str):
+        """
+        Retrieve a view of a cafeteria item by its name, ignoring case.
+        Args:
+            item_name (str): The name of the cafeteria item.
+        Returns:
+            Union[CafeteriaItemView, None]: A view of the cafeteria item with
+            the given name, or None if the menu does not contain it.
+        """
+        row = self.__name_slots[self.__find_name_slot(item_name)]
+        if row == EMPTY_SLOT:
+            return None
+        return CafeteriaItemView(self, self.__ids[row])
+
+    def contains_name(self, item_name: str):
+        """
+        Check whether an item with the given name exists, ignoring case.
+        Args:
+            item_name (str): The name to look for.
+        Returns:
+            bool: True if an item with the given name exists, False otherwise.
+        """
+        slot = self.__find_name_slot(item_name)
+        return self.__name_slots[slot] != EMPTY_SLOT
+
+    def append(self, item: CafeteriaItem):
+        """
+        Add a cafeteria item to the end of the menu.
+        Args:
+            item (CafeteriaItem): The cafeteria item to add. Its values are
+             copied into the menu's columns.
+        Raises:
+            ValueError: If the Id of the item is not greater than the Id of
+             the last item, or an item with the same name already exists.
+        """
+        if len(self.__ids) > 0 and item.Id <= self.__ids[-1]:
+            raise ValueError(f"The Id {item.Id} must be greater than "
+                             f"{self.__ids[-1]}")
+        slot = self.__find_name_slot(item.Name)
+        if self.__name_slots[slot] != EMPTY_SLOT:
+            raise ValueError(f"An item with the name {item.Name} already "
+                             f"exists")
+        self.__own_columns("Id", "Name", "Price", "Stock", "Removed",
+                           "NameSlots")
+        row = len(self.__ids)
+        self.__ids.append(item.Id)
+        self.__prices.append(item.Price)
+        self.__stock.append(item.Stock)
+        self.__names.append(sys.intern(item.Name))
+        self.__removed_rows.append(0)
+        self.__name_slots[slot] = row
+        self.__used_name_slot_count += 1
+        if self.__used_name_slot_count * 2 > len(self.__name_slots):
+            self.__rebuild_name_slots()
+        self.__changes.record(item.Id)
+        self.__version += 1
+
+    def remove(self, item_id: int):
+        """
+        Remove the cafeteria item with the given Id from the menu, keeping a
+        copy of it as a tombstone.
+        Args:
+            item_id (int): The Id of the cafeteria item to remove.
+        Returns:
+            Union[CafeteriaItem, None]: A copy of the removed cafeteria item,
+            or None if the menu does not contain it.
+        """
+        row = self.__find_row(item_id)
+        if row is None:
+            return None
+        item = CafeteriaItem(item_id, self.__names[row], self.__prices[row],
+                             self.__stock[row])
+        self.__own_columns("Removed", "NameSlots", "RemovedItems")
+        self.__name_slots[self.__find_name_slot(item.Name)] = DELETED_SLOT
+        self.__removed_rows[row] = 1
+        self.__removed_row_count += 1
+        self.__removed_items_by_id[item_id] = item
+        self.__changes.record(item_id)
+        self.__version += 1
+        return item
+
+    def rename(self, item: CafeteriaItem, item_name: str):
+        """
+        Change the name of a cafeteria item and update the name index.
+        Args:
+            item (CafeteriaItem): The cafeteria item to rename.
+            item_name (str): The new name of the cafeteria item.
+        Returns:
+            CafeteriaItemView: A view of the renamed cafeteria item.
+        Raises:
+            KeyError: If the menu does not contain the item.
+            ValueError: If another item already uses the new name.
+        """
+        row = self.__get_row(item.Id)
+        existing_row = self.__name_slots[self.__find_name_slot(item_name)]
+        if existing_row != EMPTY_SLOT and existing_row != row:
+            raise ValueError(f"An item with the name {item_name} already "
+                             f"exists")
+        self.__own_columns("Name", "NameSlots")
+        old_slot = self.__find_name_slot(self.__names[row])
+        self.__name_slots[old_slot] = DELETED_SLOT
+        self.__names[row] = sys.intern(item_name)
+        self.__name_slots[self.__find_name_slot(item_name)] = row
+        self.__used_name_slot_count += 1
+        if self.__used_name_slot_count * 2 > len(self.__name_slots):
+            self.__rebuild_name_slots()
+        self.__changes.record(item.Id)
+        self.__version += 1
+        return CafeteriaItemView(self, item.Id)
+
+    def set_stock(self, item: CafeteriaItem, stock: int):
+        """
+        Change the stock of a cafeteria item.
+        Args:
+            item (CafeteriaItem): The cafeteria item to update.
+            stock (int): The new stock of the cafeteria item.
+        Returns:
+            CafeteriaItemView: A view of the updated cafeteria item.
+        Raises:
+            KeyError: If the menu does not contain the item.
+        """
+        self.set_column_value(item.Id, "Stock", stock)
+        return CafeteriaItemView(self, item.Id)
+
+    def set_price(self, item: CafeteriaItem, price: int):
+        """
+        Change the price of a cafeteria item.
+        Args:
+            item (CafeteriaItem): The cafeteria item to update.
+            price (int): The new price of the cafeteria item, in pence.
+        Returns:
+            CafeteriaItemView: A view of the updated cafeteria item.
+        Raises:
+            KeyError: If the menu does not contain the item.
+        """
+        self.set_column_value(item.Id, "Price", price)
+        return CafeteriaItemView(self, item.Id)
+
+    def get_column_value(self, item_id: int, column: str):
+        """
+        Read the value of a column for a cafeteria item.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+            column (str): The column to read: Name, Price or Stock.
+        Returns:
+            Union[str, int]: The value of the column, read from the tombstone
+            of the item if it was removed from the menu.
+        Raises:
+            KeyError: If the menu never contained an item with the Id.
+        """
+        values = self.__get_column(column)
+        row = self.__find_row(item_id)
+        if row is not None:
+            return values[row]
+        item = self.__removed_items_by_id.get(item_id)
+        if item is None:
+            raise KeyError(f"The menu has no item with the Id {item_id}")
+        return getattr(item, column)
+
+    def set_column_value(self, item_id: int, column: str, value):
+        """
+        Write the value of the Price or Stock column for a cafeteria item.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+            column (str): The column to write: Price or Stock.
+            value (int): The new value of the column.
+        Raises:
+            KeyError: If the menu does not contain the item.
+        """
+        row = self.__get_row(item_id)
+        self.__own_columns(column)
+        self.__get_column(column)[row] = value
+        self.__changes.record(item_id)
+        self.__version += 1
+
+    def get_total_stock(self):
+        """
+        Calculate the total stock of every item on the menu.
+        Returns:
+            int: The sum of the Stock column.
+        """
+        self.__compact()
+        if numpy is not None and len(self.__stock) > 0:
+            stock = numpy.frombuffer(self.__stock, numpy.int64)
+            if self.__is_int64_sum(len(stock), 1, stock):
+                return int(stock.sum())
+        return sum(self.__stock)
+
+    def get_total_stock_value(self):
+        """
+        Calculate the total value of the stock of every item on the menu.
+        Returns:
+            int: The sum of the price multiplied by the stock of each item,
+            in pence.
+        """
+        self.__compact()
+        if numpy is not None and len(self.__stock) > 0:
+            prices = numpy.frombuffer(self.__prices, numpy.int64)
+            stock = numpy.frombuffer(self.__stock, numpy.int64)
+            if self.__is_int64_sum(len(stock), prices, stock):
+                return int(numpy.dot(prices, stock))
+        return sum(map(operator.mul, self.__prices, self.__stock))
+
+    def subtract_from_stocks(self, item_ids: list[int], amounts: list[int]):
+        """
+        Subtract quantities from the stock of several cafeteria items.
+        Args:
+            item_ids (list[int]): The Ids of the cafeteria items. An Id can
+             appear more than once, and all of its amounts are subtracted.
+            amounts (list[int]): The quantity to subtract for each item.
+        Raises:
+            KeyError: If the menu does not contain one of the items, in which
+             case no stock is changed.
+        """
+        if numpy is None:
+            rows = [self.__get_row(x) for x in item_ids]
+            self.__own_columns("Stock")
+            stock = self.__stock
+            for row, amount in zip(rows, amounts):
+                stock[row] -= amount
+        else:
+            rows = self.__get_rows(numpy.asarray(item_ids, numpy.int64))
+            self.__own_columns("Stock")
+            numpy.subtract.at(numpy.frombuffer(self.__stock, numpy.int64),
+                              rows, numpy.asarray(amounts, numpy.int64))
+        for item_id in item_ids:
+            self.__changes.record(item_id)
+        self.__version += 1
+
+    def __find_row(self, item_id: int):
+        """
+        Find the row of an item with a binary search over the Id column.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+        Returns:
+            Union[int, None]: The row of the item, or None if the menu does
+            not contain it or the item has been removed.
+        """
+        row = bisect_left(self.__ids, item_id)
+        if (row < len(self.__ids) and self.__ids[row] == item_id
+                and not self.__removed_rows[row]):
+            return row
+        return None
+
+    def __get_row(self, item_id: int):
+        """
+        Find the row of an item that must be on the menu.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+        Returns:
+            int: The row of the item.
+        Raises:
+            KeyError: If the menu does not contain the item or the item has
+             been removed.
+        """
+        row = self.__find_row(item_id)
+        if row is None:
+            raise KeyError(f"The menu has no item with the Id {item_id}")
+        return row
+
+    def __get_rows(self, item_ids):
+        """
+        Find the rows of several items that must be on the menu, with a
+        single vectorised binary search over the Id column.
+        Args:
+            item_ids (numpy.ndarray): The Ids of the cafeteria items.
+        Returns:
+            numpy.ndarray: The row of each item.
+        Raises:
+            KeyError: If the menu does not contain one of the items or it has
+             been removed.
+        """
+        ids = numpy.frombuffer(self.__ids, numpy.int64)
+        rows = numpy.searchsorted(ids, item_ids)
+        is_found = rows < len(ids)
+        is_found[is_found] = ids[rows[is_found]] == item_ids[is_found]
+        is_found[is_found] = numpy.frombuffer(
+            self.__removed_rows, numpy.uint8)[rows[is_found]] == 0
+        if not is_found.all():
+            item_id = int(item_ids[numpy.argmin(is_found)])
+            raise KeyError(f"The menu has no item with the Id {item_id}")
+        return rows
+
+    def __find_name_slot(self, item_name: str):
+        """
+        Find the slot of a name in the name hash table.
+        Args:
+            item_name (str): The name to look for.
+        Returns:
+            int: The slot holding the row of the item with the given name, or
+            the empty slot where that row should be stored. Slots of removed
+            items are skipped.
+        """
+        key = self.__name_key(item_name)
+        mask = len(self.__name_slots) - 1
+        slot = hash(key) & mask
+        while True:
+            row = self.__name_slots[slot]
+            if row == EMPTY_SLOT:
+                return slot
+            if (row != DELETED_SLOT
+                    and self.__name_key(self.__names[row]) == key):
+                return slot
+            slot = (slot + 1) & mask
+
+    def __get_column(self, column: str):
+        """
+        Get the storage of a column by its name.
+        Args:
+            column (str): The column name: Name, Price or Stock.
+        Returns:
+            Union[list[str], array]: The column storage.
+        """
+        if column == "Name":
+            return self.__names
+        if column == "Price":
+            return self.__prices
+        if column == "Stock":
+            return self.__stock
+        raise ValueError(f"Unknown column {column}")
+
+    def __own_columns(self, *columns: str):
+        """
+        Copy columns before they are changed, if they are shared with a
+        snapshot.
+        Args:
+            *columns (str): The names of the columns about to change.
+        """
+        for column in self.__shared_columns.intersection(columns):
+            if column == "Id":
+                self.__ids = self.__ids[:]
+            elif column == "Name":
+                self.__names = self.__names[:]
+            elif column == "Price":
+                self.__prices = self.__prices[:]
+            elif column == "Stock":
+                self.__stock = self.__stock[:]
+            elif column == "Removed":
+                self.__removed_rows = self.__removed_rows[:]
+            elif column == "NameSlots":
+                self.__name_slots = self.__name_slots[:]
+            elif column == "RemovedItems":
+                self.__removed_items_by_id = dict(self.__removed_items_by_id)
+            self.__shared_columns.discard(column)
+
+    def __rebuild_name_slots(self):
+        """
+        Rebuild the name hash table, with at least twice as many slots as
+        there are items, when it fills up with used and deleted slots or
+        after rows have moved.
+        """
+        size = 8
+        while size < len(self.__names) * 4:
+            size *= 2
+        self.__name_slots = array("q", [EMPTY_SLOT]) * size
+        self.__shared_columns.discard("NameSlots")
+        self.__used_name_slot_count = (len(self.__names)
+                                       - self.__removed_row_count)
+        for row, name in enumerate(self.__names):
+            if not self.__removed_rows[row]:
+                self.__name_slots[self.__find_name_slot(name)] = row
+
+    def __compact(self):
+        """
+        Drop the rows of removed items from the columns, so positions in
+        display order match rows again.
+        """
+        if self.__removed_row_count == 0:
+            return
+        live_rows = [row for row, is_removed in
+                     enumerate(self.__removed_rows) if not is_removed]
+        self.__ids = array("q", (self.__ids[x] for x in live_rows))
+        self.__prices = array("q", (self.__prices[x] for x in live_rows))
+        self.__stock = array("q", (self.__stock[x] for x in live_rows))
+        self.__names = [self.__names[x] for x in live_rows]
+        self.__removed_rows = bytearray(len(live_rows))
+        self.__removed_row_count = 0
+        self.__shared_columns.difference_update(
+            ("Id", "Name", "Price", "Stock", "Removed"))
+        self.__rebuild_name_slots()
+
+    @staticmethod
+    def __is_int64_sum(count: int, factors, values):
+        """
+        Check whether a sum of products can be computed with 64-bit integers
+        without overflowing.
+        Args:
+            count (int): The number of products added up.
+            factors (Union[int, numpy.ndarray]): The first factor of the
+             products.
+            values (numpy.ndarray): The second factor of the products.
+        Returns:
+            bool: True if the largest possible sum fits in 64 bits, so NumPy
+            gives the exact result, False otherwise.
+        """
+        largest_factor = int(numpy.abs(factors).max())
+        largest_value = int(numpy.abs(values).max())
+        return count * largest_factor * largest_value < 2 ** 63
+
+    @staticmethod
+    def __name_key(item_name: str):
+        """
+        Build the key used by the name index.
+        Args:
+            item_name (str): The name of a cafeteria item.
+        Returns:
+            str: The case-folded name, without surrounding whitespace.
+        """
+        return item_name.strip().casefold()
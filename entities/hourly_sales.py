@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class HourlySales:
+    """
+    Represents the sales of the cafeteria during an hour, rolled up from the
+    order log.
+
+    Attributes:
+        Hour (str): The UTC hour of the sales, as "YYYY-MM-DD HH:00".
+        OrderCount (int): The number of orders completed during the hour.
+        Quantity (int): The quantity of items sold during the hour.
+        GrossRevenue (int): The revenue of the hour, in pence, before
+         discounts.
+        Discount (int): The discount given by promotions during the hour, in
+         pence.
+    """
+    Hour: str
+    OrderCount: int
+    Quantity: int
+    GrossRevenue: int
+    Discount: int
+
+    @property
+    def NetRevenue(self):
+        """
+        int: The revenue of the hour, in pence, after discounts.
+        """
+        return self.GrossRevenue - self.Discount
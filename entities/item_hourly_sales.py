@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ItemHourlySales:
+    """
+    Represents the sales of a cafeteria item during an hour, rolled up from
+    the order log.
+
+    Attributes:
+        ItemId (int): The Id of the cafeteria item.
+        Hour (str): The UTC hour of the sales, as "YYYY-MM-DD HH:00".
+        Quantity (int): The quantity of the item sold during the hour.
+        GrossRevenue (int): The revenue of the item during the hour, in
+         pence, before discounts.
+    """
+    ItemId: int
+    Hour: str
+    Quantity: int
+    GrossRevenue: int
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ItemSales:
+    """
+    Represents the sales of a cafeteria item over a period, added up from
+    the sales rollups of the order log.
+
+    Attributes:
+        ItemId (int): The Id of the cafeteria item.
+        Quantity (int): The quantity of the item sold during the period.
+        GrossRevenue (int): The revenue of the item during the period, in
+         pence, before discounts.
+    """
+    ItemId: int
+    Quantity: int
+    GrossRevenue: int
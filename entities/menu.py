@@ -0,0 +1,364 @@
+from dataclasses import replace
+
+from entities.cafeteria_item import CafeteriaItem
+from infrastructure.helpers.change_journal import ChangeJournal
+
+CHUNK_BITS = 8
+
+
+class Menu:
+    """
+    Represents the cafeteria menu as an ordered collection of cafeteria items
+    backed by lookup indexes.
+
+    The Ids of the items are kept in display order in a dictionary, alongside
+    a dictionary mapping the case-folded item names to their Ids, so that
+    lookups, duplicate name checks, additions and removals do not need to
+    walk the whole menu. Item Ids are stable: they never change and are never
+    reused, and removed items are kept as tombstones, so carts and logs can
+    still refer to them. The display position of each item is a separate
+    mapping, rebuilt lazily when it is needed after a removal.
+    Every change to an item must go through this class, to keep the indexes
+    correct, to increase the version counter and to record the Id of the
+    item in a ChangeJournal, which lets cached views of the menu update only
+    the items that changed.
+
+    A menu can be copied cheaply with snapshot(). The items themselves are
+    stored in chunks of 256 consecutive Ids, and a snapshot only copies the
+    map of chunks. Both menus then share the chunks, items and indexes until
+    one of them changes: a price or stock change copies only the chunk and
+    the item it touches, while adding, renaming or removing an item copies
+    the indexes.
+    """
+    def __init__(self, items: list[CafeteriaItem] = None,
+                 removed_items: list[CafeteriaItem] = None):
+        self.__ids = {}
+        self.__ids_by_name = {}
+        self.__removed_items_by_id = {}
+        self.__display_order = []
+        self.__positions_by_id = None
+        self.__chunks = {}
+        self.__owned_chunk_keys = set()
+        self.__owned_item_ids = set()
+        self.__is_shared = False
+        self.__version = 0
+        self.__changes = ChangeJournal()
+        for item in items or []:
+            self.append(item)
+        for item in removed_items or []:
+            self.__removed_items_by_id[item.Id] = item
+
+    def __iter__(self):
+        chunks = self.__chunks
+        for item_id in self.__ids:
+            yield chunks[item_id >> CHUNK_BITS][item_id]
+
+    def __len__(self):
+        return len(self.__ids)
+
+    def __getitem__(self, position: int):
+        return self.__get_item(self.__get_display_order()[position])
+
+    @property
+    def version(self):
+        """
+        int: A counter increased every time the menu or one of its items
+        changes.
+        """
+        return self.__version
+
+    @property
+    def last_change(self):
+        """
+        Union[tuple, object]: The last change of the menu, which cached views
+        keep to find the items changed since with get_changed_ids.
+        """
+        return self.__changes.last_change
+
+    def get_changed_ids(self, since):
+        """
+        Get the Ids of the items added, changed or removed after a change.
+        Args:
+            since (Union[tuple, object]): A change previously read from
+             last_change, of this menu or of the menu it was copied from.
+        Returns:
+            Union[list[int], None]: The Ids of the changed items, in the order
+            they were first changed, or None if the changes since are not
+            known, in which case the whole menu has to be read again.
+        """
+        return self.__changes.get_changed_ids(since)
+
+    def snapshot(self):
+        """
+        Create a copy of the menu that can be changed independently.
+        Returns:
+            Menu: The copy of the menu. It shares the chunks, items and
+            indexes of this menu until either menu changes them.
+        """
+        menu = Menu.__new__(Menu)
+        menu.__ids = self.__ids
+        menu.__ids_by_name = self.__ids_by_name
+        menu.__removed_items_by_id = self.__removed_items_by_id
+        menu.__display_order = self.__display_order
+        menu.__positions_by_id = self.__positions_by_id
+        menu.__chunks = dict(self.__chunks)
+        menu.__owned_chunk_keys = set()
+        menu.__owned_item_ids = set()
+        menu.__is_shared = True
+        menu.__version = self.__version
+        menu.__changes = self.__changes.copy()
+        self.__owned_chunk_keys = set()
+        self.__owned_item_ids = set()
+        self.__is_shared = True
+        return menu
+
+    def get_by_id(self, item_id: int, include_removed: bool = False):
+        """
+        Retrieve a cafeteria item by its Id.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+            include_removed (bool): A flag indicating whether items removed
+             from the menu can be returned as well.
+        Returns:
+            Union[CafeteriaItem, None]: The cafeteria item with the given Id,
+            or None if the menu does not contain it.
+        """
+        if item_id in self.__ids:
+            return self.__get_item(item_id)
+        if include_removed:
+            return self.__removed_items_by_id.get(item_id)
+        return None
+
+    def get_position(self, item_id: int):
+        """
+        Retrieve the position of a cafeteria item in display order.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+        Returns:
+            Union[int, None]: The zero-based position of the item, or None if
+            the menu does not contain it.
+        """
+        if self.__positions_by_id is None:
+            self.__positions_by_id = {
+                x: position for position, x in
+                enumerate(self.__get_display_order())}
+        return self.__positions_by_id.get(item_id)
+
+    def iterate_range(self, start: int, stop: int):
+        """
+        Lazily iterate over the items between two positions in display order.
+        Args:
+            start (int): The zero-based position of the first item.
+            stop (int): The position after the last item.
+        Yields:
+            CafeteriaItem: The cafeteria items in the range.
+        """
+        display_order = self.__get_display_order()
+        for position in range(max(start, 0), min(stop, len(display_order))):
+            yield self.__get_item(display_order[position])
+
+    def get_by_name(self, item_name: str):
+        """
+        Retrieve a cafeteria item by its name, ignoring case.
+        Args:
+            item_name (str): The name of the cafeteria item.
+        Returns:
+            Union[CafeteriaItem, None]: The cafeteria item with the given name,
+            or None if the menu does not contain it.
+        """
+        item_id = self.__ids_by_name.get(self.__name_key(item_name))
+        return None if item_id is None else self.__get_item(item_id)
+
+    def contains_name(self, item_name: str):
+        """
+        Check whether an item with the given name exists, ignoring case.
+        Args:
+            item_name (str): The name to look for.
+        Returns:
+            bool: True if an item with the given name exists, False otherwise.
+        """
+        return self.__name_key(item_name) in self.__ids_by_name
+
+    def append(self, item: CafeteriaItem):
+        """
+        Add a cafeteria item to the end of the menu.
+        Args:
+            item (CafeteriaItem): The cafeteria item to add.
+        Raises:
+            ValueError: If an item with the same Id or name already exists.
+        """
+        if item.Id in self.__ids:
+            raise ValueError(f"An item with the Id {item.Id} already exists")
+        if self.contains_name(item.Name):
+            raise ValueError(f"An item with the name {item.Name} already "
+                             f"exists")
+        self.__own_indexes()
+        self.__ids[item.Id] = None
+        self.__ids_by_name[self.__name_key(item.Name)] = item.Id
+        self.__get_owned_chunk(item.Id)[item.Id] = item
+        self.__owned_item_ids.add(item.Id)
+        if self.__display_order is not None:
+            if self.__positions_by_id is not None:
+                self.__positions_by_id[item.Id] = len(self.__display_order)
+            self.__display_order.append(item.Id)
+        self.__changes.record(item.Id)
+        self.__version += 1
+
+    def remove(self, item_id: int):
+        """
+        Remove the cafeteria item with the given Id from the menu, keeping it
+        as a tombstone.
+        Args:
+            item_id (int): The Id of the cafeteria item to remove.
+        Returns:
+            Union[CafeteriaItem, None]: The removed cafeteria item, or None if
+            the menu does not contain it.
+        """
+        if item_id not in self.__ids:
+            return None
+        self.__own_indexes()
+        item = self.__get_owned_chunk(item_id).pop(item_id)
+        del self.__ids[item_id]
+        del self.__ids_by_name[self.__name_key(item.Name)]
+        self.__owned_item_ids.discard(item_id)
+        self.__removed_items_by_id[item_id] = item
+        self.__display_order = None
+        self.__positions_by_id = None
+        self.__changes.record(item_id)
+        self.__version += 1
+        return item
+
+    def rename(self, item: CafeteriaItem, item_name: str):
+        """
+        Change the name of a cafeteria item and update the name index.
+        Args:
+            item (CafeteriaItem): The cafeteria item to rename.
+            item_name (str): The new name of the cafeteria item.
+        Returns:
+            CafeteriaItem: The renamed cafeteria item.
+        Raises:
+            ValueError: If another item already uses the new name.
+        """
+        existing_item_id = self.__ids_by_name.get(self.__name_key(item_name))
+        if existing_item_id is not None and existing_item_id != item.Id:
+            raise ValueError(f"An item with the name {item_name} already "
+                             f"exists")
+        self.__own_indexes()
+        item = self.__get_owned_item(item.Id)
+        del self.__ids_by_name[self.__name_key(item.Name)]
+        item.Name = item_name
+        self.__ids_by_name[self.__name_key(item.Name)] = item.Id
+        self.__changes.record(item.Id)
+        self.__version += 1
+        return item
+
+    def set_stock(self, item: CafeteriaItem, stock: int):
+        """
+        Change the stock of a cafeteria item.
+        Args:
+            item (CafeteriaItem): The cafeteria item to update.
+            stock (int): The new stock of the cafeteria item.
+        Returns:
+            CafeteriaItem: The updated cafeteria item, which is a copy of the
+            given item if that item is shared with a snapshot.
+        """
+        item = self.__get_owned_item(item.Id)
+        item.Stock = stock
+        self.__changes.record(item.Id)
+        self.__version += 1
+        return item
+
+    def set_price(self, item: CafeteriaItem, price: int):
+        """
+        Change the price of a cafeteria item.
+        Args:
+            item (CafeteriaItem): The cafeteria item to update.
+            price (int): The new price of the cafeteria item, in pence.
+        Returns:
+            CafeteriaItem: The updated cafeteria item, which is a copy of the
+            given item if that item is shared with a snapshot.
+        """
+        item = self.__get_owned_item(item.Id)
+        item.Price = price
+        self.__changes.record(item.Id)
+        self.__version += 1
+        return item
+
+    def __get_item(self, item_id: int):
+        """
+        Get a cafeteria item on the menu from its chunk.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+        Returns:
+            CafeteriaItem: The cafeteria item.
+        """
+        return self.__chunks[item_id >> CHUNK_BITS][item_id]
+
+    def __get_owned_chunk(self, item_id: int):
+        """
+        Get the chunk of an Id, copying it first if it is shared with a
+        snapshot.
+        Args:
+            item_id (int): The Id of a cafeteria item.
+        Returns:
+            dict[int, CafeteriaItem]: The chunk, which this menu can change.
+        """
+        chunk_key = item_id >> CHUNK_BITS
+        if chunk_key not in self.__owned_chunk_keys:
+            self.__chunks[chunk_key] = dict(self.__chunks.get(chunk_key, {}))
+            self.__owned_chunk_keys.add(chunk_key)
+        return self.__chunks[chunk_key]
+
+    def __get_owned_item(self, item_id: int):
+        """
+        Get a cafeteria item on the menu, copying it first if it is shared
+        with a snapshot.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+        Returns:
+            CafeteriaItem: The cafeteria item, which this menu can change.
+        """
+        if item_id in self.__owned_item_ids:
+            return self.__get_item(item_id)
+        chunk = self.__get_owned_chunk(item_id)
+        item = chunk[item_id] = replace(chunk[item_id])
+        self.__owned_item_ids.add(item_id)
+        return item
+
+    def __own_indexes(self):
+        """
+        Copy the Id and name indexes, the tombstones and the display order
+        before they are changed, if they are shared with a snapshot.
+        """
+        if not self.__is_shared:
+            return
+        self.__ids = dict(self.__ids)
+        self.__ids_by_name = dict(self.__ids_by_name)
+        self.__removed_items_by_id = dict(self.__removed_items_by_id)
+        if self.__display_order is not None:
+            self.__display_order = list(self.__display_order)
+        if self.__positions_by_id is not None:
+            self.__positions_by_id = dict(self.__positions_by_id)
+        self.__is_shared = False
+
+    def __get_display_order(self):
+        """
+        Get the Ids of the items in display order, rebuilding the mapping if
+        an item was removed since it was last built.
+        Returns:
+            list[int]: The Ids of the items in display order.
+        """
+        if self.__display_order is None:
+            self.__display_order = list(self.__ids)
+        return self.__display_order
+
+    @staticmethod
+    def __name_key(item_name: str):
+        """
+        Build the key used by the name index.
+        Args:
+            item_name (str): The name of a cafeteria item.
+        Returns:
+            str: The case-folded name, without surrounding whitespace.
+        """
+        return item_name.strip().casefold()
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+
+from entities.cafeteria_item import CafeteriaItem
+
+
+@dataclass
+class Order:
+    """
+    Represents a completed order, as recorded in the order log.
+
+    Attributes:
+        Id (int): The position of the order in the order log.
+        CreatedAt (str): The UTC date and time the order was completed.
+        Lines (list[CafeteriaItem]): The lines of the order, each a copy of
+         a CafeteriaItem whose Stock holds the quantity ordered.
+        TotalQuantity (int): The total quantity of items in the order.
+        TotalPrice (int): The price paid for the order, in pence, after
+         discounts.
+        TotalDiscount (int): The discount given by promotions, in pence.
+    """
+    Id: int
+    CreatedAt: str
+    Lines: list[CafeteriaItem]
+    TotalQuantity: int
+    TotalPrice: int
+    TotalDiscount: int
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+
+from infrastructure.enums.enum_promotion_type import PromotionType
+
+
+@dataclass
+class Promotion:
+    """
+    Represents a promotion on some of the cafeteria items.
+
+    Attributes:
+        Id (int): A unique identifier for the promotion.
+        Name (str): The name of the promotion shown to the user.
+        Type (PromotionType): The kind of promotion.
+        ItemIds (list[int]): The Ids of the cafeteria items the promotion
+         applies to. For a meal deal, these are the items of the deal.
+        Quantity (int): The number of items of the same kind sold together by
+         a multi-buy promotion.
+        Value (int): The price in pence of a multi-buy or a meal deal, or the
+         percentage taken off by a percentage promotion.
+    """
+    Id: int
+    Name: str
+    Type: PromotionType
+    ItemIds: list[int]
+    Quantity: int
+    Value: int
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+
+from infrastructure.enums.enum_stock_movement_type import StockMovementType
+
+
+@dataclass
+class StockMovement:
+    """
+    Represents an entry of the stock movement ledger.
+
+    Attributes:
+        Id (int): The position of the movement in the ledger.
+        ItemId (int): The Id of the cafeteria item whose stock changed.
+        Type (StockMovementType): The reason for the change.
+        Quantity (int): The change in stock, negative when stock was taken.
+        Stock (int): The stock of the item after the change.
+        CreatedAt (str): The UTC date and time of the change.
+    """
+    Id: int
+    ItemId: int
+    Type: StockMovementType
+    Quantity: int
+    Stock: int
+    CreatedAt: str
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from typing import Union
+
+
+@dataclass
+class StockTurnover:
+    """
+    Represents how many times the stock of a cafeteria item was sold over a
+    period.
+
+    Attributes:
+        ItemId (int): The Id of the cafeteria item.
+        QuantitySold (int): The quantity of the item sold during the period.
+        OpeningStock (int): The stock of the item at the start of the period.
+        ClosingStock (int): The stock of the item at the end of the period.
+        Turnover (Union[float, None]): The quantity sold divided by the
+         average of the opening and closing stock, or None if the item had
+         no stock at either end of the period.
+    """
+    ItemId: int
+    QuantitySold: int
+    OpeningStock: int
+    ClosingStock: int
+    Turnover: Union[float, None]
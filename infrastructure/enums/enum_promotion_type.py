@@ -0,0 +1,16 @@
+from enum import Enum
+
+
+class PromotionType(Enum):
+    """
+    Enumerates the kinds of promotion that can apply to a cart.
+
+    Attributes:
+        MultiBuy (str): Every Quantity items of the same kind cost Value
+         pence, such as 3 for £5.00.
+        Percentage (str): Value percent off the price of the items.
+        MealDeal (str): One of each of the items costs Value pence together.
+    """
+    MultiBuy = 'multi_buy'
+    Percentage = 'percentage'
+    MealDeal = 'meal_deal'
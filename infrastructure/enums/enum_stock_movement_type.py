@@ -0,0 +1,22 @@
+from enum import Enum
+
+
+class StockMovementType(Enum):
+    """
+    Enumerates the reasons the stock of a cafeteria item can change.
+
+    Attributes:
+        Order (str): Stock taken by a customer's order.
+        Removal (str): Stock given back when a customer removes an item from
+         their cart.
+        Release (str): Stock given back when a customer leaves without
+         completing their order.
+        Adjustment (str): Stock added or taken by an admin changing the
+         stock of an item.
+        Restock (str): Stock brought in with a new item on the menu.
+    """
+    Order = 'order'
+    Removal = 'removal'
+    Release = 'release'
+    Adjustment = 'adjustment'
+    Restock = 'restock'
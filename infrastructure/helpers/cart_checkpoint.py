@@ -0,0 +1,67 @@
+from entities.cart import Cart
+from infrastructure.helpers.cart_serializer import CartSerializer
+from infrastructure.repositories.cart_checkpoint_repository import (
+    CartCheckpointRepository)
+
+
+class CartCheckpoint:
+    """
+    Helper class keeping the last saved state of the cart of a session,
+    so the session can carry on with the same cart when its flow has to be
+    started again.
+
+    The cart is saved encoded with CartSerializer, so the checkpoint is a
+    compact copy that never shares lines with the cart being changed, and
+    restoring it gives a new cart.
+
+    When the checkpoint is given a repository, every saved cart is also
+    written to the database under the code of the session, and the cart
+    saved there is loaded when the checkpoint is created, so the session
+    can carry on with its cart after the process serving it was restarted.
+    Without a repository, the cart is only kept in memory.
+
+    Attributes:
+        data (Union[bytes, None]): The encoded cart, or None if no cart is
+         saved.
+        repository (Union[CartCheckpointRepository, None]): The repository
+         the cart is saved to, if any.
+        session_code (Union[str, None]): The code of the session the cart is
+         saved under in the repository.
+    """
+    def __init__(self, repository: CartCheckpointRepository = None,
+                 session_code: str = None):
+        self.repository = repository
+        self.session_code = session_code
+        self.data = None
+        if repository is not None:
+            self.data = repository.load_checkpoint(session_code)
+
+    def save(self, cart: Cart):
+        """
+        Save the current state of a cart, replacing the previous one.
+        Args:
+            cart (Cart): The cart to save.
+        """
+        self.data = CartSerializer.encode(cart)
+        if self.repository is not None:
+            self.repository.save_checkpoint(self.session_code, self.data)
+
+    def restore(self):
+        """
+        Restore the saved cart.
+        Returns:
+            Union[Cart, None]: A copy of the saved cart, or None if no cart is
+            saved.
+        """
+        if self.data is None:
+            return None
+        return CartSerializer.decode(self.data)
+
+    def clear(self):
+        """
+        Forget the saved cart, once its order is completed or its stock has
+        been given back.
+        """
+        self.data = None
+        if self.repository is not None:
+            self.repository.delete_checkpoint(self.session_code)
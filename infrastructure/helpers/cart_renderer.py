@@ -0,0 +1,110 @@
+from entities.cafeteria_item import CafeteriaItem
+from entities.cart import Cart
+from infrastructure.helpers.price_converter import PriceConverter
+from infrastructure.helpers.table_formatter import TableFormatter
+
+CART_TABLE_HEADERS = ["ID", "Name", "Price", "Quantity"]
+MAX_CACHED_LINES = 1024
+
+
+class CartRenderer:
+    """
+    Helper class rendering a cart, either as a table of its lines followed by
+    its total, or as a short summary listing its lines.
+
+    Every rendering is built into a single string, so it can be written to
+    the output with a single call, instead of printing the cart line by
+    line. The cells and the formatted summary and table lines of every cart
+    line are cached against its Id, name, price and quantity, so rendering a
+    cart again only formats the lines that changed since the last rendering.
+    A cached table line is reused as long as the column widths of the table
+    stay the same.
+
+    Attributes:
+        price_converter (PriceConverter): The converter formatting the prices.
+    """
+    def __init__(self, price_converter: PriceConverter = None):
+        self.price_converter = price_converter or PriceConverter()
+        self.__lines = {}
+
+    def render_table(self, cart: Cart):
+        """
+        Render a cart as a table of its lines, followed by the savings from
+        promotions, if any, and its total price.
+        Args:
+            cart (Cart): The cart to render.
+        Returns:
+            str: The rendered cart.
+        """
+        lines = [self.__get_line(x) for x in cart.Items]
+        widths = TableFormatter.calculate_widths(
+            CART_TABLE_HEADERS, (line[0] for line in lines))
+        separator = TableFormatter.format_separator(widths)
+        text = [separator,
+                TableFormatter.format_line(CART_TABLE_HEADERS, widths),
+                separator]
+        for line in lines:
+            if line[3] != widths:
+                line[2] = TableFormatter.format_line(line[0], widths)
+                line[3] = widths
+            text.append(line[2])
+        text.append(separator)
+        if cart.TotalDiscount > 0:
+            text.append(f"Your promotions save you: "
+                        f"{self.__format_money(cart.TotalDiscount)}")
+        text.append(f"Your cart total is: "
+                    f"{self.__format_money(cart.TotalPrice)}")
+        return "\n".join(text)
+
+    def render_summary(self, cart: Cart):
+        """
+        Render a cart as its total quantity, total discount if promotions
+        apply, and total price, followed by a line for each of its items.
+        Args:
+            cart (Cart): The cart to render.
+        Returns:
+            str: The rendered cart.
+        """
+        text = ["Your current order: ",
+                f"Total Quantity: {cart.TotalQuantity}"]
+        if cart.TotalDiscount > 0:
+            text.append(f"Total Discount: "
+                        f"{self.__format_money(cart.TotalDiscount)}")
+        text.append(f"Total Price: {self.__format_money(cart.TotalPrice)}")
+        text.extend(self.__get_line(x)[1] for x in cart.Items)
+        return "\n".join(text)
+
+    def __get_line(self, item: CafeteriaItem):
+        """
+        Get the cached rendering of a cart line, formatting it if the line is
+        not cached yet.
+        Args:
+            item (CafeteriaItem): The cart line, with its Stock holding the
+             quantity.
+        Returns:
+            list: The table cells of the line, its summary line, its table
+            line and the column widths the table line was formatted for.
+        """
+        key = (item.Id, item.Name, item.Price, item.Stock)
+        line = self.__lines.get(key)
+        if line is None:
+            if len(self.__lines) >= MAX_CACHED_LINES:
+                self.__lines.clear()
+            line = [[str(item.Id), item.Name,
+                     self.price_converter.format_money(item.Price, True),
+                     str(item.Stock)],
+                    f"{item.Id}. {item.Name} - "
+                    f"{self.__format_money(item.Price)} - x{item.Stock}",
+                    None, None]
+            self.__lines[key] = line
+        return line
+
+    def __format_money(self, price: int):
+        """
+        Format a price in pence as an amount of money for display.
+        Args:
+            price (int): The price in pence.
+        Returns:
+            str: The formatted amount, with its currency symbol.
+        """
+        return self.price_converter.format_money(price)
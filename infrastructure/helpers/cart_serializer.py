@@ -0,0 +1,96 @@
+import struct
+
+from entities.cafeteria_item import CafeteriaItem
+from entities.cart import Cart
+
+CART_FORMAT_MAGIC = b"WC"
+CART_FORMAT_VERSION = 1
+NAME_SEPARATOR = "\0"
+
+HEADER = struct.Struct("<2sBqqII")
+LINE = struct.Struct("<III")
+DISCOUNT = struct.Struct("<Iq")
+
+
+class CartSerializer:
+    """
+    Helper class converting carts to and from a compact binary format, so a
+    cart can be saved after every change and restored by another worker.
+
+    The format starts with a header holding the magic bytes "WC", the
+    version of the format, the total quantity and total price of the cart,
+    and the number of lines and discounts. It is followed by a 12-byte
+    record for every line (the item Id, price and quantity as unsigned
+    32-bit integers), a 12-byte record for every discount (the promotion Id
+    and the amount), and finally the UTF-8 names of the items, separated by
+    NUL characters, which item names never contain. All numbers are
+    little-endian. Keeping the names apart from the fixed-size records lets
+    the records be unpacked in bulk by the struct module and the names be
+    decoded with a single call.
+
+    Decoding checks the magic bytes and the version, so a cart saved in a
+    format this version of the application does not know is rejected
+    instead of being misread.
+    """
+    @staticmethod
+    def encode(cart: Cart):
+        """
+        Convert a cart to bytes.
+        Args:
+            cart (Cart): The cart to convert.
+        Returns:
+            bytes: The encoded cart.
+        Raises:
+            struct.error: If an Id, price or quantity does not fit in the
+             format.
+        """
+        lines = cart.Lines.values()
+        parts = [HEADER.pack(CART_FORMAT_MAGIC, CART_FORMAT_VERSION,
+                             cart.TotalQuantity, cart.TotalPrice, len(lines),
+                             len(cart.Discounts))]
+        parts.extend(LINE.pack(line.Id, line.Price, line.Stock)
+                     for line in lines)
+        parts.extend(DISCOUNT.pack(promotion_id, discount) for
+                     promotion_id, discount in cart.Discounts.items())
+        parts.append(NAME_SEPARATOR.join(line.Name for line in lines)
+                     .encode())
+        return b"".join(parts)
+
+    @staticmethod
+    def decode(data: bytes):
+        """
+        Convert bytes created by encode back to a cart.
+        Args:
+            data (bytes): The encoded cart.
+        Returns:
+            Cart: The decoded cart, with its lines in the order they were
+            encoded.
+        Raises:
+            ValueError: If the data is not an encoded cart, or was encoded
+             with an unknown version of the format.
+        """
+        if len(data) < HEADER.size:
+            raise ValueError("The data is too short to be a cart")
+        (magic, version, total_quantity, total_price, line_count,
+         discount_count) = HEADER.unpack_from(data)
+        if magic != CART_FORMAT_MAGIC:
+            raise ValueError("The data is not a cart")
+        if version != CART_FORMAT_VERSION:
+            raise ValueError(f"Version {version} of the cart format is not "
+                             f"supported")
+        lines_start = HEADER.size
+        discounts_start = lines_start + line_count * LINE.size
+        names_start = discounts_start + discount_count * DISCOUNT.size
+        if len(data) < names_start:
+            raise ValueError("The data of the cart is truncated")
+        view = memoryview(data)
+        names = str(view[names_start:], "utf-8").split(NAME_SEPARATOR)
+        if len(names) != max(line_count, 1):
+            raise ValueError("The names of the cart do not match its lines")
+        lines = {item_id: CafeteriaItem(item_id, name, price, quantity)
+                 for (item_id, price, quantity), name in
+                 zip(LINE.iter_unpack(view[lines_start:discounts_start]),
+                     names)}
+        discounts = dict(DISCOUNT.iter_unpack(
+            view[discounts_start:names_start]))
+        return Cart(lines, total_quantity, total_price, discounts)
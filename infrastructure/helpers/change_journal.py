@@ -0,0 +1,68 @@
+MAX_CHANGE_COUNT = 4096
+
+
+class ChangeJournal:
+    """
+    Helper class recording which items of a menu changed, so cached views of
+    the menu can update those items only.
+
+    Every change is recorded as a node holding the Id of the changed item
+    and the previous node, and the journal only keeps the last node. Nodes
+    never change, so a snapshot of a menu copies the journal by sharing its
+    last node, and the two journals then grow apart. A view remembers the
+    last change it has seen, and finds the items changed since then by
+    walking back from the last change of the menu until it meets it. After
+    MAX_CHANGE_COUNT changes the journal starts a new chain of nodes, so it
+    never keeps more than that many, and a view that last saw a change of an
+    older chain has to be rebuilt.
+
+    Attributes:
+        last_change (Union[tuple, object]): The last change recorded, as the
+         Id of the item, the previous change and the number of changes in
+         the chain, or the marker starting the chain if no change was
+         recorded yet.
+    """
+    def __init__(self, last_change=None):
+        self.last_change = last_change or object()
+
+    def copy(self):
+        """
+        Create a copy of the journal that can record changes independently.
+        Returns:
+            ChangeJournal: The copy, sharing the changes recorded so far.
+        """
+        return ChangeJournal(self.last_change)
+
+    def record(self, item_id: int):
+        """
+        Record a change of an item.
+        Args:
+            item_id (int): The Id of the item that was added, changed or
+             removed.
+        """
+        last_change = self.last_change
+        count = last_change[2] if isinstance(last_change, tuple) else 0
+        if count >= MAX_CHANGE_COUNT:
+            last_change = object()
+            count = 0
+        self.last_change = (item_id, last_change, count + 1)
+
+    def get_changed_ids(self, since):
+        """
+        Get the Ids of the items changed after a change.
+        Args:
+            since (Union[tuple, object]): A change previously read from
+             last_change.
+        Returns:
+            Union[list[int], None]: The Ids of the items changed since, each
+            once, in the order they were first changed, or None if the change
+            is not in the chain of this journal.
+        """
+        item_ids = []
+        change = self.last_change
+        while change is not since:
+            if not isinstance(change, tuple):
+                return None
+            item_ids.append(change[0])
+            change = change[1]
+        return list(dict.fromkeys(reversed(item_ids)))
@@ -27,13 +27,28 @@ class ColorHelper:
                 f'{Fore.RESET})')
 
     @staticmethod
-    def color_add_update_remove_exit_text():
+    def color_next_previous_text():
         """
-        Return colored text for 'Add', 'Update', 'Remove', and 'Exit' options.
+        Return colored text for 'Next' and 'Prev' options.
+        Returns:
+            str: Colored text representing 'Next' in light green and 'Prev'
+             in light cyan.
+        """
+        return (f'({Fore.LIGHTGREEN_EX}Next{Fore.RESET}/{Fore.LIGHTCYAN_EX}'
+                f'Prev{Fore.RESET})')
+
+    @staticmethod
+    def color_add_update_remove_import_export_exit_text():
+        """
+        Return colored text for 'Add', 'Update', 'Remove', 'Import', 'Export'
+        and 'Exit' options.
         Returns:
             str: Colored text representing 'Add' in light green, 'Update' in
-             light cyan, 'Remove' in red, and 'Exit' in bright style.
+             light cyan, 'Remove' in red, 'Import' and 'Export' in light
+             yellow, and 'Exit' in bright style.
         """
         return (f'({Fore.LIGHTGREEN_EX}Add{Fore.RESET}/{Fore.LIGHTCYAN_EX}'
                 f'Update{Fore.RESET}/{Fore.RED}Remove{Fore.RESET}'
+                f'/{Fore.LIGHTYELLOW_EX}Import{Fore.RESET}'
+                f'/{Fore.LIGHTYELLOW_EX}Export{Fore.RESET}'
                 f'/{Style.BRIGHT}Exit{Style.RESET_ALL}) ')
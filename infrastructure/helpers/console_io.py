@@ -0,0 +1,29 @@
+import sys
+
+from infrastructure.helpers.io_port import IOPort
+
+
+class ConsoleIO(IOPort):
+    """
+    Input and output through the terminal, with the standard input and
+    output of the process. This is the default of every flow.
+    """
+    def input(self, prompt: str = ""):
+        """
+        Write a prompt to the terminal and read a line typed by the user.
+        Args:
+            prompt (str): The text written before reading.
+        Returns:
+            str: The line read, without its trailing newline.
+        Raises:
+            EOFError: If the standard input is closed.
+        """
+        return input(prompt)
+
+    def write(self, text: str):
+        """
+        Write text to the terminal.
+        Args:
+            text (str): The text to write.
+        """
+        sys.stdout.write(text)
@@ -0,0 +1,62 @@
+from infrastructure.enums.enum_stock_movement_type import StockMovementType
+from infrastructure.helpers.striped_lock import STRIPE_COUNT, StripedLock
+from infrastructure.repositories.menu_repository import MenuRepository
+
+
+class Inventory:
+    """
+    Helper class taking stock from and giving stock back to the cafeteria
+    items, safely from many threads at once.
+
+    Taking stock is an atomic check-and-decrement done by the database, so
+    an order can never take more stock than is left, even when other
+    threads or processes order the same item at the same time. Within a
+    process, orders for the same item are also serialised by a per-item lock
+    out of a striped set, so they queue on the lock instead of retrying on
+    the database's busy timeout, while orders for different items rarely
+    wait for each other, only when their items share a stripe. An inventory
+    holds no connection itself: every thread passes its own MenuRepository,
+    so a single inventory can be shared by every session of a SessionHost.
+    """
+    def __init__(self, stripe_count: int = STRIPE_COUNT):
+        self.__locks = StripedLock(stripe_count)
+
+    def take(self, menu_repository: MenuRepository, item_id: int,
+             amount: int,
+             movement_type: StockMovementType = StockMovementType.Order):
+        """
+        Take stock from a cafeteria item, if it has enough stock left.
+        Args:
+            menu_repository (MenuRepository): The repository of the calling
+             thread.
+            item_id (int): The Id of the cafeteria item.
+            amount (int): The quantity to take.
+            movement_type (StockMovementType): The reason for the change.
+        Returns:
+            Union[int, None]: The remaining stock, or None if the item does
+            not exist or has less stock than the amount, in which case no
+            stock is taken.
+        """
+        with self.__locks.get_lock(item_id):
+            return menu_repository.subtract_stock(item_id, amount,
+                                                  movement_type)
+
+    def give_back(self, menu_repository: MenuRepository, item_id: int,
+                  amount: int,
+                  movement_type: StockMovementType =
+                  StockMovementType.Removal):
+        """
+        Give stock back to a cafeteria item, such as when a customer removes
+        it from their cart.
+        Args:
+            menu_repository (MenuRepository): The repository of the calling
+             thread.
+            item_id (int): The Id of the cafeteria item.
+            amount (int): The quantity to give back.
+            movement_type (StockMovementType): The reason for the change.
+        Returns:
+            Union[int, None]: The new stock, or None if the item does not
+            exist.
+        """
+        with self.__locks.get_lock(item_id):
+            return menu_repository.add_stock(item_id, amount, movement_type)
@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+
+
+class IOPort(ABC):
+    """
+    Base class for the input and output of the flows and validators of the
+    application, so the same flows can be driven by a terminal, a network
+    connection or a script.
+
+    Implementations read a line with input and write text with write. The
+    print method builds its whole output into a single string, so every
+    call is a single write.
+    """
+    @abstractmethod
+    def input(self, prompt: str = ""):
+        """
+        Write a prompt and read a line of input.
+        Args:
+            prompt (str): The text written before reading.
+        Returns:
+            str: The line read, without its trailing newline.
+        Raises:
+            EOFError: If there is no more input.
+        """
+
+    @abstractmethod
+    def write(self, text: str):
+        """
+        Write text to the output.
+        Args:
+            text (str): The text to write.
+        """
+
+    def print(self, *values, sep: str = " ", end: str = "\n"):
+        """
+        Write values to the output, like the built-in print function.
+        Args:
+            *values: The values to write.
+            sep (str): The text written between the values.
+            end (str): The text written after the last value.
+        """
+        self.write(sep.join(str(x) for x in values) + end)
@@ -9,6 +9,9 @@ class JsonFileHelper:
     """
     @staticmethod
     def read_from_config_file():
-        config_file = open("./creds.json")
-        data = json.load(config_file)
-        return data
+        return JsonFileHelper.read_from_file("./creds.json")
+
+    @staticmethod
+    def read_from_file(file_path: str):
+        with open(file_path) as file:
+            return json.load(file)
@@ -0,0 +1,292 @@
+import heapq
+from bisect import bisect_left, insort
+
+from entities.cafeteria_item import CafeteriaItem
+
+NGRAM_LENGTH = 3
+RANK_ID_BITS = 40
+
+
+class MenuSearchIndex:
+    """
+    Helper class finding cafeteria items by part of their name.
+
+    Every item gets a rank number ordering shorter names first, then lower
+    Ids. The index keeps, for every word of the item names, the ranks of
+    the items whose name starts with that word and of the items with that
+    word later in their name, and for every trigram of the names the ranks
+    of the items containing it, each list sorted by rank. A search walks
+    those lists in rank order and stops as soon as it has enough matches,
+    so it does not depend on the size of the menu. Matches are returned
+    exact name first, then names starting with the query, then names with a
+    word starting with the query, then names containing it (only for
+    queries of three characters or more).
+
+    The index is built from a menu the first time it is searched, and is
+    then kept up to date one item at a time when items are added, renamed
+    or removed.
+    """
+    def __init__(self):
+        self.__menu = None
+        self.__names_by_id = {}
+        self.__ids_by_name = {}
+        self.__words = []
+        self.__first_words = {}
+        self.__other_words = {}
+        self.__ngrams = {}
+
+    def search(self, menu, query: str, limit: int = 10):
+        """
+        Find the items of a menu whose name matches the query.
+        Args:
+            menu (Union[Menu, CompactMenu]): The menu to search.
+            query (str): The text to look for, ignoring case.
+            limit (int): The maximum number of items to return.
+        Returns:
+            list[CafeteriaItem]: The best matching items, best match first.
+        """
+        if menu is not self.__menu:
+            self.build(menu)
+        key = self.__name_key(query)
+        if len(key) == 0 or limit <= 0:
+            return []
+        item_ids = []
+        item_id = self.__ids_by_name.get(key)
+        if item_id is not None:
+            item_ids.append(item_id)
+        tokens = key.split()
+        if len(tokens) > 1:
+            words = tokens[:1]
+        else:
+            words = self.__find_words(key)
+        self.__collect(item_ids, limit, self.__merge(
+            self.__first_words, words), lambda x: x.startswith(key))
+        self.__collect(item_ids, limit, self.__merge(
+            self.__other_words, words), lambda x: f" {key}" in x)
+        if len(key) >= NGRAM_LENGTH:
+            self.__collect(item_ids, limit, self.__find_by_ngrams(key),
+                           lambda x: key in x)
+        return [menu.get_by_id(x) for x in item_ids]
+
+    def build(self, menu):
+        """
+        Index every item of a menu, replacing the current index.
+        Args:
+            menu (Union[Menu, CompactMenu]): The menu to index.
+        """
+        self.__menu = menu
+        self.__names_by_id = {}
+        self.__ids_by_name = {}
+        self.__first_words = {}
+        self.__other_words = {}
+        self.__ngrams = {}
+        for item in menu:
+            self.__index_name(item.Id, item.Name, False)
+        for postings in (self.__first_words, self.__other_words,
+                         self.__ngrams):
+            for ranks in postings.values():
+                ranks.sort()
+        self.__words = sorted(self.__first_words.keys()
+                              | self.__other_words.keys())
+
+    def add(self, menu, item: CafeteriaItem):
+        """
+        Index an item added to a menu.
+        Args:
+            menu (Union[Menu, CompactMenu]): The menu the item was added to.
+            item (CafeteriaItem): The added item.
+        """
+        if menu is self.__menu:
+            self.__index_name(item.Id, item.Name, True)
+
+    def rename(self, menu, item: CafeteriaItem):
+        """
+        Index the new name of an item renamed in a menu.
+        Args:
+            menu (Union[Menu, CompactMenu]): The menu of the item.
+            item (CafeteriaItem): The renamed item.
+        """
+        if menu is self.__menu:
+            self.__unindex_name(item.Id)
+            self.__index_name(item.Id, item.Name, True)
+
+    def remove(self, menu, item_id: int):
+        """
+        Drop an item removed from a menu from the index.
+        Args:
+            menu (Union[Menu, CompactMenu]): The menu the item was removed
+             from.
+            item_id (int): The Id of the removed item.
+        """
+        if menu is self.__menu:
+            self.__unindex_name(item_id)
+
+    def rebind(self, menu, snapshot):
+        """
+        Keep using the index for a snapshot of the indexed menu, whose items
+        only differ from the menu in price or stock.
+        Args:
+            menu (Union[Menu, CompactMenu]): The menu the snapshot was taken
+             from.
+            snapshot (Union[Menu, CompactMenu]): The snapshot replacing it.
+        """
+        if menu is self.__menu:
+            self.__menu = snapshot
+
+    def __index_name(self, item_id: int, item_name: str, is_sorted: bool):
+        """
+        Add the words and trigrams of an item name to the index.
+        Args:
+            item_id (int): The Id of the item.
+            item_name (str): The name of the item.
+            is_sorted (bool): A flag indicating whether the lists must be kept
+             sorted, or are sorted once the whole menu is indexed.
+        """
+        key = self.__name_key(item_name)
+        rank = (len(key) << RANK_ID_BITS) | item_id
+        self.__names_by_id[item_id] = key
+        self.__ids_by_name[key] = item_id
+        for postings, posting_key in self.__get_postings(key):
+            ranks = postings.get(posting_key)
+            if ranks is None:
+                ranks = postings[posting_key] = []
+                if is_sorted and postings is not self.__ngrams:
+                    self.__add_word(posting_key)
+            if is_sorted:
+                insort(ranks, rank)
+            else:
+                ranks.append(rank)
+
+    def __unindex_name(self, item_id: int):
+        """
+        Remove the words and trigrams of an item name from the index.
+        Args:
+            item_id (int): The Id of the item.
+        """
+        key = self.__names_by_id.pop(item_id, None)
+        if key is None:
+            return
+        del self.__ids_by_name[key]
+        rank = (len(key) << RANK_ID_BITS) | item_id
+        for postings, posting_key in self.__get_postings(key):
+            ranks = postings[posting_key]
+            del ranks[bisect_left(ranks, rank)]
+            if len(ranks) == 0:
+                del postings[posting_key]
+                if (postings is not self.__ngrams
+                        and posting_key not in self.__first_words
+                        and posting_key not in self.__other_words):
+                    del self.__words[bisect_left(self.__words, posting_key)]
+
+    def __get_postings(self, key: str):
+        """
+        List the lists of the index an item name belongs to.
+        Args:
+            key (str): The case-folded item name.
+        Returns:
+            list[tuple[dict, str]]: Pairs of index and key within that
+            index, for the first word, the other words and the trigrams of
+            the name.
+        """
+        words = key.split()
+        postings = [(self.__first_words, words[0])] if words else []
+        postings.extend((self.__other_words, x) for x in set(words[1:]))
+        postings.extend((self.__ngrams, x) for x in self.__get_ngrams(key))
+        return postings
+
+    def __add_word(self, word: str):
+        """
+        Add a word to the sorted list of indexed words, if it is missing.
+        Args:
+            word (str): The word to add.
+        """
+        index = bisect_left(self.__words, word)
+        if index == len(self.__words) or self.__words[index] != word:
+            self.__words.insert(index, word)
+
+    def __find_words(self, prefix: str):
+        """
+        Find the indexed words starting with a prefix.
+        Args:
+            prefix (str): The case-folded prefix.
+        Returns:
+            list[str]: The matching words.
+        """
+        words = []
+        index = bisect_left(self.__words, prefix)
+        while (index < len(self.__words)
+               and self.__words[index].startswith(prefix)):
+            words.append(self.__words[index])
+            index += 1
+        return words
+
+    @staticmethod
+    def __merge(postings: dict, words: list[str]):
+        """
+        Merge the lists of several words of the index in rank order.
+        Args:
+            postings (dict): The index to read.
+            words (list[str]): The words whose lists are merged.
+        Returns:
+            Iterator[int]: The ranks of the items, in ascending order.
+        """
+        return heapq.merge(*(postings[x] for x in words if x in postings))
+
+    def __find_by_ngrams(self, key: str):
+        """
+        Find the candidates for a query of at least three characters.
+        Args:
+            key (str): The case-folded query.
+        Returns:
+            Iterable[int]: The ranks of the items containing the rarest
+            trigram of the query, in ascending order.
+        """
+        postings = [self.__ngrams.get(x) for x in self.__get_ngrams(key)]
+        if None in postings:
+            return []
+        return min(postings, key=len)
+
+    def __collect(self, item_ids: list[int], limit: int, ranks, is_match):
+        """
+        Add the Ids of matching items, in rank order, until the limit is
+        reached.
+        Args:
+            item_ids (list[int]): The Ids found so far, extended in place.
+            limit (int): The maximum number of Ids.
+            ranks (Iterable[int]): The ranks of the candidate items, in
+             ascending order.
+            is_match (Callable[[str], bool]): A check of a candidate's name.
+        """
+        if len(item_ids) >= limit:
+            return
+        mask = (1 << RANK_ID_BITS) - 1
+        for rank in ranks:
+            item_id = rank & mask
+            if (is_match(self.__names_by_id[item_id])
+                    and item_id not in item_ids):
+                item_ids.append(item_id)
+                if len(item_ids) >= limit:
+                    return
+
+    @staticmethod
+    def __get_ngrams(key: str):
+        """
+        Get the distinct trigrams of a case-folded name or query.
+        Args:
+            key (str): The case-folded text.
+        Returns:
+            set[str]: The trigrams of the text.
+        """
+        return {key[i:i + NGRAM_LENGTH]
+                for i in range(len(key) - NGRAM_LENGTH + 1)}
+
+    @staticmethod
+    def __name_key(item_name: str):
+        """
+        Build the key used by the index.
+        Args:
+            item_name (str): The name of a cafeteria item or a query.
+        Returns:
+            str: The case-folded text, without surrounding whitespace.
+        """
+        return item_name.strip().casefold()
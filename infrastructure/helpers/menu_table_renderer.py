@@ -0,0 +1,194 @@
+from entities.cafeteria_item import CafeteriaItem
+from infrastructure.helpers.price_converter import PriceConverter
+from infrastructure.helpers.table_formatter import TableFormatter
+
+MENU_TABLE_HEADERS = ["ID", "Name", "Price", "Stock"]
+
+
+class MenuTableRenderer:
+    """
+    Helper class rendering the cafeteria menu as a table, in the same layout
+    as the 'pretty' table format from tabulate.
+
+    The rendered table is cached against the last change of the menu, so
+    showing an unchanged menu again costs nothing. When the menu has
+    changed, the renderer asks it for the Ids of the items added, changed or
+    removed since the last change it rendered, and only formats the lines
+    of those items again, in place. The width of every column is kept from
+    a count of the lengths of its cells, updated with the changed rows
+    only, and the lines of every row are only formatted again when a width
+    changes. The whole menu is only read again when the menu cannot tell
+    what changed, such as the first time it is rendered. Pages of the menu
+    can be rendered on their own, so only the visible items are formatted.
+
+    Attributes:
+        price_converter (PriceConverter): The converter formatting the prices.
+    """
+    def __init__(self, price_converter: PriceConverter = None):
+        self.price_converter = price_converter or PriceConverter()
+        self.__last_change = None
+        self.__table = ""
+        self.__widths = None
+        self.__rows = {}
+        self.__lines = []
+        self.__removed_line_count = 0
+        self.__cell_lengths = []
+
+    def render(self, menu):
+        """
+        Render the menu as a table.
+        Args:
+            menu (Union[Menu, CompactMenu]): The menu to render.
+        Returns:
+            str: The rendered table.
+        """
+        last_change = menu.last_change
+        if last_change is self.__last_change:
+            return self.__table
+        changed_ids = menu.get_changed_ids(self.__last_change)
+        changed_rows = []
+        if changed_ids is None:
+            self.__read_rows(menu)
+        else:
+            for item_id in changed_ids:
+                row = self.__update_row(item_id, menu.get_by_id(item_id))
+                if row is not None:
+                    changed_rows.append(row)
+        widths = [max(max(lengths, default=0), len(header)) for
+                  lengths, header in zip(self.__cell_lengths,
+                                         MENU_TABLE_HEADERS)]
+        if (changed_ids is None or widths != self.__widths
+                or self.__removed_line_count * 2 > len(self.__lines)):
+            self.__widths = widths
+            self.__format_lines()
+        else:
+            for row in changed_rows:
+                self.__lines[row[2]] = TableFormatter.format_line(row[1],
+                                                                  widths)
+        self.__table = self.__join_lines(filter(None, self.__lines), widths)
+        self.__last_change = last_change
+        return self.__table
+
+    def render_page(self, items):
+        """
+        Render a page of the menu as a table.
+        Args:
+            items (Iterable[CafeteriaItem]): The items of the page, usually
+             streamed from the menu by a generator.
+        Returns:
+            str: The rendered table, with column widths fitting the page.
+        """
+        rows = [self.__format_cells(item) for item in items]
+        widths = TableFormatter.calculate_widths(MENU_TABLE_HEADERS, rows)
+        return self.__join_lines(
+            [TableFormatter.format_line(x, widths) for x in rows], widths)
+
+    @staticmethod
+    def __join_lines(lines, widths: list[int]):
+        """
+        Join the header and the lines of the rows into a table.
+        Args:
+            lines (Iterable[str]): The formatted lines of the rows.
+            widths (list[int]): The width of each column.
+        Returns:
+            str: The rendered table.
+        """
+        separator = TableFormatter.format_separator(widths)
+        return "\n".join([
+            separator, TableFormatter.format_line(MENU_TABLE_HEADERS, widths),
+            separator, *lines, separator])
+
+    def __read_rows(self, menu):
+        """
+        Read the rows of the whole menu, reusing the cells of the cached rows
+        of the items that have not changed.
+        Args:
+            menu (Union[Menu, CompactMenu]): The menu to render.
+        """
+        rows = {}
+        for item in menu:
+            key = (item.Id, item.Name, item.Price, item.Stock)
+            row = self.__rows.get(item.Id)
+            if row is None or row[0] != key:
+                row = [key, self.__format_cells(item), None]
+            rows[item.Id] = row
+        self.__rows = rows
+        self.__cell_lengths = [{} for _ in MENU_TABLE_HEADERS]
+        for row in rows.values():
+            self.__count_cells(row[1], 1)
+
+    def __update_row(self, item_id: int, item: CafeteriaItem):
+        """
+        Update the row of an item that was added, changed or removed.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+            item (Union[CafeteriaItem, None]): The cafeteria item, or None if
+             it was removed from the menu.
+        Returns:
+            Union[list, None]: The row, holding its key, cells and the
+            position of its line, if its line has to be formatted again, or
+            None otherwise.
+        The line of a removed item is left empty until the lines are
+        formatted again, and new items are added at the end of the table,
+        as the menu only adds items at its end.
+        """
+        row = self.__rows.get(item_id)
+        if item is None:
+            if row is not None:
+                del self.__rows[item_id]
+                self.__lines[row[2]] = None
+                self.__removed_line_count += 1
+                self.__count_cells(row[1], -1)
+            return None
+        key = (item.Id, item.Name, item.Price, item.Stock)
+        if row is not None and row[0] == key:
+            return None
+        cells = self.__format_cells(item)
+        if row is None:
+            row = self.__rows[item_id] = [key, cells, len(self.__lines)]
+            self.__lines.append(None)
+        else:
+            self.__count_cells(row[1], -1)
+            row[0] = key
+            row[1] = cells
+        self.__count_cells(cells, 1)
+        return row
+
+    def __format_lines(self):
+        """
+        Format the line of every row with the current column widths.
+        """
+        self.__lines = []
+        for row in self.__rows.values():
+            row[2] = len(self.__lines)
+            self.__lines.append(TableFormatter.format_line(row[1],
+                                                           self.__widths))
+        self.__removed_line_count = 0
+
+    def __count_cells(self, cells: list[str], count: int):
+        """
+        Add the lengths of the cells of a row to the count of the lengths of
+        each column, or take them off it.
+        Args:
+            cells (list[str]): The cells of the row.
+            count (int): 1 to add the row, -1 to take it off.
+        """
+        for lengths, cell in zip(self.__cell_lengths, cells):
+            length = len(cell)
+            total = lengths.get(length, 0) + count
+            if total == 0:
+                del lengths[length]
+            else:
+                lengths[length] = total
+
+    def __format_cells(self, item: CafeteriaItem):
+        """
+        Format the cells of a menu row.
+        Args:
+            item (CafeteriaItem): The cafeteria item of the row.
+        Returns:
+            list[str]: The ID, name, price and stock of the item.
+        """
+        return [str(item.Id), item.Name,
+                self.price_converter.format_money(item.Price, True),
+                str(item.Stock)]
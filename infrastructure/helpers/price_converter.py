@@ -1,20 +1,125 @@
 from dataclasses import dataclass
+from decimal import Decimal
+from functools import lru_cache
+
+PENCE_PER_POUND = 100
+MAX_CACHED_PRICES = 4096
+
+DEFAULT_LOCALE = "en_GB"
+DEFAULT_CURRENCY_SYMBOL = "£"
+LOCALE_FORMATS = {
+    # locale: (decimal point, thousands separator, symbol after the amount)
+    "en_GB": (".", ",", False),
+    "en_IE": (".", ",", False),
+    "en_US": (".", ",", False),
+    "de_DE": (",", ".", True),
+    "fr_FR": (",", " ", True),
+}
 
 
 @dataclass
 class PriceConverter:
     """
-    A utility class for formatting prices.
-    This class provides methods to format prices to a specific decimal
-    precision.
+    A utility class for converting and formatting prices.
+    Prices are held as a whole number of pence, so sums and products of
+    prices are exact. This class converts prices entered as text to pence,
+    and formats pence as pounds with two decimal places, either as a plain
+    number or as an amount of money with the currency symbol, decimal point
+    and thousands separator of a locale.
+
+    Formatted prices are memoized in bounded caches shared by every
+    converter, since the same few prices are formatted over and over by
+    every session.
+
+    Attributes:
+        locale (str): The locale of the amounts of money, such as "en_GB".
+        currency_symbol (str): The symbol of the currency, such as "£".
     """
+    def __init__(self, locale: str = DEFAULT_LOCALE,
+                 currency_symbol: str = DEFAULT_CURRENCY_SYMBOL):
+        if locale not in LOCALE_FORMATS:
+            raise ValueError(f"The locale {locale} is not supported")
+        self.locale = locale
+        self.currency_symbol = currency_symbol
+
+    def format_money(self, price: int, spaced: bool = False):
+        """
+        Format the given price as an amount of money.
+        Args:
+            price (int): The price value to be formatted, in pence.
+            spaced (bool): Whether to separate a currency symbol written
+             before the amount with a space, as in the tables of the app.
+        Returns:
+            str: The formatted amount, such as "£2.50" or "£ 2.50".
+        """
+        return self.__format_money(price, self.locale, self.currency_symbol,
+                                   spaced)
+
+    def strip_money(self, amount: str):
+        """
+        Remove the currency symbol and thousands separators from an amount
+        of money, such as one written as shown by format_money.
+        Args:
+            amount (str): The amount of money, such as "£1,234.50".
+        Returns:
+            str: The amount as a plain number with a full stop as decimal
+            point, such as "1234.50", which can be converted by to_pence.
+        """
+        decimal_point, thousands_separator, _ = LOCALE_FORMATS[self.locale]
+        amount = (amount.replace(self.currency_symbol, "")
+                  .replace(thousands_separator, "").strip())
+        return amount.replace(decimal_point, ".")
+
     @staticmethod
-    def format_price(price: float):
+    @lru_cache(maxsize=MAX_CACHED_PRICES)
+    def format_price(price: int):
         """
         Format the given price to two decimal places.
         Args:
-            price (float): The price value to be formatted.
+            price (int): The price value to be formatted, in pence.
         Returns:
             str: The formatted price as a string with two decimal places.
         """
-        return "{0:.2f}".format(price)
+        pounds, pence = divmod(abs(price), PENCE_PER_POUND)
+        sign = "-" if price < 0 else ""
+        return f"{sign}{pounds}.{pence:02d}"
+
+    @staticmethod
+    def to_pence(price: str):
+        """
+        Convert a price written in pounds to pence.
+        Args:
+            price (str): The price in pounds, such as "2.50".
+        Returns:
+            int: The price in pence, rounded to the nearest penny.
+        Raises:
+            decimal.InvalidOperation: If the price is not a number.
+        """
+        return int((Decimal(price.strip()) * PENCE_PER_POUND)
+                   .to_integral_value())
+
+    @staticmethod
+    @lru_cache(maxsize=MAX_CACHED_PRICES)
+    def __format_money(price: int, locale: str, currency_symbol: str,
+                       spaced: bool):
+        """
+        Format the given price as an amount of money in a locale.
+        Args:
+            price (int): The price value to be formatted, in pence.
+            locale (str): The locale of the amount.
+            currency_symbol (str): The symbol of the currency.
+            spaced (bool): Whether to separate a currency symbol written
+             before the amount with a space.
+        Returns:
+            str: The formatted amount.
+        """
+        decimal_point, thousands_separator, symbol_after = (
+            LOCALE_FORMATS[locale])
+        pounds, pence = divmod(abs(price), PENCE_PER_POUND)
+        sign = "-" if price < 0 else ""
+        amount = (f"{pounds:,}".replace(",", thousands_separator)
+                  + f"{decimal_point}{pence:02d}")
+        if symbol_after:
+            return f"{sign}{amount} {currency_symbol}"
+        space = " " if spaced else ""
+        return f"{sign}{currency_symbol}{space}{amount}"
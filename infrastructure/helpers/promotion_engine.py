@@ -0,0 +1,150 @@
+from entities.cafeteria_item import CafeteriaItem
+from entities.promotion import Promotion
+from infrastructure.enums.enum_promotion_type import PromotionType
+
+PERCENT = 100
+
+
+class PromotionEngine:
+    """
+    Helper class working out the discounts promotions give to a cart.
+
+    The promotions are checked and compiled once into a table mapping each
+    item Id to the promotion it belongs to, so a change to a cart line only
+    looks up the promotion of that item, instead of going through every
+    promotion. An item can belong to one promotion at most, so promotions
+    never stack. Multi-buy and percentage discounts only depend on a single
+    line of the cart, while a meal deal depends on the lines of the items of
+    the deal. Discounts are whole numbers of pence, rounded in favour of the
+    cafeteria.
+    """
+    def __init__(self, promotions: list[Promotion] = None):
+        self.__promotions = list(promotions or [])
+        self.__promotions_by_item_id = {}
+        promotion_ids = set()
+        for promotion in self.__promotions:
+            self.__validate_promotion(promotion)
+            if promotion.Id in promotion_ids:
+                raise ValueError(f"A promotion with the Id {promotion.Id} "
+                                 f"already exists")
+            promotion_ids.add(promotion.Id)
+            for item_id in promotion.ItemIds:
+                if item_id in self.__promotions_by_item_id:
+                    raise ValueError(f"The item with the Id {item_id} is "
+                                     f"already part of a promotion")
+                self.__promotions_by_item_id[item_id] = promotion
+
+    @property
+    def promotions(self):
+        """
+        list[Promotion]: The promotions of the engine.
+        """
+        return self.__promotions
+
+    def get_promotion(self, item_id: int):
+        """
+        Find the promotion an item belongs to.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+        Returns:
+            Union[Promotion, None]: The promotion of the item, or None if the
+            item is not part of a promotion.
+        """
+        return self.__promotions_by_item_id.get(item_id)
+
+    @staticmethod
+    def calculate_line_discount(promotion: Promotion, price: int,
+                                quantity: int):
+        """
+        Calculate the discount a multi-buy or percentage promotion gives to a
+        single cart line.
+        Args:
+            promotion (Promotion): The promotion of the item of the line.
+            price (int): The price of one item of the line, in pence.
+            quantity (int): The quantity of the line.
+        Returns:
+            int: The discount in pence.
+        """
+        if promotion.Type is PromotionType.Percentage:
+            return price * quantity * promotion.Value // PERCENT
+        if promotion.Type is PromotionType.MultiBuy:
+            saving = price * promotion.Quantity - promotion.Value
+            return quantity // promotion.Quantity * max(saving, 0)
+        return 0
+
+    @staticmethod
+    def calculate_deal_discount(promotion: Promotion,
+                                lines: dict[int, CafeteriaItem]):
+        """
+        Calculate the discount a meal deal gives to a cart.
+        Args:
+            promotion (Promotion): The meal deal.
+            lines (dict[int, CafeteriaItem]): The lines of the cart, keyed by
+             item Id.
+        Returns:
+            int: The discount in pence, for as many complete deals as the
+            cart holds.
+        """
+        deal_count = None
+        deal_price = 0
+        for item_id in promotion.ItemIds:
+            line = lines.get(item_id)
+            if line is None:
+                return 0
+            if deal_count is None or line.Stock < deal_count:
+                deal_count = line.Stock
+            deal_price += line.Price
+        return deal_count * max(deal_price - promotion.Value, 0)
+
+    def calculate_discounts(self, lines: dict[int, CafeteriaItem]):
+        """
+        Calculate the discounts every promotion gives to a cart.
+        Args:
+            lines (dict[int, CafeteriaItem]): The lines of the cart, keyed by
+             item Id.
+        Returns:
+            dict[int, int]: The discount in pence of each promotion that
+            gives one, keyed by promotion Id.
+        """
+        discounts = {}
+        for line in lines.values():
+            promotion = self.__promotions_by_item_id.get(line.Id)
+            if promotion is None:
+                continue
+            if promotion.Type is PromotionType.MealDeal:
+                discount = self.calculate_deal_discount(promotion, lines)
+                discounts[promotion.Id] = discount
+            else:
+                discount = self.calculate_line_discount(
+                    promotion, line.Price, line.Stock)
+                discounts[promotion.Id] = (discounts.get(promotion.Id, 0)
+                                           + discount)
+        return {x: y for x, y in discounts.items() if y != 0}
+
+    @staticmethod
+    def __validate_promotion(promotion: Promotion):
+        """
+        Check that the settings of a promotion make sense for its type.
+        Args:
+            promotion (Promotion): The promotion to check.
+        Raises:
+            ValueError: If the promotion cannot be applied.
+        """
+        if len(set(promotion.ItemIds)) != len(promotion.ItemIds):
+            raise ValueError(f"The promotion {promotion.Name} lists an item "
+                             f"more than once")
+        if promotion.Value < 0:
+            raise ValueError(f"The promotion {promotion.Name} has a negative "
+                             f"value")
+        if (promotion.Type is PromotionType.Percentage
+                and promotion.Value > PERCENT):
+            raise ValueError(f"The promotion {promotion.Name} takes off more "
+                             f"than 100%")
+        if (promotion.Type is PromotionType.MultiBuy
+                and promotion.Quantity < 2):
+            raise ValueError(f"The promotion {promotion.Name} must sell at "
+                             f"least two items together")
+        if (promotion.Type is PromotionType.MealDeal
+                and len(promotion.ItemIds) < 2):
+            raise ValueError(f"The promotion {promotion.Name} must include at "
+                             f"least two items")
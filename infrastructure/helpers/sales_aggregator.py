@@ -0,0 +1,122 @@
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+HOURS_PER_DAY = 24
+HOUR_START = 11
+HOUR_END = 13
+
+
+class SalesAggregator:
+    """
+    Helper class adding up the sales rollups of the order log, batch by
+    batch, so any length of history can be aggregated while holding only
+    one batch of rows and the running totals in memory.
+
+    Every batch of rows is first split into typed columns. The sales of each
+    item are then added up per item Id, and the sales of each hour are added
+    up per hour of the day, with integer arithmetic only.
+
+    NumPy is used to add up each batch when it is installed, by grouping the
+    columns with a single vectorised operation per column. Otherwise the
+    columns are added up in a plain loop, which gives the same totals.
+
+    Attributes:
+        item_totals (dict[int, list[int]]): The quantity and gross revenue in
+         pence of every item added so far, keyed by item Id.
+        hour_of_day_totals (list[array]): The order count, quantity, gross
+         revenue and discount in pence of every hour of the day added so
+         far, as four columns of 24 values.
+    """
+    def __init__(self):
+        self.item_totals = {}
+        self.hour_of_day_totals = [array("q", bytes(8 * HOURS_PER_DAY))
+                                   for _ in range(4)]
+
+    def add_item_sales(self, rows: list[tuple]):
+        """
+        Add a batch of per-item hourly sales to the item totals.
+        Args:
+            rows (list[tuple]): The rows of the batch, as item Id, hour,
+             quantity and gross revenue.
+        """
+        if not rows:
+            return
+        item_ids, _, quantities, revenues = zip(*rows)
+        if numpy is not None:
+            self.__add_item_sales_with_numpy(item_ids, quantities, revenues)
+            return
+        totals = self.item_totals
+        for item_id, quantity, revenue in zip(item_ids, quantities,
+                                              revenues):
+            total = totals.get(item_id)
+            if total is None:
+                totals[item_id] = [quantity, revenue]
+            else:
+                total[0] += quantity
+                total[1] += revenue
+
+    def add_hourly_sales(self, rows: list[tuple]):
+        """
+        Add a batch of hourly sales to the hour of the day totals.
+        Args:
+            rows (list[tuple]): The rows of the batch, as hour, order count,
+             quantity, gross revenue and discount.
+        """
+        if not rows:
+            return
+        hours, *columns = zip(*rows)
+        hours = array("b", [int(x[HOUR_START:HOUR_END]) for x in hours])
+        if numpy is not None:
+            self.__add_hourly_sales_with_numpy(hours, columns)
+            return
+        for totals, column in zip(self.hour_of_day_totals, columns):
+            for hour, value in zip(hours, column):
+                totals[hour] += value
+
+    def __add_item_sales_with_numpy(self, item_ids: tuple, quantities: tuple,
+                                    revenues: tuple):
+        """
+        Add a batch of per-item hourly sales to the item totals with NumPy.
+        Args:
+            item_ids (tuple): The item Id column of the batch.
+            quantities (tuple): The quantity column of the batch.
+            revenues (tuple): The gross revenue column of the batch.
+        """
+        unique_ids, groups = numpy.unique(numpy.array(item_ids, numpy.int64),
+                                          return_inverse=True)
+        batch_quantities = numpy.zeros(len(unique_ids), numpy.int64)
+        numpy.add.at(batch_quantities, groups,
+                     numpy.array(quantities, numpy.int64))
+        batch_revenues = numpy.zeros(len(unique_ids), numpy.int64)
+        numpy.add.at(batch_revenues, groups,
+                     numpy.array(revenues, numpy.int64))
+        totals = self.item_totals
+        for item_id, quantity, revenue in zip(unique_ids.tolist(),
+                                              batch_quantities.tolist(),
+                                              batch_revenues.tolist()):
+            total = totals.get(item_id)
+            if total is None:
+                totals[item_id] = [quantity, revenue]
+            else:
+                total[0] += quantity
+                total[1] += revenue
+
+    def __add_hourly_sales_with_numpy(self, hours: array, columns: list):
+        """
+        Add a batch of hourly sales to the hour of the day totals with NumPy.
+        Args:
+            hours (array): The hour of the day of every row of the batch.
+            columns (list[tuple]): The order count, quantity, gross revenue
+             and discount columns of the batch.
+        """
+        hours = numpy.frombuffer(hours, dtype=numpy.int8)
+        for totals, column in zip(self.hour_of_day_totals, columns):
+            batch_totals = numpy.zeros(HOURS_PER_DAY, numpy.int64)
+            numpy.add.at(batch_totals, hours,
+                         numpy.array(column, numpy.int64))
+            for hour, value in enumerate(batch_totals.tolist()):
+                totals[hour] += value
@@ -0,0 +1,51 @@
+from infrastructure.helpers.io_port import IOPort
+
+
+class ScriptedIO(IOPort):
+    """
+    In-memory input and output, answering every prompt with the next line
+    of a script, so a flow can be run without a terminal, for example to
+    replay a customer session or to load test the flows at full speed.
+
+    Attributes:
+        output (list[str]): The prompts and text written by the flow, when
+         keep_output is True.
+        keep_output (bool): Whether the output is kept or thrown away.
+    """
+    def __init__(self, lines, keep_output: bool = True):
+        self.__lines = iter(lines)
+        self.output = []
+        self.keep_output = keep_output
+
+    def input(self, prompt: str = ""):
+        """
+        Write a prompt and answer it with the next line of the script.
+        Args:
+            prompt (str): The text written before reading.
+        Returns:
+            str: The next line of the script.
+        Raises:
+            EOFError: If every line of the script has been read.
+        """
+        self.write(prompt)
+        try:
+            return next(self.__lines)
+        except StopIteration:
+            raise EOFError("The script has ended") from None
+
+    def write(self, text: str):
+        """
+        Keep text written by the flow, unless the output is thrown away.
+        Args:
+            text (str): The text to write.
+        """
+        if self.keep_output and text:
+            self.output.append(text)
+
+    def get_output(self):
+        """
+        Get everything the flow wrote.
+        Returns:
+            str: The kept output, as a single string.
+        """
+        return "".join(self.output)
@@ -0,0 +1,78 @@
+import asyncio
+import queue
+
+
+class SessionChannel:
+    """
+    Helper class connecting the flow of a session, running in a worker
+    thread, to the connection of its customer, served by an asyncio event
+    loop.
+
+    The channel is a text stream: the flow reads the lines the customer
+    sends with readline, which waits until the event loop hands over a line,
+    and writes its output with write, which hands the text over to the event
+    loop to be sent, so the connection itself is only used by the event
+    loop.
+
+    A customer who sends nothing for idle_timeout seconds is treated as
+    having disconnected, so an abandoned connection does not keep the
+    worker thread of its flow waiting forever.
+
+    Attributes:
+        idle_timeout (Union[float, None]): The number of seconds readline
+         waits for a line, or None to wait forever.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop,
+                 writer: asyncio.StreamWriter, encoding: str = "utf-8",
+                 idle_timeout: float = None):
+        self.idle_timeout = idle_timeout
+        self.__loop = loop
+        self.__writer = writer
+        self.__encoding = encoding
+        self.__lines = queue.SimpleQueue()
+
+    def put_line(self, line: bytes):
+        """
+        Hand over a line sent by the customer. Called by the event loop.
+        Args:
+            line (bytes): The line, or an empty bytes object once the
+             customer has disconnected.
+        """
+        text = line.decode(self.__encoding, errors="replace")
+        if text.endswith("\r\n"):
+            text = text[:-2] + "\n"
+        self.__lines.put(text)
+
+    def readline(self):
+        """
+        Wait for the next line sent by the customer.
+        Returns:
+            str: The line, ending with a newline, or an empty string once the
+            customer has disconnected or has sent nothing for idle_timeout
+            seconds.
+        """
+        try:
+            return self.__lines.get(timeout=self.idle_timeout)
+        except queue.Empty:
+            self.write("\nYou have been away for too long, so your session "
+                       "has ended and any order you started has been "
+                       "cancelled.\n")
+            return ""
+
+    def write(self, text: str):
+        """
+        Send text to the customer.
+        Args:
+            text (str): The text to send.
+        Returns:
+            int: The number of characters written.
+        """
+        self.__loop.call_soon_threadsafe(self.__writer.write,
+                                         text.encode(self.__encoding))
+        return len(text)
+
+    def flush(self):
+        """
+        Flush the output. Output is sent by the event loop as soon as it is
+        written, so there is nothing to do.
+        """
@@ -0,0 +1,41 @@
+from infrastructure.helpers.io_port import IOPort
+
+
+class StreamIO(IOPort):
+    """
+    Input and output through a pair of text streams, such as the channel of
+    a network session or in-memory io.StringIO objects.
+
+    Attributes:
+        input_stream: The stream lines are read from with readline.
+        output_stream: The stream text is written to with write.
+    """
+    def __init__(self, input_stream, output_stream):
+        self.input_stream = input_stream
+        self.output_stream = output_stream
+
+    def input(self, prompt: str = ""):
+        """
+        Write a prompt to the output stream and read a line from the input
+        stream.
+        Args:
+            prompt (str): The text written before reading.
+        Returns:
+            str: The line read, without its trailing newline.
+        Raises:
+            EOFError: If the input stream has ended.
+        """
+        if prompt:
+            self.output_stream.write(prompt)
+        line = self.input_stream.readline()
+        if not line:
+            raise EOFError("The input stream has ended")
+        return line[:-1] if line.endswith("\n") else line
+
+    def write(self, text: str):
+        """
+        Write text to the output stream.
+        Args:
+            text (str): The text to write.
+        """
+        self.output_stream.write(text)
@@ -0,0 +1,27 @@
+import threading
+
+STRIPE_COUNT = 64
+
+
+class StripedLock:
+    """
+    Helper class giving every key its own lock out of a fixed set of locks.
+
+    Keys are spread over the locks by their hash, so threads working on
+    different keys rarely wait for each other, while threads working on the
+    same key always share a lock, without keeping a lock per key.
+    """
+    def __init__(self, stripe_count: int = STRIPE_COUNT):
+        if stripe_count < 1:
+            raise ValueError("A striped lock needs at least one stripe")
+        self.__locks = [threading.Lock() for _ in range(stripe_count)]
+
+    def get_lock(self, key):
+        """
+        Get the lock of a key.
+        Args:
+            key (Hashable): The key to lock, such as an item Id.
+        Returns:
+            threading.Lock: The lock shared by every key of the same stripe.
+        """
+        return self.__locks[hash(key) % len(self.__locks)]
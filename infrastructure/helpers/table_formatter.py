@@ -0,0 +1,49 @@
+class TableFormatter:
+    """
+    Helper class formatting tables in the same layout as the 'pretty' table
+    format from tabulate, with centered cells.
+
+    This class includes static methods for measuring the columns of a table
+    and formatting its lines, so tables can be built line by line and the
+    formatted lines cached by the caller.
+    """
+    @staticmethod
+    def calculate_widths(headers: list[str], rows):
+        """
+        Calculate the width of each column.
+        Args:
+            headers (list[str]): The headers of the columns.
+            rows (Iterable[list[str]]): The cells of each row.
+        Returns:
+            list[int]: The width of the widest cell or header of each column.
+        """
+        widths = [len(header) for header in headers]
+        for cells in rows:
+            for index, cell in enumerate(cells):
+                if len(cell) > widths[index]:
+                    widths[index] = len(cell)
+        return widths
+
+    @staticmethod
+    def format_separator(widths: list[int]):
+        """
+        Format the line separating the header and the rows of the table.
+        Args:
+            widths (list[int]): The width of each column.
+        Returns:
+            str: The formatted separator.
+        """
+        return "+" + "+".join("-" * (x + 2) for x in widths) + "+"
+
+    @staticmethod
+    def format_line(cells: list[str], widths: list[int]):
+        """
+        Format a line of the table with centered cells.
+        Args:
+            cells (list[str]): The cells of the line.
+            widths (list[int]): The width of each column.
+        Returns:
+            str: The formatted line.
+        """
+        return "| " + " | ".join(f"{cell:^{width}}" for cell, width in
+                                 zip(cells, widths)) + " |"
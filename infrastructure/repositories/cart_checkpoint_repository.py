@@ -0,0 +1,108 @@
+import sqlite3
+
+from infrastructure.repositories.menu_repository import DATABASE_PATH
+
+CREATE_CART_CHECKPOINTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS cart_checkpoints (
+        session_code TEXT NOT NULL PRIMARY KEY,
+        data BLOB NOT NULL,
+        updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    ) WITHOUT ROWID"""
+UPSERT_CART_CHECKPOINT = (
+    "INSERT INTO cart_checkpoints (session_code, data) VALUES (?, ?) "
+    "ON CONFLICT (session_code) DO UPDATE SET data = excluded.data, "
+    "updated_at = CURRENT_TIMESTAMP")
+SELECT_CART_CHECKPOINT = ("SELECT data FROM cart_checkpoints "
+                          "WHERE session_code = ?")
+SELECT_EXPIRED_CART_CHECKPOINTS = (
+    "SELECT session_code, data, updated_at FROM cart_checkpoints "
+    "WHERE updated_at < datetime('now', ?) ORDER BY updated_at")
+DELETE_CART_CHECKPOINT = "DELETE FROM cart_checkpoints WHERE session_code = ?"
+DELETE_CART_CHECKPOINT_IF_UNCHANGED = ("DELETE FROM cart_checkpoints WHERE "
+                                       "session_code = ? AND updated_at = ?")
+
+
+class CartCheckpointRepository:
+    """
+    Repository class keeping the saved carts of the sessions served by the
+    app in the local SQLite database of the menu, so an order in progress
+    outlives the process serving it.
+
+    Every cart is saved encoded with CartSerializer, keyed by the code of
+    its session, and replaced every time the cart changes, with the time of
+    the change. A saved cart holds the stock taken for it, so carts that are
+    not changed for too long are expired: they are deleted only if they
+    were not changed since they were read, so a cart is never expired twice
+    or while its session saves it again.
+
+    Attributes:
+        connection (sqlite3.Connection): The connection to the database.
+    """
+    def __init__(self, database_path: str = DATABASE_PATH):
+        self.connection = sqlite3.connect(database_path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute(CREATE_CART_CHECKPOINTS_TABLE)
+
+    def save_checkpoint(self, session_code: str, data: bytes):
+        """
+        Save the cart of a session, replacing the previous one.
+        Args:
+            session_code (str): The code of the session.
+            data (bytes): The cart, encoded with CartSerializer.
+        """
+        with self.connection:
+            self.connection.execute(UPSERT_CART_CHECKPOINT,
+                                    (session_code, data))
+
+    def load_checkpoint(self, session_code: str):
+        """
+        Load the saved cart of a session.
+        Args:
+            session_code (str): The code of the session.
+        Returns:
+            Union[bytes, None]: The encoded cart, or None if the session has
+            no saved cart.
+        """
+        row = self.connection.execute(SELECT_CART_CHECKPOINT,
+                                      (session_code,)).fetchone()
+        return None if row is None else row[0]
+
+    def delete_checkpoint(self, session_code: str):
+        """
+        Delete the saved cart of a session.
+        Args:
+            session_code (str): The code of the session.
+        """
+        with self.connection:
+            self.connection.execute(DELETE_CART_CHECKPOINT, (session_code,))
+
+    def load_expired_checkpoints(self, max_age: int):
+        """
+        Load the saved carts that have not been changed for too long.
+        Args:
+            max_age (int): The number of seconds after its last change a
+             saved cart expires.
+        Returns:
+            list[tuple]: The expired carts, as session code, encoded cart and
+            time of the last change, oldest first.
+        """
+        return self.connection.execute(SELECT_EXPIRED_CART_CHECKPOINTS,
+                                       (f"-{max_age} seconds",)).fetchall()
+
+    def delete_expired_checkpoint(self, session_code: str, updated_at: str):
+        """
+        Delete an expired saved cart, unless it was changed since it was
+        loaded.
+        Args:
+            session_code (str): The code of the session.
+            updated_at (str): The time of the last change of the cart, as
+             loaded with load_expired_checkpoints.
+        Returns:
+            bool: Whether the cart was deleted.
+        """
+        with self.connection:
+            return self.connection.execute(
+                DELETE_CART_CHECKPOINT_IF_UNCHANGED,
+                (session_code, updated_at)).rowcount == 1
@@ -0,0 +1,472 @@
+import sqlite3
+
+from entities.cafeteria_item import CafeteriaItem
+from entities.stock_movement import StockMovement
+from infrastructure.enums.enum_stock_movement_type import StockMovementType
+
+DATABASE_PATH = "./woofeteria.db"
+
+SCHEMA_VERSION = 3
+STOCK_SNAPSHOT_INTERVAL = 1000
+
+CREATE_ITEMS_TABLE = """
+    CREATE TABLE IF NOT EXISTS items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL COLLATE NOCASE,
+        price INTEGER NOT NULL,
+        stock INTEGER NOT NULL,
+        removed INTEGER NOT NULL DEFAULT 0
+    )"""
+CREATE_ITEM_NAME_INDEX = """
+    CREATE UNIQUE INDEX IF NOT EXISTS items_name
+    ON items (name COLLATE NOCASE) WHERE removed = 0"""
+MIGRATE_ITEMS_TABLE = ("INSERT INTO items (id, name, price, stock) "
+                       "SELECT id, name, CAST(ROUND(price * 100) AS INTEGER), "
+                       "stock FROM items_old")
+MIGRATE_ITEM_PRICES = ("INSERT INTO items (id, name, price, stock, removed) "
+                       "SELECT id, name, CAST(ROUND(price * 100) AS INTEGER), "
+                       "stock, removed FROM items_old")
+SELECT_ITEMS = ("SELECT id, name, price, stock FROM items WHERE removed = 0 "
+                "ORDER BY id")
+SELECT_REMOVED_ITEMS = ("SELECT id, name, price, stock FROM items "
+                        "WHERE removed = 1 ORDER BY id")
+COUNT_ITEMS = "SELECT COUNT(*) FROM items"
+COUNT_MENU_ITEMS = "SELECT COUNT(*) FROM items WHERE removed = 0"
+INSERT_ITEM = "INSERT INTO items (name, price, stock) VALUES (?, ?, ?)"
+INSERT_ITEM_IF_MISSING = ("INSERT OR IGNORE INTO items (id, name, price, "
+                          "stock) VALUES (?, ?, ?, ?)")
+UPDATE_ITEM = "UPDATE items SET name = ?, price = ? WHERE id = ?"
+REMOVE_ITEM = "UPDATE items SET removed = 1 WHERE id = ? AND removed = 0"
+MOVE_STOCK = "UPDATE items SET stock = stock + ? WHERE id = ? RETURNING stock"
+TAKE_STOCK = ("UPDATE items SET stock = stock - ? WHERE id = ? AND stock >= ? "
+              "RETURNING stock")
+SELECT_ITEM_STOCK = "SELECT stock FROM items WHERE id = ?"
+SET_ITEM_STOCKS = "UPDATE items SET stock = ? WHERE id = ?"
+
+CREATE_STOCK_MOVEMENTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS stock_movements (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_id INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        stock INTEGER NOT NULL,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )"""
+CREATE_STOCK_SNAPSHOTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS stock_snapshots (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        movement_id INTEGER NOT NULL,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )"""
+CREATE_STOCK_SNAPSHOT_LEVELS_TABLE = """
+    CREATE TABLE IF NOT EXISTS stock_snapshot_levels (
+        snapshot_id INTEGER NOT NULL,
+        item_id INTEGER NOT NULL,
+        stock INTEGER NOT NULL,
+        PRIMARY KEY (snapshot_id, item_id)
+    ) WITHOUT ROWID"""
+INSERT_STOCK_MOVEMENT = ("INSERT INTO stock_movements (item_id, type, "
+                         "quantity, stock) VALUES (?, ?, ?, ?)")
+SELECT_STOCK_MOVEMENTS = ("SELECT id, item_id, type, quantity, stock, "
+                          "created_at FROM stock_movements WHERE id > ? "
+                          "ORDER BY id")
+SELECT_STOCK_LEVELS_BEFORE = (
+    "SELECT m.item_id, m.stock FROM stock_movements m JOIN (SELECT "
+    "MAX(id) AS id FROM stock_movements WHERE created_at < ? GROUP BY "
+    "item_id) l ON l.id = m.id")
+SELECT_LAST_ITEM_ID = "SELECT COALESCE(MAX(id), 0) FROM items"
+SELECT_LAST_STOCK_SNAPSHOT = ("SELECT id, movement_id FROM stock_snapshots "
+                              "ORDER BY id DESC LIMIT 1")
+SELECT_STOCK_SNAPSHOT_LEVELS = ("SELECT item_id, stock FROM "
+                                "stock_snapshot_levels WHERE snapshot_id = ?")
+INSERT_STOCK_SNAPSHOT = "INSERT INTO stock_snapshots (movement_id) VALUES (?)"
+INSERT_STOCK_SNAPSHOT_LEVELS = ("INSERT INTO stock_snapshot_levels "
+                                "(snapshot_id, item_id, stock) "
+                                "SELECT ?, id, stock FROM items")
+DELETE_OLD_STOCK_SNAPSHOT_LEVELS = ("DELETE FROM stock_snapshot_levels "
+                                    "WHERE snapshot_id < ?")
+
+
+class MenuRepository:
+    """
+    Repository class persisting the cafeteria menu and its stock in a local
+    SQLite database.
+
+    The database runs in WAL mode, so several worker processes can read the
+    menu while another one writes to it. Every statement is a constant SQL
+    string with bound parameters, which lets sqlite3 reuse its prepared
+    statement cache, and stock changes are single UPDATE statements, so
+    concurrent workers never lose each other's decrements.
+
+    Item Ids are allocated by the database and are never reused: removing an
+    item only marks its row as removed, so orders and logs can still refer
+    to it, and the name of a removed item can be used again.
+
+    Every stock change is appended to a stock movement ledger, with its
+    reason and the resulting stock, in the same transaction as the change
+    to the item's stock, which holds the current level. Every
+    STOCK_SNAPSHOT_INTERVAL movements (or once per item, for large menus)
+    the levels of all items are saved as a snapshot, so the levels can be
+    rebuilt from the latest snapshot and the movements after it, without
+    replaying the whole ledger.
+
+    Attributes:
+        connection (sqlite3.Connection): The connection to the menu database.
+    """
+    def __init__(self, database_path: str = DATABASE_PATH):
+        self.connection = sqlite3.connect(database_path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.__migrate()
+
+    def __migrate(self):
+        """
+        Create the tables, or upgrade the tables created by an older version
+        of the application: the first version renumbered the items and
+        deleted removed items, the second one had no stock ledger, so the
+        stock of its items is saved as the first snapshot, and none of them
+        stored prices in pence.
+        """
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        if version < 1:
+            columns = [x[1] for x in
+                       self.connection.execute("PRAGMA table_info(items)")]
+            if len(columns) > 0 and "removed" not in columns:
+                self.__migrate_items_table(MIGRATE_ITEMS_TABLE)
+            else:
+                self.connection.execute(CREATE_ITEMS_TABLE)
+                self.connection.execute(CREATE_ITEM_NAME_INDEX)
+        elif version < 3:
+            self.__migrate_items_table(MIGRATE_ITEM_PRICES)
+        if version < 2:
+            self.connection.execute(CREATE_STOCK_MOVEMENTS_TABLE)
+            self.connection.execute(CREATE_STOCK_SNAPSHOTS_TABLE)
+            self.connection.execute(CREATE_STOCK_SNAPSHOT_LEVELS_TABLE)
+            if self.connection.execute(COUNT_ITEMS).fetchone()[0] > 0:
+                self.__save_stock_snapshot(0)
+        self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __migrate_items_table(self, migrate_items: str):
+        """
+        Recreate the items table with the current columns, copying the rows
+        of the old table.
+        Args:
+            migrate_items (str): The statement copying the rows from the old
+             table, renamed to items_old, to the new one.
+        """
+        self.connection.execute("ALTER TABLE items RENAME TO items_old")
+        self.connection.execute(CREATE_ITEMS_TABLE)
+        self.connection.execute(migrate_items)
+        self.connection.execute("DROP TABLE items_old")
+        self.connection.execute(CREATE_ITEM_NAME_INDEX)
+
+    def seed_items(self, items: list[CafeteriaItem]):
+        """
+        Store the given items if the menu database is empty.
+        Args:
+            items (list[CafeteriaItem]): The items to store in an empty menu.
+        The items are inserted with "INSERT OR IGNORE" in a single
+        transaction, so workers starting at the same time cannot seed the
+        menu twice, and the stock of each inserted item is recorded as a
+        restock.
+        """
+        if self.connection.execute(COUNT_ITEMS).fetchone()[0] > 0:
+            return
+        with self.connection:
+            for item in items:
+                cursor = self.connection.execute(
+                    INSERT_ITEM_IF_MISSING,
+                    (item.Id, item.Name, item.Price, item.Stock))
+                if cursor.rowcount == 1:
+                    self.__record_stock_movement(
+                        item.Id, StockMovementType.Restock, item.Stock,
+                        item.Stock)
+
+    def load_items(self, batch_size: int = 500):
+        """
+        Lazily load the cafeteria items from the database.
+        Args:
+            batch_size (int): The number of rows fetched from the database at
+             a time.
+        Yields:
+            CafeteriaItem: The cafeteria items, ordered by their Id.
+        """
+        cursor = self.connection.execute(SELECT_ITEMS)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield CafeteriaItem(*row)
+
+    def load_removed_items(self):
+        """
+        Load the cafeteria items that have been removed from the menu.
+        Returns:
+            list[CafeteriaItem]: The removed cafeteria items, ordered by their
+            Id.
+        """
+        return [CafeteriaItem(*row) for row in
+                self.connection.execute(SELECT_REMOVED_ITEMS)]
+
+    def count_items(self):
+        """
+        Count the cafeteria items on the menu, without loading them.
+        Returns:
+            int: The number of items that have not been removed.
+        """
+        return self.connection.execute(COUNT_MENU_ITEMS).fetchone()[0]
+
+    def add_item(self, item: CafeteriaItem):
+        """
+        Store a new cafeteria item and assign it a new Id.
+        Args:
+            item (CafeteriaItem): The cafeteria item to store. Its Id is set
+             to the Id allocated by the database.
+        Returns:
+            CafeteriaItem: The stored cafeteria item.
+        The stock of the item is recorded as a restock.
+        """
+        with self.connection:
+            item.Id = self.connection.execute(
+                INSERT_ITEM, (item.Name, item.Price, item.Stock)).lastrowid
+            self.__record_stock_movement(item.Id, StockMovementType.Restock,
+                                         item.Stock, item.Stock)
+        return item
+
+    def add_items(self, items: list[CafeteriaItem]):
+        """
+        Store several new cafeteria items in a single transaction and assign
+        them new Ids.
+        Args:
+            items (list[CafeteriaItem]): The cafeteria items to store. Their
+             Ids are set to the Ids allocated by the database.
+        Returns:
+            list[CafeteriaItem]: The stored cafeteria items.
+        The stock of each item is recorded as a restock.
+        """
+        with self.connection:
+            for item in items:
+                item.Id = self.connection.execute(
+                    INSERT_ITEM, (item.Name, item.Price, item.Stock)).lastrowid
+                self.__record_stock_movement(
+                    item.Id, StockMovementType.Restock, item.Stock,
+                    item.Stock)
+        return items
+
+    def update_item(self, item: CafeteriaItem):
+        """
+        Store the name and price of an existing cafeteria item.
+        Args:
+            item (CafeteriaItem): The cafeteria item to store.
+        The stock is not stored, as it may have been changed by other
+        sessions since the item was read; it only changes through
+        subtract_stock and add_stock, which record the change in the ledger.
+        """
+        with self.connection:
+            self.connection.execute(UPDATE_ITEM, (item.Name, item.Price,
+                                                  item.Id))
+
+    def remove_item(self, item_id: int):
+        """
+        Mark a cafeteria item as removed from the menu. The row is kept, so
+        its Id is never given to another item.
+        Args:
+            item_id (int): The Id of the cafeteria item to remove.
+        """
+        with self.connection:
+            self.connection.execute(REMOVE_ITEM, (item_id,))
+
+    def subtract_stock(self, item_id: int, amount: int,
+                       movement_type: StockMovementType =
+                       StockMovementType.Order):
+        """
+        Atomically subtract stock from a cafeteria item, if it has enough
+        stock left, and record the movement in the ledger.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+            amount (int): The quantity to subtract.
+            movement_type (StockMovementType): The reason for the change.
+        Returns:
+            Union[int, None]: The remaining stock, or None if the item does
+            not exist or has less stock than the amount.
+        The stock is checked and subtracted by a single conditional UPDATE
+        statement, so concurrent workers can never take more stock than
+        there is.
+        """
+        with self.connection:
+            row = self.connection.execute(
+                TAKE_STOCK, (amount, item_id, amount)).fetchone()
+            if row is None:
+                return None
+            self.__record_stock_movement(item_id, movement_type, -amount,
+                                         row[0])
+        return row[0]
+
+    def get_stock(self, item_id: int):
+        """
+        Read the current stock of a cafeteria item.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+        Returns:
+            Union[int, None]: The stock, or None if the item does not exist.
+        """
+        row = self.connection.execute(SELECT_ITEM_STOCK,
+                                      (item_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def add_stock(self, item_id: int, amount: int,
+                  movement_type: StockMovementType =
+                  StockMovementType.Removal):
+        """
+        Atomically add stock to a cafeteria item and record the movement in
+        the ledger.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+            amount (int): The quantity to add.
+            movement_type (StockMovementType): The reason for the change.
+        Returns:
+            Union[int, None]: The new stock, or None if the item does not
+            exist.
+        """
+        return self.__move_stock(item_id, amount, movement_type)
+
+    def load_stock_movements(self, after_movement_id: int = 0,
+                             batch_size: int = 500):
+        """
+        Lazily load the stock movement ledger.
+        Args:
+            after_movement_id (int): The Id of the last movement already
+             read; only the movements after it are loaded.
+            batch_size (int): The number of rows fetched from the database at
+             a time.
+        Yields:
+            StockMovement: The stock movements, in the order they happened.
+        """
+        cursor = self.connection.execute(SELECT_STOCK_MOVEMENTS,
+                                         (after_movement_id,))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield StockMovement(row[0], row[1],
+                                    StockMovementType(row[2]), *row[3:])
+
+    def load_stock_levels_before(self, created_at: str):
+        """
+        Load the stock levels of the cafeteria items at a point in time,
+        from the stock movement ledger.
+        Args:
+            created_at (str): The UTC point in time, as "YYYY-MM-DD HH:MM:SS"
+             or any prefix of it; only the movements before it are used.
+        Returns:
+            dict[int, int]: The stock of every item that had a movement
+            before the point in time, keyed by item Id.
+        """
+        return dict(self.connection.execute(SELECT_STOCK_LEVELS_BEFORE,
+                                            (created_at,)))
+
+    def rebuild_stock_levels(self):
+        """
+        Rebuild the stock of every item from the stock movement ledger.
+        Returns:
+            dict[int, int]: The rebuilt stock of each item, by Id.
+        The levels start from the latest snapshot, and only the movements
+        recorded after it are replayed. The stock of the items is then
+        overwritten with the rebuilt levels, in a single transaction.
+        """
+        with self.connection:
+            levels = {}
+            last_movement_id = 0
+            snapshot = self.connection.execute(
+                SELECT_LAST_STOCK_SNAPSHOT).fetchone()
+            if snapshot is not None:
+                levels = dict(self.connection.execute(
+                    SELECT_STOCK_SNAPSHOT_LEVELS, (snapshot[0],)))
+                last_movement_id = snapshot[1]
+            for movement in self.load_stock_movements(last_movement_id):
+                levels[movement.ItemId] = (levels.get(movement.ItemId, 0)
+                                           + movement.Quantity)
+            self.connection.executemany(
+                SET_ITEM_STOCKS, ((stock, item_id) for item_id, stock in
+                                  levels.items()))
+        return levels
+
+    def __move_stock(self, item_id: int, quantity: int,
+                     movement_type: StockMovementType):
+        """
+        Change the stock of a cafeteria item and record the movement, in a
+        single transaction.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+            quantity (int): The change in stock, negative to take stock.
+            movement_type (StockMovementType): The reason for the change.
+        Returns:
+            Union[int, None]: The new stock, or None if the item does not
+            exist.
+        """
+        with self.connection:
+            row = self.connection.execute(MOVE_STOCK, (quantity,
+                                                       item_id)).fetchone()
+            if row is None:
+                return None
+            self.__record_stock_movement(item_id, movement_type, quantity,
+                                         row[0])
+        return row[0]
+
+    def __record_stock_movement(self, item_id: int,
+                                movement_type: StockMovementType,
+                                quantity: int, stock: int):
+        """
+        Append a movement to the stock ledger, within the current
+        transaction, and save a snapshot of the stock levels when one is
+        due.
+        Args:
+            item_id (int): The Id of the cafeteria item.
+            movement_type (StockMovementType): The reason for the change.
+            quantity (int): The change in stock.
+            stock (int): The stock of the item after the change.
+        """
+        movement_id = self.connection.execute(
+            INSERT_STOCK_MOVEMENT,
+            (item_id, movement_type.value, quantity, stock)).lastrowid
+        self.__save_stock_snapshot_if_due(movement_id)
+
+    def __save_stock_snapshot_if_due(self, movement_id: int):
+        """
+        Save a snapshot of the stock levels if enough movements were
+        recorded since the last one.
+        Args:
+            movement_id (int): The Id of the movement just recorded.
+        A snapshot is checked for every STOCK_SNAPSHOT_INTERVAL movements,
+        and saved once there have been at least as many movements since the
+        last snapshot as the highest item Id, so saving snapshots costs at
+        most one row per movement for large menus.
+        """
+        if movement_id % STOCK_SNAPSHOT_INTERVAL != 0:
+            return
+        snapshot = self.connection.execute(
+            SELECT_LAST_STOCK_SNAPSHOT).fetchone()
+        last_movement_id = 0 if snapshot is None else snapshot[1]
+        last_item_id = self.connection.execute(
+            SELECT_LAST_ITEM_ID).fetchone()[0]
+        if movement_id - last_movement_id >= last_item_id:
+            self.__save_stock_snapshot(movement_id)
+
+    def __save_stock_snapshot(self, movement_id: int):
+        """
+        Save the stock levels of all items as a snapshot, within the current
+        transaction, and drop the levels of older snapshots.
+        Args:
+            movement_id (int): The Id of the last movement included in the
+             snapshot.
+        """
+        snapshot_id = self.connection.execute(INSERT_STOCK_SNAPSHOT,
+                                              (movement_id,)).lastrowid
+        self.connection.execute(INSERT_STOCK_SNAPSHOT_LEVELS, (snapshot_id,))
+        self.connection.execute(DELETE_OLD_STOCK_SNAPSHOT_LEVELS,
+                                (snapshot_id,))
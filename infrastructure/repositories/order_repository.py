@@ -0,0 +1,295 @@
+import sqlite3
+
+from entities.cafeteria_item import CafeteriaItem
+from entities.hourly_sales import HourlySales
+from entities.item_hourly_sales import ItemHourlySales
+from entities.order import Order
+from infrastructure.repositories.menu_repository import DATABASE_PATH
+
+CREATE_ORDERS_TABLE = """
+    CREATE TABLE IF NOT EXISTS orders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TEXT NOT NULL,
+        total_quantity INTEGER NOT NULL,
+        total_price INTEGER NOT NULL,
+        total_discount INTEGER NOT NULL
+    )"""
+CREATE_ORDER_LINES_TABLE = """
+    CREATE TABLE IF NOT EXISTS order_lines (
+        order_id INTEGER NOT NULL,
+        item_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        price INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        PRIMARY KEY (order_id, item_id)
+    ) WITHOUT ROWID"""
+CREATE_ITEM_HOURLY_SALES_TABLE = """
+    CREATE TABLE IF NOT EXISTS item_hourly_sales (
+        hour TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        gross_revenue INTEGER NOT NULL,
+        PRIMARY KEY (hour, item_id)
+    ) WITHOUT ROWID"""
+CREATE_HOURLY_SALES_TABLE = """
+    CREATE TABLE IF NOT EXISTS hourly_sales (
+        hour TEXT NOT NULL PRIMARY KEY,
+        order_count INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        gross_revenue INTEGER NOT NULL,
+        discount INTEGER NOT NULL
+    ) WITHOUT ROWID"""
+INSERT_ORDER = ("INSERT INTO orders (created_at, total_quantity, "
+                "total_price, total_discount) VALUES (?, ?, ?, ?)")
+INSERT_ORDER_LINE = ("INSERT INTO order_lines (order_id, item_id, name, "
+                     "price, quantity) VALUES (?, ?, ?, ?, ?)")
+UPSERT_ITEM_HOURLY_SALES = (
+    "INSERT INTO item_hourly_sales (hour, item_id, quantity, "
+    "gross_revenue) VALUES (?, ?, ?, ?) ON CONFLICT (hour, item_id) DO "
+    "UPDATE SET quantity = quantity + excluded.quantity, "
+    "gross_revenue = gross_revenue + excluded.gross_revenue")
+UPSERT_HOURLY_SALES = (
+    "INSERT INTO hourly_sales (hour, order_count, quantity, gross_revenue, "
+    "discount) VALUES (?, 1, ?, ?, ?) ON CONFLICT (hour) DO UPDATE SET "
+    "order_count = order_count + 1, "
+    "quantity = quantity + excluded.quantity, "
+    "gross_revenue = gross_revenue + excluded.gross_revenue, "
+    "discount = discount + excluded.discount")
+SELECT_ORDERS = ("SELECT o.id, o.created_at, o.total_quantity, o.total_price, "
+                 "o.total_discount, l.item_id, l.name, l.price, l.quantity "
+                 "FROM orders o JOIN order_lines l ON l.order_id = o.id "
+                 "WHERE o.id > ? ORDER BY o.id, l.item_id")
+SELECT_ITEM_HOURLY_SALES = ("SELECT item_id, hour, quantity, gross_revenue "
+                            "FROM item_hourly_sales WHERE hour >= ? AND "
+                            "hour < ? ORDER BY hour, item_id")
+SELECT_HOURLY_SALES = ("SELECT hour, order_count, quantity, gross_revenue, "
+                       "discount FROM hourly_sales WHERE hour >= ? AND "
+                       "hour < ? ORDER BY hour")
+DELETE_ITEM_HOURLY_SALES = "DELETE FROM item_hourly_sales"
+DELETE_HOURLY_SALES = "DELETE FROM hourly_sales"
+DROP_ITEM_HOURLY_SALES_TABLE = "DROP TABLE item_hourly_sales"
+DROP_HOURLY_SALES_TABLE = "DROP TABLE hourly_sales"
+REBUILD_ITEM_HOURLY_SALES = (
+    "INSERT INTO item_hourly_sales (hour, item_id, quantity, "
+    "gross_revenue) SELECT substr(o.created_at, 1, 13) || ':00', l.item_id, "
+    "SUM(l.quantity), SUM(l.price * l.quantity) FROM orders o "
+    "JOIN order_lines l ON l.order_id = o.id GROUP BY 1, 2")
+REBUILD_HOURLY_SALES = (
+    "INSERT INTO hourly_sales (hour, order_count, quantity, gross_revenue, "
+    "discount) SELECT substr(created_at, 1, 13) || ':00', COUNT(*), "
+    "SUM(total_quantity), SUM(total_price + total_discount), "
+    "SUM(total_discount) "
+    "FROM orders GROUP BY 1")
+
+FIRST_HOUR = ""
+LAST_HOUR = "9999"
+
+
+class OrderRepository:
+    """
+    Repository class keeping the log of completed orders and their sales
+    rollups in the local SQLite database of the menu.
+
+    The order log is append-only: an order and its lines are written once,
+    when the order is completed, and never changed. In the same
+    transaction, the order is added to two rollup tables holding the sales
+    of every item for every hour and the sales of every hour, so reports
+    read a few pre-aggregated rows instead of scanning the log. The rollups
+    can be rebuilt from the log at any time.
+
+    Both rollups hold the gross revenue, the price of the items sold before
+    discounts, so the revenue of the items adds up to the revenue of the
+    hours. Discounts are given per cart rather than per item, so they are
+    only kept in the hourly rollup, and the net revenue of an hour is its
+    gross revenue less its discount.
+
+    Attributes:
+        connection (sqlite3.Connection): The connection to the database.
+    """
+    def __init__(self, database_path: str = DATABASE_PATH):
+        self.connection = sqlite3.connect(database_path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute(CREATE_ORDERS_TABLE)
+            self.connection.execute(CREATE_ORDER_LINES_TABLE)
+            self.__migrate()
+
+    def add_order(self, order: Order):
+        """
+        Append a completed order to the order log and add it to the sales
+        rollups, in a single transaction.
+        Args:
+            order (Order): The order to store. Its Id is set to the position
+             allocated in the log.
+        Returns:
+            Order: The stored order.
+        """
+        hour = self.get_hour(order.CreatedAt)
+        with self.connection:
+            order.Id = self.connection.execute(
+                INSERT_ORDER, (order.CreatedAt, order.TotalQuantity,
+                               order.TotalPrice, order.TotalDiscount)
+            ).lastrowid
+            self.connection.executemany(
+                INSERT_ORDER_LINE, ((order.Id, x.Id, x.Name, x.Price, x.Stock)
+                                    for x in order.Lines))
+            self.connection.executemany(
+                UPSERT_ITEM_HOURLY_SALES, ((hour, x.Id, x.Stock,
+                                            x.Price * x.Stock)
+                                           for x in order.Lines))
+            self.connection.execute(
+                UPSERT_HOURLY_SALES, (hour, order.TotalQuantity,
+                                      order.TotalPrice + order.TotalDiscount,
+                                      order.TotalDiscount))
+        return order
+
+    def load_orders(self, after_order_id: int = 0, batch_size: int = 500):
+        """
+        Lazily load the order log.
+        Args:
+            after_order_id (int): The Id of the last order already read; only
+             the orders after it are loaded.
+            batch_size (int): The number of order lines fetched from the
+             database at a time.
+        Yields:
+            Order: The orders, in the order they were completed.
+        """
+        cursor = self.connection.execute(SELECT_ORDERS, (after_order_id,))
+        order = None
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                if order is None or order.Id != row[0]:
+                    if order is not None:
+                        yield order
+                    order = Order(row[0], row[1], [], *row[2:5])
+                order.Lines.append(CafeteriaItem(*row[5:]))
+        if order is not None:
+            yield order
+
+    def load_item_hourly_sales(self, start_hour: str = FIRST_HOUR,
+                               end_hour: str = LAST_HOUR):
+        """
+        Load the sales of every item for every hour of a period.
+        Args:
+            start_hour (str): The first hour of the period, as
+             "YYYY-MM-DD HH:00".
+            end_hour (str): The hour after the period.
+        Returns:
+            list[ItemHourlySales]: The sales, ordered by hour and item Id.
+        """
+        return [ItemHourlySales(*row) for row in self.connection.execute(
+            SELECT_ITEM_HOURLY_SALES, (start_hour, end_hour))]
+
+    def load_hourly_sales(self, start_hour: str = FIRST_HOUR,
+                          end_hour: str = LAST_HOUR):
+        """
+        Load the sales of every hour of a period.
+        Args:
+            start_hour (str): The first hour of the period, as
+             "YYYY-MM-DD HH:00".
+            end_hour (str): The hour after the period.
+        Returns:
+            list[HourlySales]: The sales, ordered by hour.
+        """
+        return [HourlySales(*row) for row in self.connection.execute(
+            SELECT_HOURLY_SALES, (start_hour, end_hour))]
+
+    def load_item_hourly_sales_batches(self, start_hour: str = FIRST_HOUR,
+                                       end_hour: str = LAST_HOUR,
+                                       batch_size: int = 500):
+        """
+        Lazily load the sales of every item for every hour of a period, in
+        batches of raw rows.
+        Args:
+            start_hour (str): The first hour of the period, as
+             "YYYY-MM-DD HH:00".
+            end_hour (str): The hour after the period.
+            batch_size (int): The number of rows fetched from the database at
+             a time.
+        Yields:
+            list[tuple]: The rows of a batch, as item Id, hour, quantity and
+            gross revenue, ordered by hour and item Id.
+        """
+        yield from self.__load_batches(SELECT_ITEM_HOURLY_SALES,
+                                       (start_hour, end_hour), batch_size)
+
+    def load_hourly_sales_batches(self, start_hour: str = FIRST_HOUR,
+                                  end_hour: str = LAST_HOUR,
+                                  batch_size: int = 500):
+        """
+        Lazily load the sales of every hour of a period, in batches of raw
+        rows.
+        Args:
+            start_hour (str): The first hour of the period, as
+             "YYYY-MM-DD HH:00".
+            end_hour (str): The hour after the period.
+            batch_size (int): The number of rows fetched from the database at
+             a time.
+        Yields:
+            list[tuple]: The rows of a batch, as hour, order count, quantity,
+            gross revenue and discount, ordered by hour.
+        """
+        yield from self.__load_batches(SELECT_HOURLY_SALES,
+                                       (start_hour, end_hour), batch_size)
+
+    def rebuild_sales_rollups(self):
+        """
+        Rebuild the sales rollups from the order log, in a single
+        transaction.
+        """
+        with self.connection:
+            self.connection.execute(DELETE_ITEM_HOURLY_SALES)
+            self.connection.execute(DELETE_HOURLY_SALES)
+            self.connection.execute(REBUILD_ITEM_HOURLY_SALES)
+            self.connection.execute(REBUILD_HOURLY_SALES)
+
+    def __migrate(self):
+        """
+        Create the sales rollups, or rebuild the rollups created by an older
+        version of the application, which kept the revenue of the items
+        before discounts and the revenue of the hours after them in columns
+        of the same name.
+        """
+        columns = [x[1] for x in self.connection.execute(
+            "PRAGMA table_info(hourly_sales)")]
+        if "revenue" in columns:
+            self.connection.execute(DROP_ITEM_HOURLY_SALES_TABLE)
+            self.connection.execute(DROP_HOURLY_SALES_TABLE)
+        self.connection.execute(CREATE_ITEM_HOURLY_SALES_TABLE)
+        self.connection.execute(CREATE_HOURLY_SALES_TABLE)
+        if "revenue" in columns:
+            self.connection.execute(REBUILD_ITEM_HOURLY_SALES)
+            self.connection.execute(REBUILD_HOURLY_SALES)
+
+    def __load_batches(self, query: str, parameters: tuple,
+                       batch_size: int):
+        """
+        Lazily run a query, fetching its rows in batches.
+        Args:
+            query (str): The query to run.
+            parameters (tuple): The parameters of the query.
+            batch_size (int): The number of rows fetched at a time.
+        Yields:
+            list[tuple]: The rows of a batch.
+        """
+        cursor = self.connection.execute(query, parameters)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+    @staticmethod
+    def get_hour(created_at: str):
+        """
+        Get the hour a date and time belongs to.
+        Args:
+            created_at (str): A date and time, as "YYYY-MM-DD HH:MM:SS".
+        Returns:
+            str: The hour, as "YYYY-MM-DD HH:00".
+        """
+        return f"{created_at[:13]}:00"
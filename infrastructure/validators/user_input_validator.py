@@ -1,9 +1,15 @@
 import re
 from dataclasses import dataclass
+from typing import Union
 
 from colorama import Style
 
 from entities.cafeteria_item import CafeteriaItem
+from entities.compact_menu import CompactMenu
+from entities.menu import Menu
+from infrastructure.helpers.console_io import ConsoleIO
+from infrastructure.helpers.io_port import IOPort
+from infrastructure.helpers.price_converter import PriceConverter
 
 
 @dataclass
@@ -14,7 +20,8 @@ class UserInputValidator:
     This class provides static methods for validating various types of user
     inputs, including integers, decimals, item IDs, and names.
     It also handles input parsing and user prompts related to the
-    cafeteria application.
+    cafeteria application. The methods prompting the user read and write
+    through the IOPort they are given, or the console by default.
     """
     @staticmethod
     def create_array_from_user_input(user_input: str):
@@ -29,15 +36,19 @@ class UserInputValidator:
         return [int(x) for x in user_input.split(',') if x.strip().isdigit()]
 
     @staticmethod
-    def validate_item_ids(items: list[CafeteriaItem],
-                          is_removing: bool = False):
+    def validate_item_ids(items: Union[Menu, list[CafeteriaItem],
+                                       dict[int, CafeteriaItem]],
+                          is_removing: bool = False, io: IOPort = None):
         """
         Validate user input for selecting CafeteriaItems by their IDs.
         Args:
-            items (list[CafeteriaItem]): The list of CafeteriaItems to validate
+            items (Union[Menu, list[CafeteriaItem], dict[int, CafeteriaItem]]):
+             The menu, list of CafeteriaItems or lines of a cart to validate
              against.
             is_removing (bool): A flag indicating whether the operation is for
              removal.
+            io (IOPort): The input and output to prompt the user with.
+             Defaults to the console.
         Returns:
            list[CafeteriaItem]: A list of CafeteriaItems corresponding to the
            validated item IDs. This function prompts the user to input item
@@ -46,43 +57,37 @@ class UserInputValidator:
            the input is additionally validated to ensure the IDs exist in the
            provided list of items.
         """
+        io = io or ConsoleIO()
         while True:
             user_input = (UserInputValidator.validate_input_before_parsing
-                          (items, is_removing))
+                          (items, is_removing, io=io))
             item_ids = (UserInputValidator.create_array_from_user_input
                         (user_input))
-            menu_ids = [x.Id for x in items]
-            is_input_valid_ids = all(ele in menu_ids for ele in item_ids)
-            if not is_input_valid_ids:
-                print("The value you entered is invalid, please try again.")
+            found_items = UserInputValidator.__find_items_by_ids(items,
+                                                                 item_ids)
+            if found_items is None:
+                io.print("The value you entered is invalid, please try again.")
             else:
-                found_items = [item for item in items if item.Id in item_ids]
                 break
         return found_items
 
     @staticmethod
-    def validate_user_input_is_comma_separated(user_input: str, start: int,
-                                               end: int):
+    def validate_user_input_is_comma_separated(user_input: str):
         """
-        Validate that user input is a comma-separated list of integers within
-        a specified range.
+        Validate that user input is a comma-separated list of integers.
         Args:
             user_input (str): The user-provided input to be validated.
-            start (int): The lower bound of the allowed range.
-            end (int): The upper bound of the allowed range.
         Returns:
-            bool: True if the input is a valid comma-separated list of integers
-             within the specified range, False otherwise. This function checks
-             whether the user input is a non-empty string consisting of
-             integers separated by commas. The integers are expected to be
-             within the specified range [start, end].
+            bool: True if the input is a valid comma-separated list of
+             integers, False otherwise. This function checks whether the user
+             input is a non-empty string consisting of integers separated by
+             commas, optionally followed by a space. Whether the integers are
+             the IDs of existing items is checked separately, since item IDs
+             are not consecutive.
         """
         if len(user_input) == 0:
             return False
-        pattern = re.compile(
-            r'^(?:[' + str(start) + '-' + str(end) + '](?:, ?[' + str(start) +
-            '-' + str(end) + '])*)?$')
-        return bool(re.match(pattern, user_input))
+        return bool(re.match(r'^\d+(?:, ?\d+)*$', user_input))
 
     @staticmethod
     def validate_user_input_is_a_number(user_input: str):
@@ -126,27 +131,33 @@ class UserInputValidator:
             return False
 
     @staticmethod
-    def validate_input_before_parsing(cafeteria_items: list[CafeteriaItem],
-                                      is_removing: bool = False,
-                                      is_updating: bool = False):
+    def validate_input_before_parsing(
+            cafeteria_items: Union[Menu, list[CafeteriaItem],
+                                   dict[int, CafeteriaItem]],
+            is_removing: bool = False, is_updating: bool = False,
+            io: IOPort = None):
         """
         Validate user input before parsing for ordering, updating, or
         removing items.
         Args:
-            cafeteria_items (list[CafeteriaItem]): The list of CafeteriaItems
-             to validate against.
+            cafeteria_items (Union[Menu, list[CafeteriaItem],
+             dict[int, CafeteriaItem]]): The menu, list of CafeteriaItems or
+             lines of a cart to validate against.
             is_removing (bool): A flag indicating whether the operation is for
              removing.
             is_updating (bool): A flag indicating whether the operation is for
              updating.
+            io (IOPort): The input and output to prompt the user with.
+             Defaults to the console.
         Returns:
             str: The validated user input containing item numbers separated
             by commas.
         This function prompts the user to input item numbers, validates the
-        input against the provided list of CafeteriaItems, and returns the
+        input against the IDs of the provided CafeteriaItems, and returns the
         validated user input. It provides context-specific information based
         on the operation (order, update, or remove).
         """
+        io = io or ConsoleIO()
         action = "order"
         if is_updating:
             action = "update"
@@ -160,21 +171,26 @@ class UserInputValidator:
                          "If you wish to remove more than one item please "
                          "separate each item number by comma.\n")
         while True:
-            user_input = input(info_text)
-            first_item = cafeteria_items[0]
-            last_item = cafeteria_items[-1]
+            user_input = io.input(info_text)
             is_user_input_valid = (UserInputValidator.
                                    validate_user_input_is_comma_separated
-                                   (user_input, first_item.Id, last_item.Id))
+                                   (user_input))
+            if is_user_input_valid:
+                item_ids = (UserInputValidator.create_array_from_user_input
+                            (user_input))
+                is_user_input_valid = (UserInputValidator.__find_items_by_ids
+                                       (cafeteria_items, item_ids)
+                                       is not None)
             if not is_user_input_valid:
-                print("The value you entered is invalid, please try again.")
+                io.print("The value you entered is invalid, please try again.")
             else:
                 break
         return user_input
 
     @staticmethod
     def validate_input_for_items(item: CafeteriaItem,
-                                 is_removing: bool = False):
+                                 is_removing: bool = False,
+                                 io: IOPort = None):
         """
         Validate user input for the quantity of a CafeteriaItem to order or
         remove.
@@ -183,46 +199,53 @@ class UserInputValidator:
              being validated.
             is_removing (bool): A flag indicating whether the operation is for
              removing.
+            io (IOPort): The input and output to prompt the user with.
+             Defaults to the console.
         Returns:
             str: The validated user input representing the quantity.
         This function prompts the user to input the quantity of a specific
         CafeteriaItem for ordering or removing, validates the input as a
         non-zero positive integer, and returns the validated user input.
         """
+        io = io or ConsoleIO()
         info_text = "order"
         if is_removing:
             info_text = "remove"
         if item is None:
-            print("Sorry, we could find an item with that Id")
+            io.print("Sorry, we could find an item with that Id")
         while True:
-            user_input = input(f"How many {item.Name} would you like to "
-                               f"{info_text}?\n")
+            user_input = io.input(f"How many {item.Name} would you like to "
+                                  f"{info_text}?\n")
             is_user_input_valid = (UserInputValidator
                                    .validate_user_input_is_a_number(user_input)
                                    )
             if not is_user_input_valid:
-                print("You didn't enter a valid input. Please try again.")
+                io.print("You didn't enter a valid input. Please try again.")
             else:
                 break
         return user_input
 
     @staticmethod
-    def validate_user_name():
+    def validate_user_name(io: IOPort = None):
         """
         Validate user input as a valid name.
+        Args:
+            io (IOPort): The input and output to prompt the user with.
+             Defaults to the console.
         Returns:
             str: The validated user input representing the user's name.
         This function prompts the user to input their name and validates the
-        input as a valid name using the "__validate_user_input_is_name"
-        private method. If the input is not a valid name, the user is
+        input as a valid name using the "validate_user_input_is_name"
+        method. If the input is not a valid name, the user is
         prompted to try again.
         """
+        io = io or ConsoleIO()
         while True:
-            user_input = input("What is your name?\n")
-            if not UserInputValidator.__validate_user_input_is_name(
-                    user_input):  # noqa
-                print(f"Hmm {user_input.title()} didn't quite hit the bark. "
-                      f"Try again.")
+            user_input = io.input("What is your name?\n")
+            if not UserInputValidator.validate_user_input_is_name(
+                    user_input):
+                io.print(f"Hmm {user_input.title()} didn't quite hit the "
+                         f"bark. Try again.")
             else:
                 break
         return user_input
@@ -230,7 +253,8 @@ class UserInputValidator:
     @staticmethod
     def validate_user_input_is_correct_quantity(item_name: str,
                                                 is_updating: bool = False,
-                                                is_admin: bool = False):
+                                                is_admin: bool = False,
+                                                io: IOPort = None):
         """
         Validate user input for the quantity of a CafeteriaItem during addition
         or update.
@@ -241,6 +265,8 @@ class UserInputValidator:
              updating.
             is_admin (bool): A flag indicating whether the user is an
              administrator.
+            io (IOPort): The input and output to prompt the user with.
+             Defaults to the console.
         Returns:
             Union[int, str]: The validated user input representing the quantity
              or "Skip" if skipped.
@@ -251,6 +277,7 @@ class UserInputValidator:
         it returns the quantity as an integer; otherwise, the user is prompted
         to try again. For administrators, the option to skip is available.
         """
+        io = io or ConsoleIO()
         result = ""
         info_text = (f"Please enter the amount of {item_name} you would like "
                      f"to add to the menu:\n")
@@ -259,7 +286,7 @@ class UserInputValidator:
                          f"like to add to the menu, or enter "
                          f"{Style.BRIGHT}'Skip'{Style.RESET_ALL}:\n")
         while True:
-            item_quantity = input(info_text)
+            item_quantity = io.input(info_text)
             if is_updating and item_quantity.capitalize() == "Skip":
                 result = "Skip"
                 break
@@ -267,7 +294,7 @@ class UserInputValidator:
                                       validate_user_input_is_a_number
                                       (item_quantity))
             if not validate_item_quantity:
-                print("Please enter a valid input")
+                io.print("Please enter a valid input")
             else:
                 result = int(item_quantity)
                 break
@@ -276,7 +303,8 @@ class UserInputValidator:
     @staticmethod
     def validate_user_input_is_correct_price(item_name: str,
                                              is_updating: bool = False,
-                                             is_admin: bool = False):
+                                             is_admin: bool = False,
+                                             io: IOPort = None):
         """
         Validate user input for the price of a CafeteriaItem during addition or
         update.
@@ -287,16 +315,19 @@ class UserInputValidator:
              updating.
             is_admin (bool): A flag indicating whether the user is an
              administrator.
+            io (IOPort): The input and output to prompt the user with.
+             Defaults to the console.
         Returns:
-            Union[float, str]: The validated user input representing the price
-             or "Skip" if skipped.
+            Union[int, str]: The validated user input representing the price
+             in pence or "Skip" if skipped.
         This function prompts the user to input the price for a CafeteriaItem
         during addition or update. If updating and the user enters "Skip,"
         the function returns "Skip". If the input is not "Skip," the function
         validates the input as a positive decimal number. If the input is
-        valid, it returns the price as a float; otherwise, the user is prompted
+        valid, it returns the price in pence; otherwise, the user is prompted
         to try again. For administrators, the option to skip is available.
         """
+        io = io or ConsoleIO()
         result = ""
         info_text = f"Please enter the price for one {item_name}:\n"
         if is_admin:
@@ -304,7 +335,7 @@ class UserInputValidator:
                 f"Please enter the price for one {item_name} or enter "
                 f"{Style.BRIGHT}'Skip'{Style.RESET_ALL}:\n")
         while True:
-            item_price = input(info_text)
+            item_price = io.input(info_text)
             if is_updating and item_price.capitalize() == "Skip":
                 result = "Skip"
                 break
@@ -312,25 +343,27 @@ class UserInputValidator:
                                    validate_user_input_is_a_decimal(item_price)
                                    )
             if not validate_item_price:
-                print("Please enter a valid input")
+                io.print("Please enter a valid input")
             else:
-                result = float(item_price)
+                result = PriceConverter.to_pence(item_price)
                 break
         return result
 
     @staticmethod
-    def validate_user_input_is_correct_item_name(menu: list[CafeteriaItem],
-                                                 info_text: str,
-                                                 is_updating: bool = False):
+    def validate_user_input_is_correct_item_name(menu: Menu, info_text: str,
+                                                 is_updating: bool = False,
+                                                 io: IOPort = None):
         """
         Validate user input for the name of a CafeteriaItem during addition or
         update.
         Args:
-            menu (list[CafeteriaItem]): The list of CafeteriaItems in the menu.
+            menu (Menu): The menu of CafeteriaItems.
             info_text (str): The informational text prompting the user for
              input.
             is_updating (bool): A flag indicating whether the operation is for
              updating.
+            io (IOPort): The input and output to prompt the user with.
+             Defaults to the console.
         Returns:
             str: The validated user input representing the item name.
         This function prompts the user to input the name for a CafeteriaItem
@@ -340,17 +373,17 @@ class UserInputValidator:
         breaks out of the loop. If the input is not valid, the user is prompted
         to try again; otherwise, the function returns the validated item name.
         """
+        io = io or ConsoleIO()
         while True:
-            item_name = input(info_text)
+            item_name = io.input(info_text)
             if len(item_name) == 0:
-                print("Please enter a valid input")
-            elif not UserInputValidator.__validate_user_input_is_name(
+                io.print("Please enter a valid input")
+            elif not UserInputValidator.validate_user_input_is_name(
                     item_name):
-                print("Please enter a valid input")
-            elif next((x for x in menu if x.Name.capitalize() == item_name
-                      .capitalize()), None) is not None:
-                print(f"An item with the name {item_name.title()} "
-                      f"already exists in the menu")
+                io.print("Please enter a valid input")
+            elif menu.contains_name(item_name):
+                io.print(f"An item with the name {item_name.title()} "
+                         f"already exists in the menu")
             elif is_updating and item_name.capitalize() == "Skip":
                 break
             else:
@@ -358,14 +391,46 @@ class UserInputValidator:
         return item_name
 
     @staticmethod
-    def __validate_user_input_is_name(user_input: str):
+    def __find_items_by_ids(items: Union[Menu, list[CafeteriaItem],
+                                         dict[int, CafeteriaItem]],
+                            item_ids: list[int]):
+        """
+        Find the CafeteriaItems matching the given IDs.
+        Args:
+            items (Union[Menu, list[CafeteriaItem], dict[int, CafeteriaItem]]):
+             The menu, list of CafeteriaItems or lines of a cart to search.
+            item_ids (list[int]): The IDs of the items to find.
+        Returns:
+            Union[list[CafeteriaItem], None]: The CafeteriaItems matching the
+            IDs, without duplicates, or None if any of the IDs is not found.
+        This private method uses the menu's ID index when a Menu or a
+        CompactMenu is provided, looks the IDs up directly in the lines of a
+        cart, which are keyed by ID, and builds a one-off index for plain
+        lists.
+        """
+        if isinstance(items, (Menu, CompactMenu)):
+            find_item = items.get_by_id
+        elif isinstance(items, dict):
+            find_item = items.get
+        else:
+            find_item = {item.Id: item for item in items}.get
+        found_items = []
+        for item_id in dict.fromkeys(item_ids):
+            item = find_item(item_id)
+            if item is None:
+                return None
+            found_items.append(item)
+        return found_items
+
+    @staticmethod
+    def validate_user_input_is_name(user_input: str):
         """
         Validate user input as a valid name.
         Args:
             user_input (str): The user input to be validated.
         Returns:
             bool: True if the input is a valid name, False otherwise.
-        This private method checks if the given user input is a valid name.
+        This function checks if the given user input is a valid name.
         It returns True if the input is a non-empty string containing only
         alphabetic characters, optionally separated by spaces, apostrophes
         or hyphens.
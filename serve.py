@@ -0,0 +1,26 @@
+import argparse
+import asyncio
+
+from services.session_host import (CHECKPOINT_MAX_AGE, IDLE_TIMEOUT,
+                                   MAX_QUEUED_SESSIONS, MAX_SESSIONS,
+                                   SessionHost)
+
+parser = argparse.ArgumentParser(
+    description="Serve Woofeteria sessions over TCP or a Unix socket.")
+parser.add_argument("--host", default="127.0.0.1")
+parser.add_argument("--port", type=int, default=8023)
+parser.add_argument("--unix-socket", dest="unix_path")
+parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS)
+parser.add_argument("--max-queued", type=int, default=MAX_QUEUED_SESSIONS)
+parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT)
+parser.add_argument("--checkpoint-max-age", type=int,
+                    default=CHECKPOINT_MAX_AGE)
+arguments = parser.parse_args()
+
+session_host = SessionHost(max_sessions=arguments.max_sessions,
+                           checkpoint_max_age=arguments.checkpoint_max_age,
+                           max_queued=arguments.max_queued,
+                           idle_timeout=arguments.idle_timeout)
+
+asyncio.run(session_host.serve(arguments.host, arguments.port,
+                               arguments.unix_path))
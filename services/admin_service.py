@@ -1,7 +1,13 @@
+import csv
+import os
+
 from infrastructure.helpers.color_helper import ColorHelper
+from infrastructure.helpers.console_io import ConsoleIO
+from infrastructure.helpers.io_port import IOPort
 from infrastructure.helpers.json_file_helper import JsonFileHelper
 from infrastructure.validators.user_input_validator import UserInputValidator
 from services.cafeteria_item_service import CafeteriaItemService
+from services.catalog_service import CatalogService
 
 
 class AdminService:
@@ -11,10 +17,16 @@ class AdminService:
     Attributes:
         cafeteria_item_service (CafeteriaItemService): An instance of
          CafeteriaItemService for managing cafeteria items.
-        menu (list[CafeteriaItem]): The current cafeteria menu.
+        catalog_service (CatalogService): An instance of CatalogService for
+         importing and exporting the menu in bulk.
+        menu (Menu): The current cafeteria menu.
+        io (IOPort): The input and output the admin is prompted with.
     """
-    def __init__(self):
-        self.cafeteria_item_service = CafeteriaItemService()
+    def __init__(self, io: IOPort = None):
+        self.io = io or ConsoleIO()
+        self.cafeteria_item_service = CafeteriaItemService(io=self.io)
+        self.catalog_service = CatalogService(self.cafeteria_item_service,
+                                              self.io)
         self.menu = self.cafeteria_item_service.get_cafeteria_menu()
 
     def validate_if_admin_name_provided(self, user_input: str):
@@ -23,11 +35,11 @@ class AdminService:
         Args:
             user_input (str): The user input to be validated.
         Returns:
-            tuple[bool, Union[None, menu (list[CafeteriaItem])]]: A tuple
+            tuple[bool, Union[None, menu (Menu)]]: A tuple
             indicating whether the validation is successful (True or False)
             and, if successful, an updated version of the menu.
             The second value of the tuple is a  union which can return
-            either None or menu (list[CafeteriaItem]).
+            either None or menu (Menu).
         This method reads the admin information from the configuration file
         and compares the provided user input with the admin username.
         If they match, the method returns a tuple with True and a menu
@@ -42,7 +54,7 @@ class AdminService:
                 result = self.__show_admin_flow(admin_info["admin_password"])
                 return result
         except FileNotFoundError:
-            print("Configuration file not found")
+            self.io.print("Configuration file not found")
             return False, None
 
     def __show_admin_flow(self,  expected_admin_password: str):
@@ -52,7 +64,7 @@ class AdminService:
             expected_admin_password (str): The expected password for admin
              authorization.
         Returns:
-            tuple[bool, Union[None, menu (list[CafeteriaItem])]]: A tuple
+            tuple[bool, Union[None, menu (Menu)]]: A tuple
             indicating whether the admin authorization is successful
             (True or False) and, if successful, a menu instance.
         This private method prompts the user to enter the secret password
@@ -65,9 +77,10 @@ class AdminService:
         retry_counter = 3
         result = False, None
         for attempted_try in range(retry_counter):
-            user_input = input("Please enter the secret password:\n")
+            user_input = self.io.input("Please enter the secret password:\n")
             if user_input == expected_admin_password:
-                print("You have successfully authorized the secret woof mode.")
+                self.io.print("You have successfully authorized the secret "
+                              "woof mode.")
                 result = self.__show_available_options()
                 break
             else:
@@ -77,8 +90,8 @@ class AdminService:
                 if attemps_left > 0:
                     attempts_left_info = (f"You have {attemps_left}"
                                           f" attempts left")
-                print(f"Password incorrect. Woofin mode access denied. "
-                      f"{attempts_left_info}")
+                self.io.print(f"Password incorrect. Woofin mode access "
+                              f"denied. {attempts_left_info}")
                 continue
         return result
 
@@ -87,14 +100,15 @@ class AdminService:
         Show the available options for editing the cafeteria menu in admin
         mode.
         Returns:
-            tuple[bool, Union[None, menu (list[CafeteriaItem])]]: A tuple
+            tuple[bool, Union[None, menu (Menu)]]: A tuple
             indicating whether the admin flow should be continued
             (True or False) and, if applicable, a menu instance.
         This private method displays the available options for editing the
         cafeteria menu in admin mode. It prompts the user to choose between
-        adding, updating, removing items from the menu, or exiting the
-        admin mode. Depending on the user's choice, it calls the respective
-        private methods (__handle_add, __handle_update, __handle_remove) and
+        adding, updating, removing, importing or exporting items, or exiting
+        the admin mode. Depending on the user's choice, it calls the
+        respective private methods (__handle_add, __handle_update,
+        __handle_remove, __handle_import, __handle_export) and
         continues or completes the admin flow accordingly. It returns a tuple
         with a boolean value indicating whether the admin flow should be
         continued (True) or not (False), and if applicable, a menu instance.
@@ -103,8 +117,8 @@ class AdminService:
         is_flow_continued = False
         while True:
             self.cafeteria_item_service.print_cafeteria_menu(self.menu)
-            user_input = input(f"How would you like to edit the menu?"
-                               f"{ColorHelper.color_add_update_remove_exit_text()}\n")  # noqa
+            user_input = self.io.input(f"How would you like to edit the menu?"
+                                       f"{ColorHelper.color_add_update_remove_import_export_exit_text()}\n")  # noqa
             if user_input.capitalize() == "Add":
                 result = False, self.__handle_add()
                 is_flow_continued = self.__continue_or_complete_flow()
@@ -114,12 +128,20 @@ class AdminService:
             elif user_input.capitalize() == "Remove":
                 result = False, self.__handle_remove()
                 is_flow_continued = self.__continue_or_complete_flow()
+            elif user_input.capitalize() == "Import":
+                result = False, self.__handle_import()
+                is_flow_continued = self.__continue_or_complete_flow()
+            elif user_input.capitalize() == "Export":
+                self.__handle_export()
+                result = False, self.menu
+                is_flow_continued = self.__continue_or_complete_flow()
             elif user_input.capitalize() == "Exit":
                 result = False, self.menu
                 is_flow_continued = False
             else:
-                print(f"The input entered is not valid. Please try using"
-                      f"{ColorHelper.color_add_update_remove_exit_text()}")
+                self.io.print(f"The input entered is not valid. Please try "
+                              f"using"
+                              f"{ColorHelper.color_add_update_remove_import_export_exit_text()}")  # noqa
                 is_flow_continued = True
             if is_flow_continued:
                 continue
@@ -131,7 +153,7 @@ class AdminService:
         """
         Handle the updating of cafeteria items in the menu.
         Returns:
-            list[CafeteriaItem]: The updated menu after applying the specified
+            Menu: The updated menu after applying the specified
             updates.
         This private method handles the process of updating cafeteria items in
         the menu. It prompts the user to input the item IDs they wish to update
@@ -140,7 +162,7 @@ class AdminService:
         returns the updated menu list.
         """
         user_input = (UserInputValidator.validate_input_before_parsing
-                      (self.menu, False, True))
+                      (self.menu, False, True, self.io))
         item_ids = UserInputValidator.create_array_from_user_input(user_input)
         self.menu = (self.cafeteria_item_service.update_items
                      (item_ids, self.menu, True))
@@ -150,31 +172,31 @@ class AdminService:
         """
         Handle the removal of cafeteria items from the menu.
         Returns:
-            list[CafeteriaItem]: The updated menu after removing specified
+            Menu: The updated menu after removing specified
             items.
         This private method handles the process of removing cafeteria items
         from the menu. It prompts the user to input the item IDs they wish to
-        remove and calls the recalculate_ids method from the
-        CafeteriaItemService to perform the removal. The updated menu, with the
-        specified items removed, is then stored, and the method returns the
-        updated menu list.
+        remove and calls the remove_items_from_menu method from the
+        CafeteriaItemService to perform the removal. The remaining items keep
+        their IDs.
+        The updated menu, with the specified items removed, is then stored,
+        and the method returns the updated menu.
         """
         user_input = (UserInputValidator.validate_input_before_parsing
-                      (self.menu, True))
+                      (self.menu, True, io=self.io))
         item_ids = UserInputValidator.create_array_from_user_input(user_input)
-        updated_menu = [item for item in self.menu if item.Id not in item_ids]
-        item_removed = [item for item in self.menu if item.Id in item_ids]
+        item_removed = (self.cafeteria_item_service.remove_items_from_menu
+                        (item_ids, self.menu))
         removed_item_names = [x.Name for x in item_removed]
-        print(f"The following item(s) have been removed: "
-              f"{', '.join(removed_item_names)}")
-        self.menu = self.cafeteria_item_service.recalculate_ids(updated_menu)
+        self.io.print(f"The following item(s) have been removed: "
+                      f"{', '.join(removed_item_names)}")
         return self.menu
 
     def __handle_add(self):
         """
         Handle the addition of new cafeteria items to the menu.
         Returns:
-            list[CafeteriaItem]: The updated menu after adding new items.
+            Menu: The updated menu after adding new items.
         This private method handles the process of adding new cafeteria items
         to the menu. It prompts the user to input the number of items they
         want to add, validates the input, and then calls the add_items_to_menu
@@ -183,22 +205,68 @@ class AdminService:
         and the method returns the updated menu list.
         """
         while True:
-            user_input = input("How many items would you like to add?\n")
+            user_input = self.io.input("How many items would you like to "
+                                       "add?\n")
             validate_user_input = (UserInputValidator
                                    .validate_user_input_is_a_number(user_input)
                                    )
             if not validate_user_input:
-                print("Please enter a valid input")
+                self.io.print("Please enter a valid input")
             elif validate_user_input and int(user_input) == 0:
-                print(f"You cannot add {user_input} items")
+                self.io.print(f"You cannot add {user_input} items")
             else:
                 self.menu = (self.cafeteria_item_service.add_items_to_menu
                              (int(user_input), self.menu))
                 break
         return self.menu
 
-    @staticmethod
-    def __continue_or_complete_flow():
+    def __handle_import(self):
+        """
+        Handle the bulk import of cafeteria items from a catalog file.
+        Returns:
+            Menu: The updated menu after importing the items.
+        This private method prompts the user for the path of an existing
+        .csv or .jsonl catalog file and calls the import_catalog method from
+        the CatalogService, which validates every row and adds the valid
+        items to the menu without any further prompts.
+        """
+        while True:
+            file_path = self.io.input("Please enter the path of the .csv or "
+                                      ".jsonl catalog file to import:\n"
+                                      ).strip()
+            if not CatalogService.is_catalog_file(file_path):
+                self.io.print("Please enter the path of a .csv or .jsonl file")
+            elif not os.path.isfile(file_path):
+                self.io.print(f"The file {file_path} could not be found")
+            else:
+                break
+        try:
+            self.catalog_service.import_catalog(file_path, self.menu)
+        except (OSError, UnicodeDecodeError, csv.Error) as error:
+            self.io.print(f"The catalog could not be imported: {error}")
+        return self.menu
+
+    def __handle_export(self):
+        """
+        Handle the bulk export of the cafeteria items to a catalog file.
+        This private method prompts the user for the path of a .csv or .jsonl
+        catalog file and calls the export_catalog method from the
+        CatalogService to write every item of the menu to it.
+        """
+        while True:
+            file_path = self.io.input("Please enter the path of the .csv or "
+                                      ".jsonl catalog file to export to:\n"
+                                      ).strip()
+            if not CatalogService.is_catalog_file(file_path):
+                self.io.print("Please enter the path of a .csv or .jsonl file")
+            else:
+                break
+        try:
+            self.catalog_service.export_catalog(file_path)
+        except OSError as error:
+            self.io.print(f"The catalog could not be exported: {error}")
+
+    def __continue_or_complete_flow(self):
         """
         Determine whether to continue editing the menu or exit secret Woofin
         mode.
@@ -213,12 +281,13 @@ class AdminService:
         """
         result = False
         while True:
-            user_input = input(f"Do you want to continue editing the menu? "
-                               f"{ColorHelper.color_yes_no_text()}\n")
+            user_input = self.io.input(f"Do you want to continue editing the "
+                                       f"menu? "
+                                       f"{ColorHelper.color_yes_no_text()}\n")
             if user_input.capitalize() == "Y":
                 result = True
                 break
             elif user_input.capitalize() == "N":
-                print("Exiting secret Woofin mode")
+                self.io.print("Exiting secret Woofin mode")
                 break
         return result
@@ -1,130 +1,328 @@
+import math
+
 from colorama import Style
-from tabulate import tabulate
 
 from entities.cafeteria_item import CafeteriaItem
+from entities.compact_menu import CompactMenu
+from entities.menu import Menu
+from infrastructure.enums.enum_stock_movement_type import StockMovementType
+from infrastructure.helpers.color_helper import ColorHelper
+from infrastructure.helpers.console_io import ConsoleIO
+from infrastructure.helpers.inventory import Inventory
+from infrastructure.helpers.io_port import IOPort
+from infrastructure.helpers.menu_search_index import MenuSearchIndex
+from infrastructure.helpers.menu_table_renderer import MenuTableRenderer
 from infrastructure.helpers.price_converter import PriceConverter
+from infrastructure.repositories.menu_repository import MenuRepository
 from infrastructure.validators.user_input_validator import UserInputValidator
 
+MENU_PAGE_SIZE = 20
+COMPACT_MENU_THRESHOLD = 100000
+SEARCH_RESULT_LIMIT = 10
+
 
 class CafeteriaItemService:
     """
     Service class for managing cafeteria items and related functionalities.
 
     Attributes:
-        cafeteria_items (list[CafeteriaItem]): A list containing cafeteria
-         items.
+        menu_repository (MenuRepository): The repository persisting the
+         cafeteria items and their stock.
+        is_compact (Union[bool, None]): A flag indicating whether the menu is
+         held in a CompactMenu, which uses a fraction of the memory for very
+         large catalogs. If None, the default, a CompactMenu is used when
+         the menu has at least COMPACT_MENU_THRESHOLD items as it is loaded.
+        cafeteria_items (Union[Menu, CompactMenu]): The menu containing the
+         cafeteria items, indexed by Id and by name. It is loaded from the
+         repository the first time it is accessed.
         price_converter (PriceConverter): An instance of PriceConverter for
          handling price-related operations.
+        menu_table_renderer (MenuTableRenderer): An instance of
+         MenuTableRenderer caching the rendered menu table.
+        menu_search_index (MenuSearchIndex): An instance of MenuSearchIndex
+         finding items by part of their name, kept up to date as items are
+         added, renamed and removed.
+        io (IOPort): The input and output the user is prompted with.
+        inventory (Inventory): The inventory stock is taken from and given
+         back to, which can be shared with the services of other threads.
     """
-    def __init__(self):
-        self.cafeteria_items = self.__populate_cafeteria_menu()
+    def __init__(self, menu_repository: MenuRepository = None,
+                 is_compact: bool = None, io: IOPort = None,
+                 inventory: Inventory = None):
+        self.io = io or ConsoleIO()
+        self.inventory = inventory or Inventory()
+        self.menu_repository = menu_repository or MenuRepository()
+        self.is_compact = is_compact
+        self.menu_repository.seed_items(self.__populate_cafeteria_menu())
+        self.__cafeteria_items = None
         self.price_converter = PriceConverter()
+        self.menu_table_renderer = MenuTableRenderer(self.price_converter)
+        self.menu_search_index = MenuSearchIndex()
+
+    @property
+    def cafeteria_items(self):
+        if self.__cafeteria_items is None:
+            is_compact = self.is_compact
+            if is_compact is None:
+                is_compact = (self.menu_repository.count_items()
+                              >= COMPACT_MENU_THRESHOLD)
+            menu_type = CompactMenu if is_compact else Menu
+            self.__cafeteria_items = menu_type(
+                self.menu_repository.load_items(),
+                self.menu_repository.load_removed_items())
+        return self.__cafeteria_items
+
+    @cafeteria_items.setter
+    def cafeteria_items(self, menu: Menu):
+        self.__cafeteria_items = menu
 
-    def print_cafeteria_menu(self, menu: list[CafeteriaItem]):
+    def print_cafeteria_menu(self, menu: Menu,
+                             page_size: int = MENU_PAGE_SIZE):
         """
         Print the Cafeteria menu in a formatted table.
         Args:
-            menu (list[CafeteriaItem]): The list of CafeteriaItems to be
-             displayed.
-        This method generates a formatted table to display the Cafeteria menu.
+            menu (Menu): The menu of CafeteriaItems to be displayed.
+            page_size (int): The number of items shown per page when the menu
+             does not fit on a single page.
+        This method prints a formatted table displaying the Cafeteria menu.
         Each row of the table includes the item ID, name, price
         (formatted with two decimal places), and stock quantity of the
-        CafeteriaItem. The table is printed to the console using the 'pretty'
-        table format from tabulate.
-        """
-        headers = ["ID", "Name", "Price", "Stock"]
-        table_items = []
-        for item in menu:
-            table_item = [item.Id, item.Name, f"£ {item.Price:.2f}",
-                          item.Stock]
-            table_items.append(table_item)
-        table1 = tabulate(table_items, headers=headers, tablefmt="pretty")
-        print(table1)
+        CafeteriaItem. The table is rendered by the MenuTableRenderer, which
+        reuses the previously rendered table when the menu has not changed,
+        and only formats the rows that changed otherwise. Menus with more
+        items than the page size are shown one page at a time instead.
+        """
+        if len(menu) <= page_size:
+            self.io.print(self.menu_table_renderer.render(menu))
+        else:
+            self.__browse_cafeteria_menu(menu, page_size)
+
+    def print_cafeteria_menu_page(self, menu: Menu, page: int,
+                                  page_size: int = MENU_PAGE_SIZE):
+        """
+        Print a single page of the Cafeteria menu in a formatted table.
+        Args:
+            menu (Menu): The menu of CafeteriaItems to be displayed.
+            page (int): The zero-based number of the page.
+            page_size (int): The number of items per page.
+        This method streams the items of the page from the menu with a
+        generator, so only the visible items are formatted, however large
+        the menu is. The page is followed by a line telling which items are
+        shown.
+        """
+        start = page * page_size
+        stop = min(start + page_size, len(menu))
+        items = menu.iterate_range(start, stop)
+        self.io.print(self.menu_table_renderer.render_page(items))
+        page_count = math.ceil(len(menu) / page_size)
+        self.io.print(f"Showing items {start + 1}-{stop} of {len(menu)} "
+                      f"(page {page + 1} of {page_count})")
+
+    def __browse_cafeteria_menu(self, menu: Menu, page_size: int):
+        """
+        Let the user browse the Cafeteria menu one page at a time.
+        Args:
+            menu (Menu): The menu of CafeteriaItems to be displayed.
+            page_size (int): The number of items per page.
+        This private method prints the first page of the menu and prompts the
+        user to show the next or the previous page, to jump to the page of an
+        item by entering its ID, or to search for items by entering part of
+        their name. Pressing enter without any input ends the browsing,
+        leaving the current page or search results on the screen.
+        """
+        page = 0
+        page_count = math.ceil(len(menu) / page_size)
+        is_page_shown = True
+        while True:
+            if is_page_shown:
+                self.print_cafeteria_menu_page(menu, page, page_size)
+            is_page_shown = True
+            user_input = self.io.input(
+                f"Enter {ColorHelper.color_next_previous_text()} to browse "
+                f"the menu, an item ID to jump to its page, part of a name "
+                f"to search, or press enter to continue:\n").strip()
+            if len(user_input) == 0:
+                break
+            elif user_input.capitalize() == "Next":
+                page = min(page + 1, page_count - 1)
+            elif user_input.capitalize() == "Prev":
+                page = max(page - 1, 0)
+            elif UserInputValidator.validate_user_input_is_a_number(
+                    user_input):
+                position = menu.get_position(int(user_input))
+                if position is None:
+                    self.io.print(f"Sorry, we could not find an item with "
+                                  f"the ID {user_input}")
+                else:
+                    page = position // page_size
+            else:
+                self.print_search_results(user_input, menu)
+                is_page_shown = False
+
+    def search_cafeteria_menu(self, query: str, menu: Menu,
+                              limit: int = SEARCH_RESULT_LIMIT):
+        """
+        Find cafeteria items by part of their name.
+        Args:
+            query (str): The text to look for in the item names, ignoring
+             case.
+            menu (Menu): The menu of CafeteriaItems to search.
+            limit (int): The maximum number of items to return.
+        Returns:
+            list[CafeteriaItem]: The matching cafeteria items, best match
+            first.
+        This method uses the MenuSearchIndex, which is built the first time
+        the menu is searched and then updated as items are added, renamed and
+        removed, so a search does not walk the whole menu.
+        """
+        return self.menu_search_index.search(menu, query, limit)
+
+    def print_search_results(self, query: str, menu: Menu,
+                             limit: int = SEARCH_RESULT_LIMIT):
+        """
+        Print the cafeteria items matching a search in a formatted table.
+        Args:
+            query (str): The text to look for in the item names, ignoring
+             case.
+            menu (Menu): The menu of CafeteriaItems to search.
+            limit (int): The maximum number of items to show.
+        """
+        items = self.search_cafeteria_menu(query, menu, limit)
+        if len(items) == 0:
+            self.io.print(f"Sorry, we could not find an item matching "
+                          f"'{query}'")
+            return
+        self.io.print(self.menu_table_renderer.render_page(items))
+        self.io.print(f"Showing the best {len(items)} match(es) for '{query}'")
 
     def get_cafeteria_menu(self):
         """
         Retrieve the current state of the Cafeteria menu.
         Returns:
-            list[CafeteriaItem]: The list of CafeteriaItems representing the
-            current menu.
+            Menu: The menu of CafeteriaItems representing the current menu.
         This method returns the current state of the Cafeteria menu, which is a
-        list of CafeteriaItem objects representing the items available in the
+        Menu of CafeteriaItem objects representing the items available in the
         menu.
         """
         return self.cafeteria_items
 
-    def add_items_to_menu(self, amount_of_items: int,
-                          menu: list[CafeteriaItem]):
+    def add_items_to_menu(self, amount_of_items: int, menu: Menu):
         """
         Add new cafeteria items to the menu.
         Args:
             amount_of_items (int): The number of new cafeteria items to add.
-            menu (list[CafeteriaItem]): The existing list of CafeteriaItems
-             representing the menu.
+            menu (Menu): The existing menu of CafeteriaItems.
         Returns:
-            list[CafeteriaItem]: The updated menu after adding the new items.
+            Menu: The updated menu after adding the new items.
         This method allows the addition of a specified number of new cafeteria
         items to the menu. It prompts the user to enter names, quantities,
         and prices for each new item. The item details are then used to create
-        new `CafeteriaItem` objects, which are added to the menu. The method
-        prints a confirmation message for each added item, including its
-        quantity, name, and price. Finally, it recalculates the IDs of the menu
-        items to ensure they are consecutive.
+        new `CafeteriaItem` objects, which are stored in the repository, where
+        they are given a new ID that is never reused, and added to the menu.
+        The method prints a confirmation message for each added item,
+        including its quantity, name, and price.
         """
-        last_item = self.cafeteria_items[-1]
         input_text = "Please enter a name for the new cafeteria item:\n"
         for i in range(amount_of_items):
-            item_id = last_item.Id + 1
             item_name = (UserInputValidator
                          .validate_user_input_is_correct_item_name
-                         (self.cafeteria_items, input_text).title())
+                         (menu, input_text, io=self.io).title())
             validated_item_quantity = (UserInputValidator
                                        .validate_user_input_is_correct_quantity
-                                       (item_name, False))
+                                       (item_name, False, io=self.io))
             validated_item_price = (UserInputValidator
                                     .validate_user_input_is_correct_price
-                                    (item_name))
-            item = CafeteriaItem(item_id, item_name, validated_item_price,
+                                    (item_name, io=self.io))
+            item = CafeteriaItem(None, item_name, validated_item_price,
                                  validated_item_quantity)
+            menu.append(self.menu_repository.add_item(item))
+            self.menu_search_index.add(menu, item)
+            price = self.price_converter.format_money(validated_item_price)
+            self.io.print(f"{validated_item_quantity}x {item_name} has been "
+                          f"added to the menu at a price of {price}")
+        return menu
+
+    def add_items_in_bulk(self, items: list[CafeteriaItem], menu: Menu):
+        """
+        Add already validated cafeteria items to the menu.
+        Args:
+            items (list[CafeteriaItem]): The cafeteria items to add, without
+             IDs.
+            menu (Menu): The existing menu of CafeteriaItems.
+        Returns:
+            Menu: The updated menu after adding the new items.
+        This method stores the items in the repository in a single
+        transaction, which gives them their IDs, and appends them to the menu.
+        """
+        for item in self.menu_repository.add_items(items):
             menu.append(item)
-            print(f"{validated_item_quantity}x {item_name} has been added to "
-                  f"the menu at a price of £{validated_item_price:.2f}")
-        self.recalculate_ids(menu)
+            self.menu_search_index.add(menu, item)
         return menu
 
-    def update_items(self, item_ids: list[int], menu: list[CafeteriaItem],
+    def update_items(self, item_ids: list[int], menu: Menu,
                      is_admin: bool = False):
         """
         Update cafeteria items in the menu.
         Args:
             item_ids (list[int]): The list of item IDs to update.
-            menu (list[CafeteriaItem]): The list of CafeteriaItems representing
-             the menu.
+            menu (Menu): The menu of CafeteriaItems.
             is_admin (bool, optional): A flag indicating whether the update is
              performed by an admin.
         Returns:
-            list[CafeteriaItem]: The updated menu after applying the specified
-            updates. This method updates the specified cafeteria items in the
-            menu based on their IDs. For each item in the menu, it checks if
-            its ID is in the provided item_ids list. If a match is found,
-            the item's name, quantity, and price are updated using private
-            helper methods. The updated menu is then returned.
-        """
-        for item in menu:
-            for item_id in item_ids:
-                if item.Id == item_id:
-                    item = self.__update_item_name(item, menu)
-                    item = self.__update_item_quantity(is_admin, item)
-                    item = self.__update_item_price(is_admin, item)
+            Menu: The updated menu after applying the specified updates.
+            This method updates the specified cafeteria items in the menu
+            based on their IDs. Each item is looked up in the menu by its ID,
+            and if it is found, the item's name, quantity, and price are
+            updated using private helper methods, and its name and price are
+            stored in the repository. The item is looked up again before it
+            is stored, as the menu copies items shared with a snapshot when
+            they change. If its quantity was changed, only the difference is
+            applied to the stored stock, so sales made by other sessions
+            while the item was being updated are kept. The updated menu is
+            then returned.
+        """
+        for item_id in item_ids:
+            item = menu.get_by_id(item_id)
+            if item is not None:
+                old_stock = item.Stock
+                item = self.__update_item_name(item, menu)
+                self.__update_item_quantity(is_admin, item, menu)
+                self.__update_item_price(is_admin, item, menu)
+                item = menu.get_by_id(item_id)
+                self.menu_repository.update_item(item)
+                if item.Stock != old_stock:
+                    self.__adjust_stock(item, menu, item.Stock - old_stock)
         return menu
 
-    def __update_item_price(self, is_admin, item):
+    def remove_items_from_menu(self, item_ids: list[int], menu: Menu):
+        """
+        Remove cafeteria items from the menu.
+        Args:
+            item_ids (list[int]): The list of item IDs to remove.
+            menu (Menu): The menu of CafeteriaItems.
+        Returns:
+            list[CafeteriaItem]: The cafeteria items that were removed.
+        This method removes the specified cafeteria items from the menu and
+        marks them as removed in the repository. The IDs of the other items do
+        not change, and IDs that are not in the menu are ignored.
+        """
+        removed_items = []
+        for item_id in item_ids:
+            item = menu.remove(item_id)
+            if item is not None:
+                self.menu_repository.remove_item(item_id)
+                self.menu_search_index.remove(menu, item_id)
+                removed_items.append(item)
+        return removed_items
+
+    def __update_item_price(self, is_admin, item, menu):
         """
         Update the price of a cafeteria item.
         Args:
             is_admin (bool): A flag indicating whether the update is performed
              by an admin.
             item (CafeteriaItem): The cafeteria item to update.
+            menu (Menu): The menu of CafeteriaItems.
         Returns:
             CafeteriaItem: The updated cafeteria item.
         This private method prompts the user for a new price for the specified
@@ -137,34 +335,36 @@ class CafeteriaItemService:
         while True:
             validated_item_price = (UserInputValidator
                                     .validate_user_input_is_correct_price
-                                    (item.Name, True, is_admin))
+                                    (item.Name, True, is_admin, self.io))
             if validated_item_price != "Skip":
                 if item.Price != validated_item_price:
-
-                    print(
+                    old_price = self.price_converter.format_money(item.Price)
+                    new_price = self.price_converter.format_money(
+                        validated_item_price)
+                    self.io.print(
                         f"The price of {item.Name} has been changed from "
-                        f"£{PriceConverter.format_price(item.Price)} to "
-                        f"£{PriceConverter.format_price(validated_item_price)}"
+                        f"{old_price} to {new_price}"
                     )
                     item = self.__handle_update_value(validated_item_price,
-                                                      item)
+                                                      item, menu, True)
                 else:
-                    print(
+                    self.io.print(
                         f"The price of {item.Name} is already "
-                        f"{PriceConverter.format_price(item.Price)}. "
+                        f"{self.price_converter.format_money(item.Price)}. "
                         f"Please, try again.")
                     continue
             else:
                 break
             return item
 
-    def __update_item_quantity(self, is_admin, item):
+    def __update_item_quantity(self, is_admin, item, menu):
         """
         Update the stock quantity of a cafeteria item.
         Args:
             is_admin (bool): A flag indicating whether the update is performed
              by an admin.
             item (CafeteriaItem): The cafeteria item to update.
+            menu (Menu): The menu of CafeteriaItems.
         Returns:
             CafeteriaItem: The updated cafeteria item.
         This private method prompts the user for a new stock quantity for the
@@ -178,18 +378,18 @@ class CafeteriaItemService:
         while True:
             validated_item_quantity = (UserInputValidator
                                        .validate_user_input_is_correct_quantity
-                                       (item.Name, True, is_admin))
+                                       (item.Name, True, is_admin, self.io))
             if validated_item_quantity != "Skip":
                 if item.Stock != validated_item_quantity:
-                    print(
+                    self.io.print(
                         f"The stock value of {item.Name} "
                         f"has been changed from {item.Stock} "
                         f"to {validated_item_quantity}")
                     item = self.__handle_update_value(validated_item_quantity,
-                                                      item)
+                                                      item, menu)
                     break
                 else:
-                    print(
+                    self.io.print(
                         f"The stock value of {item.Name} is already "
                         f"{item.Stock}. Please, try again.")
                     continue
@@ -202,16 +402,16 @@ class CafeteriaItemService:
         Update the name of a cafeteria item.
         Args:
             item (CafeteriaItem): The cafeteria item to update.
-            menu (list[CafeteriaItem]): The list of CafeteriaItems representing
-             the menu.
+            menu (Menu): The menu of CafeteriaItems.
         Returns:
             CafeteriaItem: The updated cafeteria item.
         This method prompts the user for a new name for the specified cafeteria
         item. It uses the UserInputValidator to ensure the entered name
         is valid. If a valid name is provided (not equal to "Skip"),
         it prints a message indicating the change. If the new name is different
-        from the current name, it updates the item's name. The updated
-        cafeteria item is then returned.
+        from the current name, it renames the item through the menu so the
+        name index stays correct. The updated cafeteria item is then
+        returned.
         """
         input_text = (f"Please enter a new name for {item.Name} "
                       f"or type "
@@ -219,92 +419,151 @@ class CafeteriaItemService:
                       f"not to change it.\n")
         item_name = (UserInputValidator
                      .validate_user_input_is_correct_item_name
-                     (menu, input_text, True).title())
+                     (menu, input_text, True, self.io).title())
         if item_name != "Skip":
-            print(f"{item.Name} has been changed to {item_name}")
-        if item.Name != item_name:
-            item = self.__handle_update_value(item_name, item)
+            self.io.print(f"{item.Name} has been changed to {item_name}")
+        if item_name != "Skip" and item.Name != item_name:
+            item = menu.rename(item, item_name)
+            self.menu_search_index.rename(menu, item)
         return item
 
-    def __handle_update_value(self, user_input, item: CafeteriaItem):
+    def __adjust_stock(self, item: CafeteriaItem, menu: Menu,
+                       quantity: int):
+        """
+        Apply a change of stock made by an admin to the stored stock.
+        Args:
+            item (CafeteriaItem): The cafeteria item whose stock was changed.
+            menu (Menu): The menu of CafeteriaItems.
+            quantity (int): The change in stock, negative to lower it.
+        This private method adds or takes the quantity through the inventory,
+        with a single atomic update recorded as an adjustment in the stock
+        ledger, and never lowers the stock below zero. The stock of the item
+        in the menu is then set to the stored value, and the admin is told
+        if it differs from the value they entered, because other sessions
+        took or gave back stock in the meantime.
+        """
+        if quantity > 0:
+            stock = self.inventory.give_back(
+                self.menu_repository, item.Id, quantity,
+                StockMovementType.Adjustment)
+        else:
+            stock = self.inventory.take(
+                self.menu_repository, item.Id, -quantity,
+                StockMovementType.Adjustment)
+        if stock is None:
+            stock = self.menu_repository.get_stock(item.Id)
+            if stock is None:
+                return
+            self.io.print(f"Sorry, only {stock} {item.Name} are left in "
+                          f"stock, so its stock has not been changed.")
+        elif stock != item.Stock:
+            self.io.print(f"The stock of {item.Name} changed while it was "
+                          f"being updated, so it is now {stock}.")
+        menu.set_stock(item, stock)
+
+    def __handle_update_value(self, user_input, item: CafeteriaItem,
+                              menu: Menu, is_price: bool = False):
         """
         Handle updating the value of a cafeteria item.
         Args:
-            user_input (str, int, float): The new value to set for the
+            user_input (str, int): The new value to set for the
              cafeteria item.
             item (CafeteriaItem): The cafeteria item to update.
+            menu (Menu): The menu of CafeteriaItems.
+            is_price (bool): A flag indicating whether user_input is a price
+             in pence rather than a stock quantity.
         Returns:
             CafeteriaItem: The updated cafeteria item.
         This private method handles updating the value of a cafeteria item
-        based on the provided user_input. It checks the type of user_input and
-        updates the corresponding attribute of the cafeteria item
-        (Name, Stock, or Price). If user_input is "Skip," no updates are
-        performed. The updated cafeteria item is then returned.
+        based on the provided user_input. It updates the Price of the
+        cafeteria item if is_price is set, and its Stock otherwise, through
+        the menu, so the menu's version changes.
+        Names are changed through the menu's rename method instead. If
+        user_input is "Skip," no updates are performed. The updated cafeteria
+        item is then returned.
         """
         if user_input != "Skip":
-            if type(user_input) is str:
-                item.Name = user_input
-            if type(user_input) is int:
-                item.Stock = user_input
-            if type(user_input) is float:
-                item.Price = user_input
+            if is_price:
+                item = menu.set_price(item, user_input)
+            else:
+                item = menu.set_stock(item, user_input)
         return item
 
     def subtract_from_stock(self, ordered_item: CafeteriaItem,
-                            menu_list: list[CafeteriaItem],
-                            ordered_amount: int):
+                            menu_list: Menu, ordered_amount: int):
         """
-        Subtract the specified quantity from the stock of a cafeteria item.
+        Subtract the specified quantity from the stock of a cafeteria item,
+        if it has enough stock left.
         Args:
             ordered_item (CafeteriaItem): The cafeteria item to update.
-            menu_list (list[CafeteriaItem]): The list of cafeteria items
-             representing the menu.
+            menu_list (Menu): The menu of cafeteria items.
             ordered_amount (int): The quantity to subtract from the item's
              stock.
-        This method updates the stock of a cafeteria item based on the ordered
-        quantity.
+        Returns:
+            bool: True if the stock was subtracted, False if the item does
+            not have enough stock left.
+        This method takes the ordered quantity from the inventory with a
+        single atomic check-and-decrement, recorded as an order in the stock
+        ledger, so concurrent customers can never oversell an item. It then
+        looks the cafeteria item up in the menu by its ID and sets its stock
+        to the stored value, so stock taken by other workers is reflected as
+        well, whether or not the order could be served. The menu, usually a
+        snapshot of the current menu, then becomes the current menu.
         """
-        for cafeteria_item in menu_list:
-            if ordered_item.Id == cafeteria_item.Id:
-                cafeteria_item.Stock -= ordered_amount
+        stock = self.inventory.take(self.menu_repository, ordered_item.Id,
+                                    ordered_amount)
+        is_subtracted = stock is not None
+        if not is_subtracted:
+            stock = self.menu_repository.get_stock(ordered_item.Id)
+        cafeteria_item = menu_list.get_by_id(ordered_item.Id)
+        if cafeteria_item is not None and stock is not None:
+            menu_list.set_stock(cafeteria_item, stock)
+        self.menu_search_index.rebind(self.cafeteria_items, menu_list)
         self.cafeteria_items = menu_list
+        return is_subtracted
 
-    def add_to_stock(self, ordered_item: CafeteriaItem,
-                     menu_list: list[CafeteriaItem], ordered_amount: int):
+    def add_to_stock(self, ordered_item: CafeteriaItem, menu_list: Menu,
+                     ordered_amount: int,
+                     movement_type: StockMovementType =
+                     StockMovementType.Removal):
         """
         Add stock to the specified cafeteria item in the menu.
 
         Args:
             ordered_item (CafeteriaItem): The cafeteria item for which stock is
              to be added.
-            menu_list (list[CafeteriaItem]): The list representing the
-             cafeteria menu.
+            menu_list (Menu): The menu of cafeteria items.
             ordered_amount (int): The quantity of stock to be added to the
              ordered item.
+            movement_type (StockMovementType): The reason the stock is given
+             back, a removal from the cart by default.
 
-        This method iterates through the menu list to find the cafeteria item
-        with the specified ID (ordered_item.Id) and then increases its stock by
-        the ordered_amount. The updated menu list is then assigned to
-        self.cafeteria_items.
-        """
-        for cafeteria_item in menu_list:
-            if ordered_item.Id == cafeteria_item.Id:
-                cafeteria_item.Stock += ordered_amount
+        This method gives the ordered_amount back to the cafeteria item with
+        the specified ID (ordered_item.Id) in the inventory with a single
+        atomic update, recorded in the stock ledger with the given reason,
+        then sets the stock of the item in the menu to the stored value. The
+        updated menu is then assigned to self.cafeteria_items.
+        """
+        stock = self.inventory.give_back(self.menu_repository, ordered_item.Id,
+                                         ordered_amount, movement_type)
+        cafeteria_item = menu_list.get_by_id(ordered_item.Id)
+        if cafeteria_item is not None and stock is not None:
+            menu_list.set_stock(cafeteria_item, stock)
+        self.menu_search_index.rebind(self.cafeteria_items, menu_list)
         self.cafeteria_items = menu_list
 
-    def recalculate_ids(self, menu_list: list[CafeteriaItem]):
+    def rebuild_stock_levels(self):
         """
-        Recalculate the IDs for cafeteria items in the provided menu list.
-        Args:
-            menu_list (list[CafeteriaItem]): The list of cafeteria items
-             representing the menu.
-        This method iterates through the provided menu_list and recalculates
-        the IDs for each cafeteria item, starting from 1.
-        The modified menu_list with updated IDs is then returned.
-        """
-        for index, item in enumerate(menu_list, start=1):
-            item.Id = index
-        return menu_list
+        Rebuild the stock of every cafeteria item from the stock ledger.
+        Returns:
+            dict[int, int]: The rebuilt stock of each item, by ID.
+        This method replays the stock movements recorded since the latest
+        stock snapshot in the repository, stores the rebuilt stock, and
+        reloads the menu the next time it is accessed.
+        """
+        levels = self.menu_repository.rebuild_stock_levels()
+        self.cafeteria_items = None
+        return levels
 
     def __populate_cafeteria_menu(self):
         """
@@ -312,17 +571,18 @@ class CafeteriaItemService:
         Returns:
             list[CafeteriaItem]: The list of predefined cafeteria items.
         This private method initializes and returns a list of CafeteriaItem
-        objects representing the initial cafeteria menu.
+        objects representing the initial cafeteria menu, which is stored in
+        the repository the first time the application runs.
         Each item has a unique ID, a name, a price, and an initial stock
         quantity.
         """
         menu = [
-            CafeteriaItem(1, "Waggy Woofin", 2.50, 10),
-            CafeteriaItem(2, "Paw Cake", 3.20, 10),
-            CafeteriaItem(3, "Cheeky Cheese Paw", 1.80, 10),
-            CafeteriaItem(4, "Barky Bacon Stick", 2.00, 10),
-            CafeteriaItem(5, "Sonny's Soup", 1.40, 10),
-            CafeteriaItem(6, "Alfie's Apple Tart", 2.50, 10),
-            CafeteriaItem(7, "Barkie", 0.80, 10),
-            CafeteriaItem(8, "Storm's Special Chicken Stew", 4.20, 10)]
+            CafeteriaItem(1, "Waggy Woofin", 250, 10),
+            CafeteriaItem(2, "Paw Cake", 320, 10),
+            CafeteriaItem(3, "Cheeky Cheese Paw", 180, 10),
+            CafeteriaItem(4, "Barky Bacon Stick", 200, 10),
+            CafeteriaItem(5, "Sonny's Soup", 140, 10),
+            CafeteriaItem(6, "Alfie's Apple Tart", 250, 10),
+            CafeteriaItem(7, "Barkie", 80, 10),
+            CafeteriaItem(8, "Storm's Special Chicken Stew", 420, 10)]
         return menu
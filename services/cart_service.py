@@ -1,8 +1,21 @@
+import os
+from bisect import bisect_left, insort
 from dataclasses import dataclass
 
 from entities.cafeteria_item import CafeteriaItem
 from entities.cart import Cart
+from entities.promotion import Promotion
+from infrastructure.enums.enum_promotion_type import PromotionType
+from infrastructure.helpers.batch_pricer import BatchPricer
+from infrastructure.helpers.cart_checkpoint import CartCheckpoint
+from infrastructure.helpers.cart_renderer import CartRenderer
+from infrastructure.helpers.console_io import ConsoleIO
+from infrastructure.helpers.io_port import IOPort
+from infrastructure.helpers.json_file_helper import JsonFileHelper
 from infrastructure.helpers.price_converter import PriceConverter
+from infrastructure.helpers.promotion_engine import PromotionEngine
+
+PROMOTIONS_FILE_PATH = "./promotions.json"
 
 
 @dataclass
@@ -12,29 +25,46 @@ class CartService:
         Attributes:
         price_converter (PriceConverter): An instance of the PriceConverter
         class for handling price formatting.
+        cart_renderer (CartRenderer): The renderer building the printed
+        views of a cart.
+        promotion_engine (PromotionEngine): The engine working out the
+        discounts of the promotions, loaded from promotions.json when that
+        file exists.
+        io (IOPort): The output carts are printed to.
+        checkpoint (CartCheckpoint): Where the cart is saved after every
+        change, so it can be restored when the session is started again, or
+        None if the cart is not saved.
     """
-    def __init__(self):
+    def __init__(self, promotions: list[Promotion] = None,
+                 io: IOPort = None, checkpoint: CartCheckpoint = None):
+        self.io = io or ConsoleIO()
+        self.checkpoint = checkpoint
         self.price_converter = PriceConverter()
+        self.cart_renderer = CartRenderer(self.price_converter)
+        if promotions is None:
+            promotions = self.__load_promotions()
+        self.promotion_engine = PromotionEngine(promotions)
 
     def add_to_cart(self, selected_items: list[CafeteriaItem]):
         """
         Create a new Cart object with the provided list of CafeteriaItems.
         Args:
             selected_items (list[CafeteriaItem]): A list of CafeteriaItems to
-             be added to the cart.
+             be added to the cart, with their Stock holding the quantity.
         Returns:
-            Cart: A new Cart object initialized with the provided
-            selected_items, total quantity, and total price calculated from
-            the selected_items.
+            Cart: A new Cart object holding a line for each of the
+            selected_items, with the total quantity and total price of the
+            lines.
         """
-        cart = Cart(selected_items,
-                    self.__calculate_total_quantity(selected_items),
-                    self.__calculate_total_price(selected_items))
+        cart = Cart({}, 0, 0)
+        for item in selected_items:
+            self.__add_line(cart, item, item.Stock)
+        self.__save_checkpoint(cart)
         return cart
 
     def update_cart(self, cart: Cart, selected_items: list[CafeteriaItem]):
         """
-        Update the provided Cart object with information from a list of
+        Replace the contents of the provided Cart object with a list of
         selected CafeteriaItems.
         Args:
             cart (Cart): The Cart object to be updated.
@@ -42,15 +72,70 @@ class CartService:
              to be added to the cart.
         Returns:
             Cart: The updated Cart object containing the total price,
-            total quantity, and a sorted list of selected CafeteriaItems
-            based on their IDs.
+            total quantity, and a line for each of the selected
+            CafeteriaItems.
+        This method rebuilds the whole cart, so changes to single lines
+        should use add_item_to_cart and remove_item_from_cart instead.
         """
-        cart.TotalPrice = self.__calculate_total_price(selected_items)
-        cart.TotalQuantity = self.__calculate_total_quantity(selected_items)
-        cart.Items = selected_items
-        cart.Items = sorted(cart.Items, key=lambda o: o.Id)
+        cart.Lines = {}
+        cart.LineIds = []
+        cart.TotalQuantity = 0
+        cart.TotalPrice = 0
+        cart.Discounts = {}
+        for item in selected_items:
+            self.__add_line(cart, item, item.Stock)
+        self.__save_checkpoint(cart)
         return cart
 
+    def add_item_to_cart(self, cart: Cart, item: CafeteriaItem,
+                         quantity: int):
+        """
+        Add a quantity of a CafeteriaItem to the given Cart.
+        Args:
+            cart (Cart): The Cart object to add the item to.
+            item (CafeteriaItem): The CafeteriaItem to add.
+            quantity (int): The quantity to add.
+        Returns:
+            CafeteriaItem: The line of the cart holding the item, with its
+            Stock holding the quantity in the cart.
+        If the cart already has a line for the item, its quantity is
+        increased; otherwise a copy of the item is added as a new line. The
+        line is found by its item ID, and the totals of the cart are updated
+        with the change only, including the discount of the promotion of the
+        item, if it has one.
+        """
+        line = self.__add_line(cart, item, quantity)
+        self.__save_checkpoint(cart)
+        return line
+
+    def remove_item_from_cart(self, cart: Cart, item_id: int, quantity: int):
+        """
+        Remove a quantity of the CafeteriaItem with the specified item ID
+        from the given Cart.
+        Args:
+            cart (Cart): The Cart object to remove the item from.
+            item_id (int): The ID of the CafeteriaItem to remove.
+            quantity (int): The quantity to remove.
+        Returns:
+            int: The quantity actually removed, which is at most the quantity
+            of the line, or 0 if the cart has no line for the item. The line
+            is removed from the cart, and its ID from the sorted line IDs,
+            when its quantity reaches zero.
+        """
+        line = cart.Lines.get(item_id)
+        if line is None:
+            return 0
+        quantity = min(quantity, line.Stock)
+        line.Stock -= quantity
+        cart.TotalQuantity -= quantity
+        cart.TotalPrice -= line.Price * quantity
+        if line.Stock == 0:
+            del cart.Lines[item_id]
+            del cart.LineIds[bisect_left(cart.LineIds, item_id)]
+        self.__apply_promotion(cart, line, line.Stock + quantity)
+        self.__save_checkpoint(cart)
+        return quantity
+
     def remove_from_cart(self, cart: Cart, item_id: int):
         """
         Remove a CafeteriaItem with the specified item ID from the given Cart.
@@ -62,55 +147,220 @@ class CartService:
             Cart: The updated Cart object after removing the specified
             CafeteriaItem.
         """
-        cart.Items = [item for item in cart.Items if item.Id != item_id]
-        return self.update_cart(cart, cart.Items)
+        line = cart.Lines.get(item_id)
+        if line is not None:
+            self.remove_item_from_cart(cart, item_id, line.Stock)
+        return cart
+
+    def restore_cart(self):
+        """
+        Restore the cart saved in the checkpoint of the session.
+        Returns:
+            Union[Cart, None]: The saved cart, or None if there is no
+            checkpoint or no cart was saved.
+        """
+        if self.checkpoint is None:
+            return None
+        return self.checkpoint.restore()
+
+    def clear_checkpoint(self):
+        """
+        Forget the saved cart, once its order is completed, so it is not
+        restored again.
+        """
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+
+    def price_carts(self, carts: list[Cart]):
+        """
+        Recalculate the totals of many carts at once.
+        Args:
+            carts (list[Cart]): The carts to price.
+        Returns:
+            list[tuple[int, int]]: The total quantity and the total price in
+            pence of each cart, from its lines, in the order of the carts.
+        The lines of all the carts are priced together in one pass by the
+        BatchPricer, so the totals are the same as the ones kept by this
+        service, without any per-cart arithmetic in Python. Discounts are
+        then worked out for each cart, when there are promotions.
+        """
+        batch_pricer = BatchPricer()
+        for cart in carts:
+            for line in cart.Lines.values():
+                batch_pricer.add_line(line.Price, line.Stock)
+            batch_pricer.end_cart()
+        totals = batch_pricer.calculate_totals()
+        if self.promotion_engine.promotions:
+            totals = self.__apply_discounts(
+                totals, (cart.Lines for cart in carts))
+        return totals
+
+    def price_orders(self, orders, menu):
+        """
+        Price many orders at once at the prices of a menu.
+        Args:
+            orders (Iterable[Iterable[tuple[int, int]]]): The orders to price,
+             each as pairs of item ID and quantity, such as an order log.
+            menu (Union[Menu, CompactMenu]): The menu giving the price of each
+             item. Items removed from the menu are priced as well.
+        Returns:
+            list[tuple[int, int]]: The total quantity and the total price in
+            pence of each order, in the order of the orders.
+        Raises:
+            ValueError: If an order contains an item the menu never had.
+        The price of each item is looked up in the menu once, then all the
+        orders are priced together in one pass by the BatchPricer. Discounts
+        are then worked out for each order, when there are promotions.
+        """
+        batch_pricer = BatchPricer()
+        prices_by_id = {}
+        has_promotions = len(self.promotion_engine.promotions) > 0
+        order_lines = []
+        for order in orders:
+            lines = {}
+            for item_id, quantity in order:
+                price = prices_by_id.get(item_id)
+                if price is None:
+                    item = menu.get_by_id(item_id, True)
+                    if item is None:
+                        raise ValueError(f"There is no item with the Id "
+                                         f"{item_id}")
+                    price = prices_by_id[item_id] = item.Price
+                batch_pricer.add_line(price, quantity)
+                if has_promotions:
+                    line = lines.get(item_id)
+                    if line is None:
+                        lines[item_id] = CafeteriaItem(item_id, None, price,
+                                                       quantity)
+                    else:
+                        line.Stock += quantity
+            batch_pricer.end_cart()
+            order_lines.append(lines)
+        totals = batch_pricer.calculate_totals()
+        if has_promotions:
+            totals = self.__apply_discounts(totals, order_lines)
+        return totals
 
     def print_cart(self, cart: Cart):
         """
-        Print the contents of a Cart including total quantity, total price,
-        and item details.
+        Print a summary of a Cart including total quantity, total price,
+        and item details, with a single write.
         Args:
             cart (Cart): The Cart object to be printed.
         Prints:
-            The total quantity and total price of items in the cart, along
-            with details of each CafeteriaItem including its ID, name, price
-            and stock quantity.
-        """
-        print(f"Total Quantity: {cart.TotalQuantity}")
-        print(f"Total Price: £"
-              f"{self.price_converter.format_price(cart.TotalPrice)}")
-        for item in cart.Items:
-            print(f"{item.Id}. {item.Name} - £"
-                  f"{self.price_converter.format_price(item.Price)} - "
-                  f"x{item.Stock}")
-
-    def __calculate_total_quantity(self, selected_items: list[CafeteriaItem]):
-        """
-        Calculate the total quantity of a list of CafeteriaItems based on their
-        stock quantities.
+            A heading, the total quantity, the total discount if promotions
+            apply, and the total price of items in the cart, along
+            with the ID, name, price and quantity of each line.
+        """
+        self.io.write(self.cart_renderer.render_summary(cart) + "\n")
+
+    def print_cart_table(self, cart: Cart):
+        """
+        Print the contents of a Cart as a table, with a single write.
         Args:
-            selected_items (list[CafeteriaItem]): A list of CafeteriaItems for
-             which to calculate the total quantity.
+            cart (Cart): The Cart object to be printed.
+        Prints:
+            A formatted table displaying the ID, Name, Price, and Quantity
+            of each line of the cart, followed by the savings from
+            promotions, if any, and the total price of the cart.
+        """
+        self.io.write(self.cart_renderer.render_table(cart) + "\n")
+
+    def __add_line(self, cart: Cart, item: CafeteriaItem, quantity: int):
+        """
+        Add a quantity of a CafeteriaItem to the given Cart, without saving
+        the cart.
+        Args:
+            cart (Cart): The Cart object to add the item to.
+            item (CafeteriaItem): The CafeteriaItem to add.
+            quantity (int): The quantity to add.
         Returns:
-            int: The total quantity calculated by summing the individual stock
-            quantities of each item in the selected_items list.
+            CafeteriaItem: The line of the cart holding the item.
+        A new line has its item ID inserted in order into the sorted line
+        IDs of the cart.
         """
-        return sum(item.Stock for item in selected_items)
+        line = cart.Lines.get(item.Id)
+        if line is None:
+            line = CafeteriaItem(item.Id, item.Name, item.Price, quantity)
+            cart.Lines[item.Id] = line
+            insort(cart.LineIds, item.Id)
+        else:
+            line.Stock += quantity
+        cart.TotalQuantity += quantity
+        cart.TotalPrice += line.Price * quantity
+        self.__apply_promotion(cart, line, line.Stock - quantity)
+        return line
 
-    def __calculate_total_price(self, selected_items: list[CafeteriaItem]):
+    def __save_checkpoint(self, cart: Cart):
         """
-        Calculate the total price of a list of CafeteriaItems based on their
-        prices and quantities.
+        Save a Cart to the checkpoint of the session, if it has one.
         Args:
-            selected_items (list[CafeteriaItem]): A list of CafeteriaItems for
-             which to calculate the total price.
+            cart (Cart): The Cart object that changed.
+        """
+        if self.checkpoint is not None:
+            self.checkpoint.save(cart)
+
+    def __apply_promotion(self, cart: Cart, line: CafeteriaItem,
+                          previous_quantity: int):
+        """
+        Update the discount of a Cart after the quantity of one of its lines
+        changed.
+        Args:
+            cart (Cart): The Cart object whose line changed.
+            line (CafeteriaItem): The changed line, which may have been
+             removed from the cart.
+            previous_quantity (int): The quantity of the line before the
+             change.
+        Only the promotion of the item of the line is looked up and worked
+        out again, and the total price of the cart changes by the difference
+        between its new and previous discount.
+        """
+        promotion = self.promotion_engine.get_promotion(line.Id)
+        if promotion is None:
+            return
+        previous_discount = cart.Discounts.get(promotion.Id, 0)
+        if promotion.Type is PromotionType.MealDeal:
+            discount = self.promotion_engine.calculate_deal_discount(
+                promotion, cart.Lines)
+        else:
+            discount = (previous_discount
+                        + self.promotion_engine.calculate_line_discount(
+                            promotion, line.Price, line.Stock)
+                        - self.promotion_engine.calculate_line_discount(
+                            promotion, line.Price, previous_quantity))
+        if discount == 0:
+            cart.Discounts.pop(promotion.Id, None)
+        else:
+            cart.Discounts[promotion.Id] = discount
+        cart.TotalPrice -= discount - previous_discount
+
+    def __apply_discounts(self, totals: list[tuple[int, int]], carts_lines):
+        """
+        Take the discounts of the promotions off the totals of many carts.
+        Args:
+            totals (list[tuple[int, int]]): The total quantity and the total
+             price in pence of each cart, before discounts.
+            carts_lines (Iterable[dict[int, CafeteriaItem]]): The lines of
+             each cart, keyed by item ID, in the order of the totals.
+        Returns:
+            list[tuple[int, int]]: The total quantity and the total price in
+            pence of each cart, after discounts.
+        """
+        return [(quantity, price - sum(self.promotion_engine
+                                       .calculate_discounts(lines).values()))
+                for (quantity, price), lines in zip(totals, carts_lines)]
+
+    @staticmethod
+    def __load_promotions():
+        """
+        Load the promotions from the promotions file, if there is one.
         Returns:
-            float: The total price calculated by summing the individual total
-            prices of each item (price multiplied by quantity) in the
-            selected_items list.
-        """
-        total_price_per_item_array = []
-        for selected_item in selected_items:
-            total_price_per_item = selected_item.Price * selected_item.Stock
-            total_price_per_item_array.append(total_price_per_item)
-        return sum(item for item in total_price_per_item_array)
+            list[Promotion]: The promotions of the file, with their prices in
+            pence, or an empty list if the file does not exist.
+        """
+        if not os.path.exists(PROMOTIONS_FILE_PATH):
+            return []
+        return [Promotion(row["Id"], row["Name"], PromotionType(row["Type"]),
+                          row["ItemIds"], row.get("Quantity", 1),
+                          row["Value"])
+                for row in JsonFileHelper.read_from_file(PROMOTIONS_FILE_PATH)]
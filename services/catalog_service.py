@@ -0,0 +1,204 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from entities.cafeteria_item import CafeteriaItem
+from entities.menu import Menu
+from infrastructure.helpers.console_io import ConsoleIO
+from infrastructure.helpers.io_port import IOPort
+from infrastructure.helpers.price_converter import PriceConverter
+from infrastructure.validators.user_input_validator import UserInputValidator
+from services.cafeteria_item_service import CafeteriaItemService
+
+CATALOG_FILE_EXTENSIONS = (".csv", ".jsonl")
+CATALOG_FIELDS = ["Id", "Name", "Stock", "Price"]
+
+
+class CatalogService:
+    """
+    Service class for importing and exporting the cafeteria catalog in bulk.
+
+    Catalog files are either CSV files with a header row or JSONL files with
+    one JSON object per line, using the Name, Stock and Price fields (and Id
+    on export). Rows are streamed through generators and handled in chunks,
+    so memory use does not depend on the size of the file.
+
+    Attributes:
+        cafeteria_item_service (CafeteriaItemService): The service used to
+         add the imported items to the menu and read the stored items.
+        io (IOPort): The output the results of an import or export are
+         written to.
+    """
+    def __init__(self, cafeteria_item_service: CafeteriaItemService,
+                 io: IOPort = None):
+        self.cafeteria_item_service = cafeteria_item_service
+        self.io = io or ConsoleIO()
+
+    def import_catalog(self, file_path: str, menu: Menu,
+                       chunk_size: int = 1000):
+        """
+        Import cafeteria items from a CSV or JSONL catalog file.
+        Args:
+            file_path (str): The path of the catalog file.
+            menu (Menu): The menu to add the imported items to.
+            chunk_size (int): The number of rows validated and committed
+             together.
+        Returns:
+            tuple[int, int]: The number of imported items and the number of
+            rejected rows.
+        This method validates each row with the same rules used when an item
+        is added interactively: the name must be a valid name that is not on
+        the menu yet, the stock a non-zero positive integer and the price a
+        positive number with two decimal places. Rejected rows are reported
+        with their row number, and the valid rows of each chunk are added to
+        the menu and stored in a single transaction.
+        """
+        imported_count = 0
+        error_count = 0
+        rows = self.__read_rows(file_path)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if len(chunk) == 0:
+                break
+            items, errors = self.__validate_chunk(chunk, menu)
+            for error in errors:
+                self.io.print(error)
+            self.cafeteria_item_service.add_items_in_bulk(items, menu)
+            imported_count += len(items)
+            error_count += len(errors)
+        self.io.print(f"{imported_count} item(s) have been imported, "
+                      f"{error_count} row(s) have been rejected")
+        return imported_count, error_count
+
+    def export_catalog(self, file_path: str):
+        """
+        Export the stored cafeteria items to a CSV or JSONL catalog file.
+        Args:
+            file_path (str): The path of the catalog file to write.
+        Returns:
+            int: The number of exported items.
+        The items are streamed from the menu repository and written one row
+        at a time.
+        """
+        exported_count = 0
+        items = self.cafeteria_item_service.menu_repository.load_items()
+        with open(file_path, "w", newline="", encoding="utf-8") as file:
+            if self.__get_extension(file_path) == ".csv":
+                writer = csv.writer(file)
+                writer.writerow(CATALOG_FIELDS)
+                for item in items:
+                    writer.writerow(self.__create_row(item))
+                    exported_count += 1
+            else:
+                for item in items:
+                    row = dict(zip(CATALOG_FIELDS, self.__create_row(item)))
+                    file.write(json.dumps(row) + "\n")
+                    exported_count += 1
+        self.io.print(f"{exported_count} item(s) have been exported to "
+                      f"{file_path}")
+        return exported_count
+
+    @staticmethod
+    def is_catalog_file(file_path: str):
+        """
+        Check whether a file path has a supported catalog file extension.
+        Args:
+            file_path (str): The path to check.
+        Returns:
+            bool: True if the path ends with .csv or .jsonl, False otherwise.
+        """
+        return (CatalogService.__get_extension(file_path)
+                in CATALOG_FILE_EXTENSIONS)
+
+    def __validate_chunk(self, chunk: list[tuple[int, dict]], menu: Menu):
+        """
+        Validate a chunk of catalog rows.
+        Args:
+            chunk (list[tuple[int, dict]]): Pairs of row number and row.
+            menu (Menu): The menu the items will be added to.
+        Returns:
+            tuple[list[CafeteriaItem], list[str]]: The items created from the
+            valid rows, without IDs, and an error message for each rejected
+            row.
+        """
+        items = []
+        errors = []
+        chunk_names = set()
+        for row_number, row in chunk:
+            if row is None:
+                errors.append(f"Row {row_number}: the row could not be read")
+                continue
+            name = str(row.get("Name") or "").strip()
+            stock = str(row.get("Stock") or "").strip()
+            price = str(row.get("Price") or "").strip()
+            if not UserInputValidator.validate_user_input_is_name(name):
+                errors.append(f"Row {row_number}: '{name}' is not a valid "
+                              f"name")
+            elif (menu.contains_name(name)
+                  or name.casefold() in chunk_names):
+                errors.append(f"Row {row_number}: an item with the name "
+                              f"{name.title()} already exists in the menu")
+            elif not UserInputValidator.validate_user_input_is_a_number(
+                    stock):
+                errors.append(f"Row {row_number}: '{stock}' is not a valid "
+                              f"stock quantity")
+            elif not UserInputValidator.validate_user_input_is_a_decimal(
+                    price):
+                errors.append(f"Row {row_number}: '{price}' is not a valid "
+                              f"price")
+            else:
+                chunk_names.add(name.casefold())
+                items.append(CafeteriaItem(None, name.title(),
+                                           PriceConverter.to_pence(price),
+                                           int(stock)))
+        return items, errors
+
+    def __read_rows(self, file_path: str):
+        """
+        Stream the rows of a catalog file.
+        Args:
+            file_path (str): The path of the catalog file.
+        Yields:
+            tuple[int, Union[dict, None]]: The row number and the row, or None
+            if the row could not be parsed.
+        """
+        with open(file_path, newline="", encoding="utf-8") as file:
+            if self.__get_extension(file_path) == ".csv":
+                reader = csv.DictReader(file)
+                for row in reader:
+                    yield reader.line_num, row
+            else:
+                for line_number, line in enumerate(file, start=1):
+                    if len(line.strip()) == 0:
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        row = None
+                    yield line_number, row if isinstance(row, dict) else None
+
+    @staticmethod
+    def __create_row(item: CafeteriaItem):
+        """
+        Create a catalog row from a cafeteria item.
+        Args:
+            item (CafeteriaItem): The cafeteria item to export.
+        Returns:
+            list: The Id, Name, Stock and Price of the item. The price is
+            written as a string with two decimal places, so it can be
+            imported again with the same validation rules.
+        """
+        return [item.Id, item.Name, item.Stock,
+                PriceConverter.format_price(item.Price)]
+
+    @staticmethod
+    def __get_extension(file_path: str):
+        """
+        Get the lower-case extension of a file path.
+        Args:
+            file_path (str): The file path.
+        Returns:
+            str: The extension, including the leading dot.
+        """
+        return os.path.splitext(file_path)[1].lower()
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+
+from entities.cart import Cart
+from entities.order import Order
+from infrastructure.repositories.order_repository import (FIRST_HOUR,
+                                                          LAST_HOUR,
+                                                          OrderRepository)
+
+
+class OrderService:
+    """
+    Service class recording completed orders and reading the sales they add
+    up to.
+
+    Attributes:
+        order_repository (OrderRepository): The repository keeping the order
+         log and its sales rollups.
+    """
+    def __init__(self, order_repository: OrderRepository = None):
+        self.order_repository = order_repository or OrderRepository()
+
+    def record_order(self, cart: Cart, created_at: str = None):
+        """
+        Record the cart of a completed purchase in the order log.
+        Args:
+            cart (Cart): The Cart object of the purchase.
+            created_at (str): The UTC date and time of the purchase, as
+             "YYYY-MM-DD HH:MM:SS". Defaults to the current time.
+        Returns:
+            Order: The recorded order.
+        The order is added to the per-item and per-hour sales rollups at the
+        same time, so reports do not need to read the order log.
+        """
+        if created_at is None:
+            created_at = datetime.now(timezone.utc).strftime(
+                "%Y-%m-%d %H:%M:%S")
+        order = Order(None, created_at, cart.Items, cart.TotalQuantity,
+                      cart.TotalPrice, cart.TotalDiscount)
+        return self.order_repository.add_order(order)
+
+    def get_item_hourly_sales(self, start_hour: str = FIRST_HOUR,
+                              end_hour: str = LAST_HOUR):
+        """
+        Get the sales of every item for every hour of a period.
+        Args:
+            start_hour (str): The first hour of the period, as
+             "YYYY-MM-DD HH:00".
+            end_hour (str): The hour after the period.
+        Returns:
+            list[ItemHourlySales]: The sales, ordered by hour and item Id.
+        """
+        return self.order_repository.load_item_hourly_sales(start_hour,
+                                                            end_hour)
+
+    def get_hourly_sales(self, start_hour: str = FIRST_HOUR,
+                         end_hour: str = LAST_HOUR):
+        """
+        Get the sales of every hour of a period.
+        Args:
+            start_hour (str): The first hour of the period, as
+             "YYYY-MM-DD HH:00".
+            end_hour (str): The hour after the period.
+        Returns:
+            list[HourlySales]: The sales, ordered by hour.
+        """
+        return self.order_repository.load_hourly_sales(start_hour, end_hour)
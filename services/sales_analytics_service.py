@@ -0,0 +1,162 @@
+import heapq
+
+from entities.hourly_sales import HourlySales
+from entities.item_sales import ItemSales
+from entities.stock_turnover import StockTurnover
+from infrastructure.helpers.sales_aggregator import (HOURS_PER_DAY,
+                                                     SalesAggregator)
+from infrastructure.repositories.menu_repository import MenuRepository
+from infrastructure.repositories.order_repository import (FIRST_HOUR,
+                                                          LAST_HOUR,
+                                                          OrderRepository)
+
+
+class SalesAnalyticsService:
+    """
+    Service class answering sales questions over the completed orders: the
+    top selling items, the sales of every hour and the stock turnover of
+    every item.
+
+    The questions are answered from the sales rollups kept with the order
+    log, which are read in batches and added up column by column, so a
+    history of any length is processed without loading it into memory.
+
+    Attributes:
+        order_repository (OrderRepository): The repository keeping the order
+         log and its sales rollups.
+        menu_repository (MenuRepository): The repository keeping the stock
+         movement ledger.
+        batch_size (int): The number of rollup rows read at a time.
+    """
+    def __init__(self, order_repository: OrderRepository = None,
+                 menu_repository: MenuRepository = None,
+                 batch_size: int = 500):
+        self.order_repository = order_repository or OrderRepository()
+        self.menu_repository = menu_repository or MenuRepository()
+        self.batch_size = batch_size
+
+    def get_item_sales(self, start_hour: str = FIRST_HOUR,
+                       end_hour: str = LAST_HOUR):
+        """
+        Get the sales of every item over a period.
+        Args:
+            start_hour (str): The first hour of the period, as
+             "YYYY-MM-DD HH:00".
+            end_hour (str): The hour after the period.
+        Returns:
+            list[ItemSales]: The sales of every item sold during the period,
+            ordered by item Id.
+        """
+        totals = self.__aggregate_item_sales(start_hour, end_hour)
+        return [ItemSales(x, *totals[x]) for x in sorted(totals)]
+
+    def get_top_sellers(self, count: int = 10,
+                        start_hour: str = FIRST_HOUR,
+                        end_hour: str = LAST_HOUR, by_revenue: bool = False):
+        """
+        Get the items that sold the most over a period.
+        Args:
+            count (int): The number of items to return.
+            start_hour (str): The first hour of the period, as
+             "YYYY-MM-DD HH:00".
+            end_hour (str): The hour after the period.
+            by_revenue (bool): Whether to rank the items by gross revenue
+             instead of quantity sold.
+        Returns:
+            list[ItemSales]: The sales of the top items, best seller first.
+            Items selling as much are ordered by item Id.
+        """
+        totals = self.__aggregate_item_sales(start_hour, end_hour)
+        rank = 1 if by_revenue else 0
+        top_ids = heapq.nsmallest(count, totals,
+                                  key=lambda x: (-totals[x][rank], x))
+        return [ItemSales(x, *totals[x]) for x in top_ids]
+
+    def stream_hourly_sales(self, start_hour: str = FIRST_HOUR,
+                            end_hour: str = LAST_HOUR):
+        """
+        Lazily get the sales of every hour of a period.
+        Args:
+            start_hour (str): The first hour of the period, as
+             "YYYY-MM-DD HH:00".
+            end_hour (str): The hour after the period.
+        Yields:
+            HourlySales: The sales of every hour with orders, ordered by hour.
+        """
+        for rows in self.order_repository.load_hourly_sales_batches(
+                start_hour, end_hour, self.batch_size):
+            for row in rows:
+                yield HourlySales(*row)
+
+    def get_sales_by_hour_of_day(self, start_hour: str = FIRST_HOUR,
+                                 end_hour: str = LAST_HOUR):
+        """
+        Get the sales of every hour of the day over a period, to find the
+        busiest times of the day.
+        Args:
+            start_hour (str): The first hour of the period, as
+             "YYYY-MM-DD HH:00".
+            end_hour (str): The hour after the period.
+        Returns:
+            list[HourlySales]: The sales of each of the 24 hours of the day
+            added up over the days of the period, with the hour as "HH:00".
+        """
+        aggregator = SalesAggregator()
+        for rows in self.order_repository.load_hourly_sales_batches(
+                start_hour, end_hour, self.batch_size):
+            aggregator.add_hourly_sales(rows)
+        return [HourlySales(f"{hour:02d}:00", *(x[hour] for x in
+                                                aggregator.hour_of_day_totals))
+                for hour in range(HOURS_PER_DAY)]
+
+    def get_stock_turnover(self, start_hour: str = FIRST_HOUR,
+                           end_hour: str = LAST_HOUR):
+        """
+        Get how many times the stock of every item was sold over a period.
+        Args:
+            start_hour (str): The first hour of the period, as
+             "YYYY-MM-DD HH:00".
+            end_hour (str): The hour after the period.
+        Returns:
+            list[StockTurnover]: The turnover of every item that was sold or
+            held stock during the period, ordered by item Id.
+        The turnover is the quantity sold divided by the average of the
+        stock at the start and at the end of the period, read from the stock
+        movement ledger.
+        """
+        totals = self.__aggregate_item_sales(start_hour, end_hour)
+        opening_stocks = self.menu_repository.load_stock_levels_before(
+            start_hour)
+        closing_stocks = self.menu_repository.load_stock_levels_before(
+            end_hour)
+        turnovers = []
+        for item_id in sorted(totals.keys() | closing_stocks.keys()):
+            quantity_sold = totals[item_id][0] if item_id in totals else 0
+            opening_stock = opening_stocks.get(item_id, 0)
+            closing_stock = closing_stocks.get(item_id, 0)
+            stock_sum = opening_stock + closing_stock
+            if quantity_sold == 0 and stock_sum == 0:
+                continue
+            turnover = (2 * quantity_sold / stock_sum if stock_sum > 0
+                        else None)
+            turnovers.append(StockTurnover(item_id, quantity_sold,
+                                           opening_stock, closing_stock,
+                                           turnover))
+        return turnovers
+
+    def __aggregate_item_sales(self, start_hour: str, end_hour: str):
+        """
+        Add up the sales of every item over a period.
+        Args:
+            start_hour (str): The first hour of the period, as
+             "YYYY-MM-DD HH:00".
+            end_hour (str): The hour after the period.
+        Returns:
+            dict[int, list[int]]: The quantity and gross revenue in pence of
+            every item sold during the period, keyed by item Id.
+        """
+        aggregator = SalesAggregator()
+        for rows in self.order_repository.load_item_hourly_sales_batches(
+                start_hour, end_hour, self.batch_size):
+            aggregator.add_item_sales(rows)
+        return aggregator.item_totals
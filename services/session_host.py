@@ -0,0 +1,343 @@
+import asyncio
+import secrets
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from infrastructure.enums.enum_stock_movement_type import StockMovementType
+from infrastructure.helpers.cart_checkpoint import CartCheckpoint
+from infrastructure.helpers.cart_serializer import CartSerializer
+from infrastructure.helpers.inventory import Inventory
+from infrastructure.helpers.io_port import IOPort
+from infrastructure.helpers.session_channel import SessionChannel
+from infrastructure.helpers.stream_io import StreamIO
+from infrastructure.repositories.cart_checkpoint_repository import (
+    CartCheckpointRepository)
+from infrastructure.repositories.menu_repository import MenuRepository
+from services.user_flow_service import UserflowService
+
+MAX_SESSIONS = 64
+MAX_QUEUED_SESSIONS = 256
+IDLE_TIMEOUT = 600
+MAX_FLOW_RESTARTS = 3
+CHECKPOINT_MAX_AGE = 1800
+CHECKPOINT_SWEEP_INTERVAL = 60
+SESSION_CODE_BYTES = 4
+
+
+class SessionHost:
+    """
+    Service class serving many concurrent customer sessions from a single
+    process, over TCP or a Unix socket.
+
+    A single asyncio event loop accepts the connections and does all the
+    network input and output. The flow of every session runs the same
+    UserflowService code as the console app, in a worker thread of a pool of
+    max_sessions threads, with a StreamIO reading from and writing to the
+    connection of its customer through a SessionChannel. A thread waiting
+    for input holds no CPU and the event loop is never blocked by a flow.
+    When more customers connect than there are threads, they are told their
+    place in a queue of up to max_queued sessions and their sessions start
+    in turn as threads become free, and customers connecting when the queue
+    is full are turned away. A customer who sends nothing for idle_timeout
+    seconds is disconnected, so abandoned connections free their threads.
+
+    Every session has its own UserflowService, and so its own cart and
+    database connections, created in its thread. The sessions share a
+    single Inventory, which takes stock with an atomic check-and-decrement
+    under per-item locks, so concurrent customers never oversell an item.
+
+    Every session also owns a CartCheckpoint, which its CartService saves
+    the cart to after every change. If the flow of a session fails, it is
+    started again on the same connection, up to max_flow_restarts times,
+    and carries on with the saved cart, so the customer keeps their order.
+    When the customer disconnects, or the flow keeps failing, the stock of
+    the saved cart is given back, so abandoned carts never hold stock.
+
+    The checkpoints are saved in the database, under a code given to the
+    customer when their session starts, so if the process serving them is
+    restarted the customer can enter the code when they connect again and
+    carry on with their order. A code is only served by one session at a
+    time. The saved carts left behind by a restart hold stock, so while
+    serving, the host expires the saved carts that have not changed for
+    checkpoint_max_age seconds and gives their stock back.
+
+    Attributes:
+        flow_factory (Callable[[IOPort, Inventory, CartCheckpoint],
+         UserflowService]): Creates the flow of a session, given its input
+         and output, the shared inventory and the checkpoint of the cart of
+         the session.
+        max_sessions (int): The number of sessions served at the same time.
+        max_queued (int): The number of sessions waiting for their turn
+         before further customers are turned away.
+        idle_timeout (Union[float, None]): The number of seconds a customer
+         can send nothing before being disconnected, or None to wait
+         forever.
+        max_flow_restarts (int): The number of times the flow of a session is
+         started again after failing.
+        checkpoint_max_age (int): The number of seconds a saved cart is
+         kept without changing before its stock is given back.
+        inventory (Inventory): The inventory shared by every session.
+    """
+    def __init__(self, flow_factory=UserflowService,
+                 max_sessions: int = MAX_SESSIONS,
+                 max_flow_restarts: int = MAX_FLOW_RESTARTS,
+                 checkpoint_max_age: int = CHECKPOINT_MAX_AGE,
+                 max_queued: int = MAX_QUEUED_SESSIONS,
+                 idle_timeout: float = IDLE_TIMEOUT):
+        self.flow_factory = flow_factory
+        self.max_sessions = max_sessions
+        self.max_queued = max_queued
+        self.idle_timeout = idle_timeout
+        self.max_flow_restarts = max_flow_restarts
+        self.checkpoint_max_age = checkpoint_max_age
+        self.inventory = Inventory()
+        self.__executor = ThreadPoolExecutor(
+            max_workers=max_sessions, thread_name_prefix="session")
+        self.__sessions = asyncio.Semaphore(max_sessions)
+        self.__queued_count = 0
+        self.__session_codes = set()
+        self.__session_codes_lock = threading.Lock()
+
+    async def serve(self, host: str = None, port: int = None,
+                    unix_path: str = None):
+        """
+        Serve sessions until cancelled.
+        Args:
+            host (str): The address to listen on over TCP.
+            port (int): The port to listen on over TCP.
+            unix_path (str): The path of a Unix socket to listen on instead of
+             TCP.
+        """
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle_session,
+                                                     unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_session, host,
+                                                port)
+        expire_checkpoints = asyncio.create_task(
+            self.__expire_checkpoints_periodically())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expire_checkpoints.cancel()
+
+    def expire_checkpoints(self):
+        """
+        Give back the stock of the saved carts that have not changed for
+        checkpoint_max_age seconds, and delete them.
+        Returns:
+            int: The number of saved carts expired.
+        The carts of the sessions being served are skipped. Every cart is
+        deleted before its stock is given back, and only if it has not
+        changed since it was read, so the stock of a cart is never given
+        back twice, even by several processes sharing the database.
+        """
+        checkpoint_repository = CartCheckpointRepository()
+        menu_repository = MenuRepository()
+        expired_count = 0
+        for session_code, data, updated_at in (
+                checkpoint_repository.load_expired_checkpoints(
+                    self.checkpoint_max_age)):
+            with self.__session_codes_lock:
+                if (session_code in self.__session_codes or
+                        not checkpoint_repository.delete_expired_checkpoint(
+                            session_code, updated_at)):
+                    continue
+            for line in CartSerializer.decode(data).Lines.values():
+                if line.Stock > 0:
+                    self.inventory.give_back(menu_repository, line.Id,
+                                             line.Stock,
+                                             StockMovementType.Release)
+            expired_count += 1
+        return expired_count
+
+    async def handle_session(self, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter):
+        """
+        Serve the session of a customer who connected, once it is their
+        turn, until its flow ends or the customer disconnects.
+        Args:
+            reader (asyncio.StreamReader): The input of the connection.
+            writer (asyncio.StreamWriter): The output of the connection.
+        """
+        loop = asyncio.get_running_loop()
+        channel = SessionChannel(loop, writer,
+                                 idle_timeout=self.idle_timeout)
+        try:
+            if not await self.__wait_for_turn(writer):
+                return
+            try:
+                flow = loop.run_in_executor(self.__executor, self.__run_flow,
+                                            channel)
+                forward_input = asyncio.create_task(
+                    self.__forward_input(reader, channel))
+                try:
+                    await flow
+                finally:
+                    forward_input.cancel()
+            finally:
+                self.__sessions.release()
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def __wait_for_turn(self, writer: asyncio.StreamWriter):
+        """
+        Wait until a session can be served, telling the customer their place
+        in the queue if every session is taken.
+        Args:
+            writer (asyncio.StreamWriter): The output of the connection.
+        Returns:
+            bool: Whether it is the turn of the customer, or False if the
+            queue was full and the customer was turned away.
+        """
+        if not self.__sessions.locked():
+            await self.__sessions.acquire()
+            return True
+        if self.__queued_count >= self.max_queued:
+            writer.write(b"Sorry, we are serving as many customers as we "
+                         b"can and the queue is full. Please try again "
+                         b"later.\n")
+            return False
+        self.__queued_count += 1
+        writer.write(f"Sorry, we are serving as many customers as we can. "
+                     f"You are number {self.__queued_count} in the queue, "
+                     f"and your session will start as soon as it is your "
+                     f"turn.\n".encode())
+        try:
+            await self.__sessions.acquire()
+        finally:
+            self.__queued_count -= 1
+        writer.write(b"Thank you for waiting.\n")
+        return True
+
+    @staticmethod
+    async def __forward_input(reader: asyncio.StreamReader,
+                              channel: SessionChannel):
+        """
+        Hand over the lines a customer sends to the flow of their session.
+        Args:
+            reader (asyncio.StreamReader): The input of the connection.
+            channel (SessionChannel): The channel of the session.
+        """
+        while True:
+            try:
+                line = await reader.readline()
+            except ConnectionError:
+                line = b""
+            channel.put_line(line)
+            if not line:
+                break
+
+    async def __expire_checkpoints_periodically(self):
+        """
+        Expire the saved carts every CHECKPOINT_SWEEP_INTERVAL seconds, in a
+        thread of the default executor of the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.expire_checkpoints)
+            except Exception:
+                traceback.print_exc()
+            await asyncio.sleep(CHECKPOINT_SWEEP_INTERVAL)
+
+    def __run_flow(self, channel: SessionChannel):
+        """
+        Run the flow of a session in the current worker thread.
+        Args:
+            channel (SessionChannel): The channel of the session.
+        The customer is first asked for the code of the session they want to
+        carry on with, and given a new code otherwise. A customer
+        disconnecting ends the flow, which gives the stock of their cart
+        back. Any other error is logged to the standard error of the host,
+        and the flow is started again with the cart saved in the checkpoint
+        of the session, until it has failed more than max_flow_restarts
+        times, after which the stock of the saved cart is given back as
+        well.
+        """
+        io = StreamIO(channel, channel)
+        checkpoint_repository = CartCheckpointRepository()
+        try:
+            session_code = self.__open_session(io, checkpoint_repository)
+        except EOFError:
+            return
+        try:
+            self.__serve_session(io, CartCheckpoint(checkpoint_repository,
+                                                    session_code))
+        finally:
+            with self.__session_codes_lock:
+                self.__session_codes.discard(session_code)
+
+    def __serve_session(self, io: IOPort, cart_checkpoint: CartCheckpoint):
+        """
+        Run the flow of a session, starting it again when it fails.
+        Args:
+            io (IOPort): The input and output of the session.
+            cart_checkpoint (CartCheckpoint): The checkpoint of the session.
+        """
+        flow = None
+        for restart in range(self.max_flow_restarts + 1):
+            try:
+                flow = self.flow_factory(io, self.inventory, cart_checkpoint)
+                flow.start_cafeteria_flow()
+                break
+            except EOFError:
+                break
+            except Exception:
+                traceback.print_exc()
+            if restart < self.max_flow_restarts:
+                kept_order = ("" if cart_checkpoint.data is None
+                              else " Your order has been kept.")
+                io.print(f"Sorry, something went wrong.{kept_order} "
+                         f"Please start again.")
+        if cart_checkpoint.data is not None and flow is not None:
+            try:
+                flow.release_order()
+            except Exception:
+                traceback.print_exc()
+
+    def __open_session(self, io: IOPort,
+                       checkpoint_repository: CartCheckpointRepository):
+        """
+        Ask the customer for the code of the session they want to carry on
+        with, and claim it, or claim a new code.
+        Args:
+            io (IOPort): The input and output of the session.
+            checkpoint_repository (CartCheckpointRepository): The repository
+             of the saved carts.
+        Returns:
+            str: The code of the session, claimed until the session ends.
+        Raises:
+            EOFError: If the customer disconnects.
+        A code entered is only claimed if a cart is saved under it and no
+        other session is serving it.
+        """
+        session_code = io.input(
+            "If you have a session code, enter it to carry on with your "
+            "order, or press enter to start.\n").strip().upper()
+        if session_code:
+            with self.__session_codes_lock:
+                if (session_code not in self.__session_codes and
+                        checkpoint_repository.load_checkpoint(
+                            session_code) is not None):
+                    self.__session_codes.add(session_code)
+                    return session_code
+            io.print("Sorry, there is no order waiting for that code.")
+        while True:
+            session_code = secrets.token_hex(SESSION_CODE_BYTES).upper()
+            with self.__session_codes_lock:
+                if (session_code not in self.__session_codes and
+                        checkpoint_repository.load_checkpoint(
+                            session_code) is None):
+                    self.__session_codes.add(session_code)
+                    break
+        io.print(f"Your session code is {session_code}. If your session is "
+                 f"interrupted before your order is complete, enter it when "
+                 f"you connect again to carry on with your order.")
+        return session_code
@@ -1,17 +1,22 @@
-import copy
 from dataclasses import dataclass
-from tabulate import tabulate
 
+from infrastructure.helpers.cart_checkpoint import CartCheckpoint
 from infrastructure.helpers.color_helper import ColorHelper
+from infrastructure.helpers.console_io import ConsoleIO
+from infrastructure.helpers.inventory import Inventory
+from infrastructure.helpers.io_port import IOPort
 
 from entities.cafeteria_item import CafeteriaItem
 from entities.cart import Cart
+from entities.menu import Menu
 from infrastructure.enums.enum_icon import Icon
+from infrastructure.enums.enum_stock_movement_type import StockMovementType
 from infrastructure.helpers.price_converter import PriceConverter
 from infrastructure.validators.user_input_validator import UserInputValidator
 from services.admin_service import AdminService
 from services.cafeteria_item_service import CafeteriaItemService
 from services.cart_service import CartService
+from services.order_service import OrderService
 
 
 @dataclass
@@ -28,55 +33,105 @@ class UserflowService:
          cafeteria item operations.
         admin_service (AdminService): The service for administrator-related
          operations.
-        cart_service (CartService): The service for shopping cart operations.
+        cart_service (CartService): The service for shopping cart operations,
+         saving the cart to the checkpoint of the session after every change,
+         a new CartCheckpoint if none is given.
+        order_service (OrderService): The service recording completed
+         orders.
         price_converter (PriceConverter): The service for price formatting
          operations.
-        menu (list[CafeteriaItem]): The current cafeteria menu.
-        unique_set (set): A set to keep track of unique item IDs in the
-         shopping cart.
-        cart_result (list[CafeteriaItem]): A list to store items in the
-         shopping cart.
+        menu (Menu): The current cafeteria menu.
+        io (IOPort): The input and output the user is prompted with, the
+         console by default.
     """
-    def __init__(self):
-        self.cafeteria_item_service = CafeteriaItemService()
-        self.admin_service = AdminService()
-        self.cart_service = CartService()
+    def __init__(self, io: IOPort = None, inventory: Inventory = None,
+                 cart_checkpoint: CartCheckpoint = None):
+        self.io = io or ConsoleIO()
+        self.cafeteria_item_service = CafeteriaItemService(
+            io=self.io, inventory=inventory)
+        self.admin_service = AdminService(self.io)
+        self.cart_service = CartService(
+            io=self.io, checkpoint=cart_checkpoint or CartCheckpoint())
+        self.order_service = OrderService()
         self.price_converter = PriceConverter()
         self.menu = self.cafeteria_item_service.get_cafeteria_menu()
-        self.unique_set = set()
-        self.cart_result = []
 
     def start_cafeteria_flow(self):
         """
         Begin the cafeteria flow, welcoming the user, displaying the menu
         and handling user orders.
 
+        Runs the flow until the order is completed. If the customer leaves
+        before completing it, because their input ends or they interrupt the
+        app, the stock of their cart is given back with release_order before
+        the error is raised again, so an abandoned cart never keeps its
+        stock.
+        """
+        try:
+            self.__serve_customer()
+        except (EOFError, KeyboardInterrupt):
+            self.release_order()
+            raise
+
+    def release_order(self):
+        """
+        Give back the stock of the unfinished order of the session.
+
+        The cart saved in the checkpoint holds exactly the stock taken for
+        the order, so each of its lines is given back to the inventory,
+        recorded as a release in the stock ledger, and the checkpoint is
+        cleared. Does nothing if no cart is saved.
+        """
+        cart = self.cart_service.restore_cart()
+        if cart is None:
+            return
+        menu_list_copy = self.menu.snapshot()
+        for line in cart.Lines.values():
+            if line.Stock > 0:
+                self.cafeteria_item_service.add_to_stock(
+                    line, menu_list_copy, line.Stock,
+                    StockMovementType.Release)
+        self.cart_service.clear_checkpoint()
+        self.menu = self.cafeteria_item_service.get_cafeteria_menu()
+
+    def __serve_customer(self):
+        """
+        Welcome the user, display the menu and handle their order.
+
         Prints a welcome message and prompts the user for their name.
         If an admin name is provided, sets the menu to the provided admin menu.
         Otherwise, displays Chef Storm's menu and handles user orders by
-        showing the menu, handling the order, and creating a cart. Continues to
+        showing the menu, handling the order, and creating a cart. If the
+        session was started again with a cart saved in its checkpoint, the
+        saved cart is restored instead of taking a new order. Continues to
         prompt the user to review and complete their order until the user
         indicates they are finished or wish to continue. Once the order is
         completed, proceeds to the next steps of the cafeteria flow.
         """
-        print(
+        self.io.print(
             f"{Icon.DogIcon.value}  Welcome to Storm's Woofeteria.  "
             f"{Icon.DogIcon.value}")
-        user_input = UserInputValidator.validate_user_name()
+        user_input = UserInputValidator.validate_user_name(self.io)
         admin_name_provided = (self.admin_service.
                                validate_if_admin_name_provided(user_input))
         if not admin_name_provided[0]:
             if admin_name_provided[1] is not None:
                 self.menu = admin_name_provided[1]
-            print(f"Hello {user_input.title()}. "
-                  f"Here is what Chef Storm has to offer.")
-            self.__show_menu()
-            cart_items = self.__handle_order(self.menu)
-            cart = self.cart_service.add_to_cart(cart_items)
+            cart = self.cart_service.restore_cart()
+            if cart is None or len(cart.Lines) == 0:
+                self.io.print(f"Hello {user_input.title()}. "
+                              f"Here is what Chef Storm has to offer.")
+                self.__show_menu()
+                cart = self.cart_service.add_to_cart([])
+                self.__handle_order(self.menu, cart)
+            else:
+                self.io.print(f"Welcome back {user_input.title()}. "
+                              f"We have kept your order.")
             while True:
-                self.print_user_cart(cart)
-                user_input = input(f"Are you finished with your order?"
-                                   f" {ColorHelper.color_yes_no_text()}\n")
+                self.cart_service.print_cart_table(cart)
+                user_input = self.io.input(
+                    f"Are you finished with your order?"
+                    f" {ColorHelper.color_yes_no_text()}\n")
                 if user_input.capitalize() == "Y":
                     self.__complete_user_flow(cart)
                     break
@@ -84,7 +139,7 @@ class UserflowService:
                     self.__continue_flow(user_input, cart)
                     break
                 else:
-                    print(
+                    self.io.print(
                         f"The input entered is not valid. Please try using "
                         f"{ColorHelper.color_yes_no_text()} ")
 
@@ -140,8 +195,8 @@ class UserflowService:
         """
         result = False
         while True:
-            self.print_user_cart(cart)
-            user_input = input(
+            self.cart_service.print_cart_table(cart)
+            user_input = self.io.input(
                 f"Would you like to add or remove item(s) from your cart? "
                 f"{ColorHelper.color_add_remove_text()}\n")
             if user_input.capitalize() == "Add":
@@ -153,7 +208,7 @@ class UserflowService:
                 result = self.__handle_continue_flow(updated_cart)
                 break
             else:
-                print(
+                self.io.print(
                     f"The input entered is not valid. Please try using "
                     f"{ColorHelper.color_add_remove_text()}")
         return result
@@ -175,19 +230,18 @@ class UserflowService:
         """
         result = True
         while True:
-            self.print_user_cart(cart)
-            user_input = input(
+            self.cart_service.print_cart_table(cart)
+            user_input = self.io.input(
                 f"Are you finished with your order? "
                 f"{ColorHelper.color_yes_no_text()}\n")
             if user_input.capitalize() == "Y":
                 result = False
                 break
             elif user_input.capitalize() == "N":
-                print("Your current order: ")
                 self.cart_service.print_cart(cart)
                 break
             else:
-                print(
+                self.io.print(
                     f"The input entered is not valid. Please try using"
                     f"{ColorHelper.color_yes_no_text()} ")
         return result
@@ -201,60 +255,38 @@ class UserflowService:
         The method prompts the user to enter the cart total displayed on
         the screen to complete the purchase. It validates the user input and
         finalizes the purchase if the input is valid and matches the expected
-        total price. If the input is valid, it prints a thank-you message and
-        concludes the cafeteria flow. Otherwise, it prints a message stating
-        that the input is invalid and prompts the user to try again.
+        total price. If the input is valid, it records the order in the order
+        log, prints a thank-you message and concludes the cafeteria flow.
+        Otherwise, it prints a message stating that the input is invalid and
+        prompts the user to try again.
         """
         while True:
-            formatted_price = (self.price_converter.
-                               format_price(cart.TotalPrice))
-            self.print_user_cart(cart)
-            if len(cart.Items) == 0:
-                print(
+            self.cart_service.print_cart_table(cart)
+            if len(cart.Lines) == 0:
+                self.io.print(
                     f"{Icon.PawIcon.value}Thanks for visiting Woofeteria, "
                     f"have a pawesome day!{Icon.PawIcon.value}")
                 break
-            user_input = input(
+            user_input = self.io.input(
                 "Please enter the cart total on screen (minus the pound sign) "
                 "to complete your purchase.\n")
+            amount = self.price_converter.strip_money(user_input)
             is_user_input_valid = (UserInputValidator.
-                                   validate_user_input_is_a_decimal(user_input)
-                                   )
+                                   validate_user_input_is_a_decimal(amount))
             if not is_user_input_valid:
-                print("Please enter a valid input")
-            elif formatted_price != user_input:
-                print(
+                self.io.print("Please enter a valid input")
+            elif PriceConverter.to_pence(amount) != cart.TotalPrice:
+                self.io.print(
                     "What you have entered does not match the total expected "
                     "price. Please try again. ")
             else:
-                print(
+                self.order_service.record_order(cart)
+                self.cart_service.clear_checkpoint()
+                self.io.print(
                     f"{Icon.PawIcon.value}  Thank you, have a pawesome day  "
                     f"{Icon.PawIcon.value}")
                 break
 
-    def print_user_cart(self, cart: Cart):
-        """
-        Print the contents of the user's shopping cart.
-        Args:
-            cart (Cart): The Cart object representing the user's current
-             selections.
-        Prints:
-            A formatted table displaying the ID, Name, Price, and Quantity
-            of each item in the user's shopping cart. Additionally, prints the
-            total price of the cart.
-        """
-        formatted_price = self.price_converter.format_price(cart.TotalPrice)
-        headers = ["ID", "Name", "Price", "Quantity"]
-        table_items = []
-        for cart_item in cart.Items:
-            table_item = [cart_item.Id, cart_item.Name,
-                          f"£ {cart_item.Price:.2f}", cart_item.Stock]
-            table_items.append(table_item)
-        cart_table = tabulate(table_items, headers=headers, tablefmt="pretty")
-        print(cart_table)
-        cart_total = print(f"Your cart total is: £{formatted_price}")
-        return cart_total
-
     def __add_to_cart(self, cart: Cart):
         """
         Add items to the user's shopping cart.
@@ -268,9 +300,7 @@ class UserflowService:
             and returns the updated Cart object.
         """
         self.__show_menu()
-        cart_items = self.__handle_order(self.menu)
-        cart.Items = cart_items
-        return self.cart_service.update_cart(cart, cart.Items)
+        return self.__handle_order(self.menu, cart)
 
     def __remove_from_cart(self, cart: Cart):
         """
@@ -285,128 +315,96 @@ class UserflowService:
             of the selected items, handles the removal from the cart
             and returns the updated Cart object.
         """
-        cart_items = UserInputValidator.validate_item_ids(cart.Items, True)
-        updated_items = self.__add_stock(cart_items)
-        self.handle_remove_from_cart(cart, cart_items, updated_items)
-        return self.cart_service.update_cart(cart, cart.Items)
-
-    def handle_remove_from_cart(self, cart, cart_items, updated_items):
-        """
-        Handle the removal of items from the user's shopping cart.
-
-        Args:
-            cart (Cart): The Cart object representing the user's current
-             selections.
-            cart_items (list[CafeteriaItem]): The list of CafeteriaItems to be
-             removed from the cart.
-            updated_items (list[CafeteriaItem]): The list of updated
-             CafeteriaItems after removal.
-        The method updates the user's cart based on the removal of
-        selected items. If the stock of an item becomes zero, it is removed
-        from the cart, otherwise, the item is updated in the cart with
-        the new stock.
-        """
-        if len(updated_items) == 0:
-            self.unique_set.clear()
-            cart.Items = updated_items
-        else:
-            for cart_item in cart_items:
-                for updated_item in updated_items:
-                    if cart_item.Id == updated_item.Id:
-                        if updated_item.Stock == 0:
-                            self.unique_set.remove(cart_item.Id)
-                            self.cart_result.remove(cart_item)
-                            if [item for item in cart.Items if
-                                item.Id == cart_item.Id]:  # noqa
-                                cart.Items.remove(cart_item)
-                        else:
-                            cart.Items.remove(cart_item)
-                            cart.Items.append(updated_item)
-                            if [item for item in self.cart_result if
-                                item.Id == cart_item.Id]:  # noqa
-                                self.cart_result.remove(cart_item)
-                                self.cart_result.append(updated_item)
+        cart_items = UserInputValidator.validate_item_ids(cart.Lines, True,
+                                                          self.io)
+        self.__add_stock(cart_items, cart)
+        return cart
 
-    def __handle_order(self, items: list[CafeteriaItem]):
+    def __handle_order(self, items: Menu, cart: Cart):
         """
         Handle the user's order by validating and subtracting stock from
         selected items.
         Args:
-            items (list[CafeteriaItem]): The list of CafeteriaItems available
+            items (Menu): The menu of CafeteriaItems available
              for the user's order.
+            cart (Cart): The Cart object the ordered items are added to.
         Returns:
-            list[CafeteriaItem]: The list of CafeteriaItems representing the
-            user's ordered items. The method prompts the user to select items
-            for their order, validates the input, and subtracts stock from
-            the selected items. The resulting list represents the user's
-            ordered items.
+            Cart: The updated Cart object. The method prompts the user to
+            select items for their order, validates the input, subtracts
+            stock from the selected items and adds them to the cart.
         """
-        ordered_items = UserInputValidator.validate_item_ids(items)
-        return self.__subtract_stock(ordered_items)
+        ordered_items = UserInputValidator.validate_item_ids(items,
+                                                             io=self.io)
+        return self.__subtract_stock(ordered_items, cart)
 
-    def __subtract_stock(self, cart_items: list[CafeteriaItem]):
+    def __subtract_stock(self, cart_items: list[CafeteriaItem], cart: Cart):
         """
         Subtract stock from selected items in the menu and update the user's
         cart.
         Args:
             cart_items (list[CafeteriaItem]): The list of CafeteriaItems
              representing the user's ordered items.
+            cart (Cart): The Cart object the ordered items are added to.
         Returns:
-           list[CafeteriaItem]: The list of updated CafeteriaItems in the
-           user's cart. The method deep copies the menu, subtracts stock from
-           selected items based on user input, updates the user's cart
-           and returns the updated list of CafeteriaItems in the user's cart.
+           Cart: The updated Cart object. The method takes a copy-on-write
+           snapshot of the menu, which only copies the items whose stock
+           changes, looks up each selected item in the snapshot's ID index,
+           subtracts stock from selected items based on user input, and,
+           when the item had enough stock left, adds
+           the ordered quantity to the user's cart through the CartService,
+           which copies newly selected items, so the cart never shares items
+           with the menu, and updates the cart totals line by line.
         """
-        menu_list_copy = copy.deepcopy(self.menu)
+        menu_list_copy = self.menu.snapshot()
         for item in cart_items:
-            menu_item = next((x for x in menu_list_copy if x.Id == item.Id),
-                             None)
+            menu_item = menu_list_copy.get_by_id(item.Id)
             if item.Stock == 0:
-                print(f"Sorry {item.Name} is out of stock.")
+                self.io.print(f"Sorry {item.Name} is out of stock.")
                 continue
             user_input = int(
-                UserInputValidator.validate_input_for_items(menu_item))
-            if item.Id not in self.unique_set:
-                self.unique_set.add(item.Id)
-                item.Stock = user_input
-                self.cart_result.append(item)
-            else:
-                cart_item = next(
-                    (x for x in self.cart_result if x.Id == item.Id), None)
-                if menu_item.Stock == 0:
-                    continue
-                else:
-                    cart_item.Stock += user_input
-            self.cafeteria_item_service.subtract_from_stock(item,
-                                                            menu_list_copy,
-                                                            user_input)
-            print(f"You have added x{user_input} {item.Name} to your cart")
+                UserInputValidator.validate_input_for_items(menu_item,
+                                                            io=self.io))
+            if item.Id in cart.Lines and menu_item.Stock == 0:
+                continue
+            if not self.cafeteria_item_service.subtract_from_stock(
+                    item, menu_list_copy, user_input):
+                stock = menu_list_copy.get_by_id(item.Id).Stock
+                self.io.print(f"Sorry, we only have {max(stock, 0)} "
+                              f"{item.Name} left in stock.")
+                continue
+            self.cart_service.add_item_to_cart(cart, item, user_input)
+            self.io.print(f"You have added x{user_input} {item.Name} to your "
+                          f"cart")
         self.menu = self.cafeteria_item_service.get_cafeteria_menu()
-        return self.cart_result
+        return cart
 
-    def __add_stock(self, cart_items: list[CafeteriaItem]):
+    def __add_stock(self, cart_items: list[CafeteriaItem], cart: Cart):
         """
         Add stock back to selected items in the menu and update the user's
         cart.
         Args:
             cart_items (list[CafeteriaItem]): The list of CafeteriaItems to be
              updated with added stock.
+            cart (Cart): The Cart object the items are removed from.
         Returns:
            list[CafeteriaItem]: The list of updated CafeteriaItems in the
-           user's cart after adding stock. The method deep copies the menu,
-           adds stock back to selected items based on user input, updates the
-           user's cart, and returns the updated list of CafeteriaItems in the
-           user's cart.
+           user's cart after adding stock. The method takes a copy-on-write
+           snapshot of the menu, adds stock back to selected items based on
+           user input, updates the user's cart, and returns the updated list
+           of CafeteriaItems in the user's cart.
         """
-        menu_list_copy = copy.deepcopy(self.menu)
+        menu_list_copy = self.menu.snapshot()
         cart_items_updated = []
         for item in cart_items:
             user_input = int(
-                UserInputValidator.validate_input_for_items(item, True))
-            item.Stock -= user_input
-            print(f"You have removed: x{user_input} {item.Name}")
+                UserInputValidator.validate_input_for_items(item, True,
+                                                            self.io))
+            removed_quantity = self.cart_service.remove_item_from_cart(
+                cart, item.Id, user_input)
+            self.io.print(f"You have removed: x{removed_quantity} "
+                          f"{item.Name}")
             cart_items_updated.append(item)
             self.cafeteria_item_service.add_to_stock(item, menu_list_copy,
-                                                     user_input)
+                                                     removed_quantity)
         self.menu = self.cafeteria_item_service.get_cafeteria_menu()
         return cart_items_updated